@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'order_management.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,12 +77,67 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# OMS_DB_ENGINE selects the database profile: "sqlite" (default, used by the
+# test suite and local development) or "postgresql" for production.
+OMS_DB_ENGINE = os.environ.get('OMS_DB_ENGINE', 'sqlite')
+
+if OMS_DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('OMS_DB_NAME', 'oms'),
+            'USER': os.environ.get('OMS_DB_USER', 'oms'),
+            'PASSWORD': os.environ.get('OMS_DB_PASSWORD', ''),
+            'HOST': os.environ.get('OMS_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('OMS_DB_PORT', '5432'),
+            # Persistent connections; ignored (must be 0) when the pool is enabled.
+            'CONN_MAX_AGE': int(os.environ.get('OMS_DB_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
+            # Exports and chunked iterators use server-side cursors. Disable them
+            # only behind a transaction-pooling proxy such as PgBouncer.
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('OMS_DB_DISABLE_SERVER_SIDE_CURSORS') == '1',
+            'OPTIONS': {
+                'options': f"-c statement_timeout={os.environ.get('OMS_DB_STATEMENT_TIMEOUT_MS', '30000')}",
+            },
+        }
     }
-}
+    if os.environ.get('OMS_DB_POOL', '1') == '1':
+        # psycopg connection pool (requires psycopg[pool]), shared per process.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('OMS_DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('OMS_DB_POOL_MAX_SIZE', '20')),
+            'timeout': int(os.environ.get('OMS_DB_POOL_TIMEOUT', '10')),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+    if os.environ.get('OMS_SQLITE_TUNED') == '1':
+        # Single-node tuning: WAL lets readers run alongside the writer, write
+        # transactions take the lock up front (BEGIN IMMEDIATE) and wait up to
+        # the busy timeout instead of failing immediately.
+        busy_timeout_ms = int(os.environ.get('OMS_SQLITE_BUSY_TIMEOUT_MS', '5000'))
+        DATABASES['default']['OPTIONS'] = {
+            'timeout': busy_timeout_ms / 1000,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join([
+                'PRAGMA journal_mode=WAL',
+                f'PRAGMA busy_timeout={busy_timeout_ms}',
+                'PRAGMA synchronous=NORMAL',
+                f"PRAGMA mmap_size={os.environ.get('OMS_SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))}",
+                # Negative values are KiB: 64 MiB page cache per connection.
+                f"PRAGMA cache_size={os.environ.get('OMS_SQLITE_CACHE_SIZE', '-65536')}",
+                'PRAGMA temp_store=MEMORY',
+            ]),
+        }
+
+# Write endpoints retry their transaction when SQLite reports "database is locked".
+OMS_DB_LOCK_RETRIES = 3
+OMS_DB_LOCK_RETRY_BACKOFF = 0.05
 
 
 # Password validation
@@ -119,11 +176,117 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+
+# Caches
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# The "orders" cache holds rendered order payloads keyed by order id and
+# version. It is an in-process LRU by default; point OMS_ORDER_CACHE_URL at a
+# Redis server (redis://host:6379/0) to share it between worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'orders': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'oms-orders',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+if os.environ.get('OMS_ORDER_CACHE_URL'):
+    CACHES['orders'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['OMS_ORDER_CACHE_URL'],
+        'TIMEOUT': 300,
+        'KEY_PREFIX': 'oms',
+    }
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'order_management.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'order_management.pagination.KeysetPagination',
+    'DEFAULT_FILTER_BACKENDS': [
+        'order_management.filters.QueryParamFilterBackend',
     ],
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
 }
+
+# Bulk order ingestion (POST /api/orders/bulk)
+OMS_BULK_MAX_ORDERS = 10000
+OMS_BULK_BATCH_SIZE = 500
+
+# Bulk invoicing (POST /api/oms/invoice/bulk, python manage.py invoice_orders)
+OMS_BULK_INVOICE_CHUNK_SIZE = 1000
+OMS_BULK_INVOICE_MAX_ORDERS = 10000
+
+# Archival of completed/cancelled orders (python manage.py archive_orders):
+# orders last updated more than OMS_ARCHIVE_RETENTION_DAYS ago are moved in
+# batches, sleeping OMS_ARCHIVE_BATCH_PAUSE seconds between batches.
+OMS_ARCHIVE_RETENTION_DAYS = 180
+OMS_ARCHIVE_BATCH_SIZE = 500
+OMS_ARCHIVE_BATCH_PAUSE = 0.1
+
+# Streaming order export (GET /api/orders/export)
+OMS_EXPORT_CHUNK_SIZE = 2000
+
+# Idempotency-Key replay store for create endpoints, in seconds
+OMS_IDEMPOTENCY_TTL = 24 * 60 * 60
+
+# Bulk status transitions (POST /api/orders/transitions)
+OMS_BULK_MAX_TRANSITIONS = 10000
+
+# Per-request query/timing metrics are always collected (see /metrics); this
+# controls whether they are also sent to clients as a Server-Timing header.
+# Off by default: the header exposes query counts and timings to any client.
+OMS_METRICS_SERVER_TIMING = os.environ.get('OMS_METRICS_SERVER_TIMING', '0') == '1'
+# GET /metrics answers clients connecting from these addresses, and any client
+# sending "Authorization: Bearer <OMS_METRICS_TOKEN>" when a token is set.
+OMS_METRICS_ALLOWED_IPS = os.environ.get('OMS_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+OMS_METRICS_TOKEN = os.environ.get('OMS_METRICS_TOKEN', '')
+
+# Outbox dispatch to the WMS (python manage.py dispatch_outbox)
+OMS_WMS_URL = os.environ.get('OMS_WMS_URL', '')
+OMS_WMS_TIMEOUT = float(os.environ.get('OMS_WMS_TIMEOUT', '5'))
+OMS_OUTBOX_BATCH_SIZE = 100
+OMS_OUTBOX_CONCURRENCY = 8
+OMS_OUTBOX_MAX_ATTEMPTS = 10
+OMS_OUTBOX_RETRY_BACKOFF = 2
+OMS_OUTBOX_RETRY_MAX_BACKOFF = 15 * 60
+OMS_OUTBOX_LEASE = 60
+
+# Order event log (GET /api/events). Events written less than
+# OMS_EVENTS_SAFETY_LAG seconds ago, and every event after them, are held back
+# so events of transactions still in flight are not skipped.
+OMS_EVENTS_PAGE_SIZE = 100
+OMS_EVENTS_MAX_PAGE_SIZE = 1000
+# A long poll on /api/events holds a worker thread for the whole wait, so it
+# is kept short; /api/async/events waits on the event loop and may wait longer.
+OMS_EVENTS_MAX_WAIT = 5
+OMS_EVENTS_ASYNC_MAX_WAIT = 30
+OMS_EVENTS_POLL_INTERVAL = 0.5
+OMS_EVENTS_SAFETY_LAG = 2
+
+# Delta sync (GET /api/sync). Rows changed less than OMS_SYNC_SAFETY_LAG
+# seconds ago are held back so in-flight transactions are not skipped.
+OMS_SYNC_PAGE_SIZE = 500
+OMS_SYNC_MAX_PAGE_SIZE = 5000
+OMS_SYNC_SAFETY_LAG = 5
+
+# Sales analytics read from the rollup tables (GET /api/analytics/sales)
+OMS_ANALYTICS_MAX_DAYS = 366
+
+# Background jobs (POST /api/jobs, python manage.py run_jobs). Workers lease a
+# job for OMS_JOB_LEASE seconds and renew the lease with every progress report.
+OMS_JOB_PROCESSES = int(os.environ.get('OMS_JOB_PROCESSES', '2'))
+OMS_JOB_LEASE = 300
+OMS_JOB_MAX_ATTEMPTS = 3
+OMS_JOB_PROGRESS_INTERVAL = 1.0
+OMS_JOB_IMPORT_CHUNK_SIZE = 1000
+OMS_JOB_MAX_IMPORT_ORDERS = 200000
+# Written by the worker and read by the web process: both must see the same
+# directory (single host or a shared mount).
+OMS_JOB_OUTPUT_DIR = os.environ.get('OMS_JOB_OUTPUT_DIR', str(BASE_DIR / 'job_output'))
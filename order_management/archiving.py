@@ -0,0 +1,110 @@
+"""Archival of completed and cancelled orders.
+
+Terminal orders make up most of the live tables and never change again, but
+they stay in every index the live workflow reads. ``archive_orders`` moves the
+ones last updated more than ``OMS_ARCHIVE_RETENTION_DAYS`` ago to
+``ArchivedOrder`` / ``ArchivedInvoice`` in batches: each batch is locked,
+copied and deleted (with its items, invoice and fulfillment request) in its own
+short transaction, with a pause between batches so the live workload is not
+starved.
+
+Archived orders keep their id, ``external_id``, version and representation;
+order reads fall back to ``archived_order`` when the live row is gone. The
+rollups are left as they are, and ``rollups.rebuild`` counts archived orders.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import fastpath, order_cache
+from .db import retry_on_database_locked
+from .models import ArchivedInvoice, ArchivedOrder, FulfillmentRequest, Invoice, Order
+
+TERMINAL_STATUSES = (Order.Status.COMPLETED, Order.Status.CANCELLED)
+ORDER_COLUMNS = (*fastpath.ORDER_VALUES, "version", "computed_total")
+
+
+def archivable_orders(older_than=None):
+    """Terminal orders last updated before ``older_than`` (by default, before the retention window)."""
+    if older_than is None:
+        older_than = timezone.now() - timedelta(days=settings.OMS_ARCHIVE_RETENTION_DAYS)
+    return Order.objects.filter(status__in=TERMINAL_STATUSES, updated_at__lt=older_than)
+
+
+@retry_on_database_locked
+def _archive_batch(orders, size):
+    # An invoice or fulfillment inserted concurrently for a locked order
+    # waits for this transaction and then fails on its foreign key, so
+    # nothing is deleted without having been copied.
+    rows = list(orders.order_by("pk").select_for_update().values(*ORDER_COLUMNS)[:size])
+    if not rows:
+        return rows
+    ids = [row["id"] for row in rows]
+    items = fastpath.items_by_order(ids)
+    fulfillment_rows = list(FulfillmentRequest.objects.filter(order_id__in=ids).values(*fastpath.FULFILLMENT_VALUES))
+    fulfillments = {
+        row["order_id"]: rendered
+        for row, rendered in zip(fulfillment_rows, fastpath.render_fulfillments(fulfillment_rows))
+    }
+    ArchivedOrder.objects.bulk_create(
+        ArchivedOrder(**row, items=items.get(row["id"], []), fulfillment_request=fulfillments.get(row["id"]))
+        for row in rows
+    )
+    ArchivedInvoice.objects.bulk_create(
+        ArchivedInvoice(**row)
+        for row in Invoice.objects.filter(order_id__in=ids).values(*fastpath.INVOICE_VALUES)
+    )
+    Order.objects.filter(pk__in=ids).delete()
+    order_cache.invalidate([(row["id"], row["created_at"], row["version"]) for row in rows])
+    return rows
+
+
+def archive_orders(older_than=None, limit=None, batch_size=None, pause=None, progress=None):
+    """Archive terminal orders last updated before ``older_than``, ``batch_size`` orders per transaction.
+
+    Sleeps ``pause`` seconds between batches and archives at most ``limit``
+    orders when given. Returns counts and timing. ``progress`` is called with
+    the number of orders archived so far after each committed batch; an
+    exception it raises stops the run there.
+    """
+    batch_size = batch_size or settings.OMS_ARCHIVE_BATCH_SIZE
+    pause = settings.OMS_ARCHIVE_BATCH_PAUSE if pause is None else pause
+    orders = archivable_orders(older_than)
+    started = time.perf_counter()
+    archived = batches = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        rows = _archive_batch(orders, size)
+        if not rows:
+            break
+        archived += len(rows)
+        batches += 1
+        if progress is not None:
+            progress(archived)
+        if len(rows) < size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "archived": archived,
+        "batches": batches,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "orders_per_second": round(archived / elapsed, 1) if elapsed else None,
+    }
+
+
+def archived_order(fields=None, **lookup):
+    """Render the archived order matching ``lookup`` (``pk=`` or ``external_id=``) as the order reads would.
+
+    Returns the payload and the ``(order_id, created_at, version)`` identity
+    the live order had, or ``None`` if no such order is archived.
+    """
+    row = ArchivedOrder.objects.filter(**lookup).values(*fastpath.order_columns(fields), "version", "items").first()
+    if row is None:
+        return None
+    payload = fastpath.render_orders([row], fields, items={row["id"]: row["items"]})[0]
+    return payload, (row["id"], row["created_at"], row["version"])
@@ -0,0 +1,134 @@
+"""ASGI-native order endpoints.
+
+DRF views are synchronous, so under ASGI every request to them is handed to
+a thread through ``sync_to_async``. These views run on the event loop and
+only leave it for the database calls themselves (Django's ``a*`` ORM
+methods), so a single worker can keep many slow clients in flight.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import serializers, status
+from rest_framework.utils.urls import replace_query_param
+
+from . import archiving, events, state_machine
+from .db import retry_on_database_locked
+from .filters import filter_by_params
+from .models import ArchivedOrder, Order, OrderEvent, OrderItem
+from .renderers import ORJSONRenderer
+from .serializers import (
+    DUPLICATE_EXTERNAL_ID,
+    BulkOrderSerializer,
+    OrderEventSerializer,
+    OrderSerializer,
+    OrderStatusUpdateSerializer,
+)
+
+NOT_FOUND = "No Order matches the given query."
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(ORJSONRenderer().render(data), status=status_code, content_type="application/json")
+
+
+def parse_body(request):
+    try:
+        return json.loads(request.body or b"null")
+    except ValueError as exc:
+        raise serializers.ValidationError({"detail": f"JSON parse error - {exc}"})
+
+
+@retry_on_database_locked
+def _save_order(serializer):
+    serializer.save()
+    return serializer.data
+
+
+async def _get_order(pk):
+    items = Prefetch("items", queryset=OrderItem.objects.order_by("id"))
+    return await Order.objects.prefetch_related(items).aget(pk=pk)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def order_create(request):
+    try:
+        serializer = BulkOrderSerializer(data=parse_body(request))
+        serializer.is_valid(raise_exception=True)
+    except serializers.ValidationError as exc:
+        return json_response(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    external_id = serializer.validated_data["external_id"]
+    if (
+        await Order.objects.filter(external_id=external_id).aexists()
+        or await ArchivedOrder.objects.filter(external_id=external_id).aexists()
+    ):
+        return json_response({"external_id": [DUPLICATE_EXTERNAL_ID]}, status.HTTP_400_BAD_REQUEST)
+    try:
+        # Order and items are written in one transaction, which the async ORM
+        # cannot open, so the write is a single hop to a worker thread.
+        data = await sync_to_async(_save_order)(serializer)
+    except IntegrityError:
+        return json_response({"external_id": [DUPLICATE_EXTERNAL_ID]}, status.HTTP_400_BAD_REQUEST)
+    return json_response(data, status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "PATCH", "PUT"])
+async def order_detail(request, pk):
+    try:
+        order = await _get_order(pk)
+    except Order.DoesNotExist:
+        archived = await sync_to_async(archiving.archived_order)(pk=pk) if request.method == "GET" else None
+        if archived is None:
+            return json_response({"detail": NOT_FOUND}, status.HTTP_404_NOT_FOUND)
+        return json_response(archived[0])
+    if request.method == "GET":
+        return json_response(OrderSerializer(order).data)
+
+    try:
+        serializer = OrderStatusUpdateSerializer(order, data=parse_body(request))
+        serializer.is_valid(raise_exception=True)
+        await state_machine.atransition(order, serializer.validated_data["status"])
+    except serializers.ValidationError as exc:
+        return json_response(exc.detail, status.HTTP_400_BAD_REQUEST)
+    except state_machine.InvalidTransition as exc:
+        return json_response({"non_field_errors": [str(exc)]}, status.HTTP_400_BAD_REQUEST)
+    return json_response(OrderSerializer(order).data)
+
+
+@require_http_methods(["GET"])
+async def order_events(request):
+    """Same as ``GET /api/events``, but a long poll waits on the event loop instead of in a thread.
+
+    ``wait`` may therefore be up to ``OMS_EVENTS_ASYNC_MAX_WAIT`` seconds.
+    """
+    try:
+        after, limit, wait = events.parse_query(request.GET, max_wait=settings.OMS_EVENTS_ASYNC_MAX_WAIT)
+        queryset = filter_by_params(OrderEvent.objects.order_by("seq"), events.FILTER_PARAMS, request.GET)
+    except serializers.ValidationError as exc:
+        return json_response(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    deadline = time.monotonic() + wait
+    while True:
+        page = await sync_to_async(events.read)(queryset, after, limit)
+        remaining = deadline - time.monotonic()
+        if page or remaining <= 0:
+            break
+        await asyncio.sleep(min(settings.OMS_EVENTS_POLL_INTERVAL, remaining))
+
+    last = page[-1].seq if page else after
+    return json_response(
+        {
+            "next": replace_query_param(request.build_absolute_uri(), "after", last),
+            "results": OrderEventSerializer(page, many=True).data,
+        }
+    )
@@ -0,0 +1,142 @@
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+
+from .models import FulfillmentRequest, Order, OrderEvent, OutboxMessage
+from .wms import FULFILLMENT_TOPIC
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Summarize request latencies (seconds) measured over ``elapsed`` wall-clock seconds."""
+    values = sorted(latencies)
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(values) / elapsed, 1) if elapsed else None,
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "p50_ms": ms(percentile(values, 0.50)),
+        "p95_ms": ms(percentile(values, 0.95)),
+        "p99_ms": ms(percentile(values, 0.99)),
+        "max_ms": ms(values[-1]) if values else None,
+    }
+
+
+def run_concurrently(requests, concurrency):
+    """Call every ``request()`` from ``concurrency`` worker threads.
+
+    Each callable returns a ``(status, body)`` pair, as ``HttpClient.request``
+    does. Returns the ``summarize`` output, counting 4xx/5xx responses as
+    errors, and the responses in the order of ``requests``.
+    """
+    latencies = []
+
+    def timed(request):
+        started = time.perf_counter()
+        response = request()
+        latencies.append(time.perf_counter() - started)
+        return response
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        responses = list(pool.map(timed, requests))
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for status, _ in responses if status >= 400)
+    return summarize(latencies, elapsed, errors=errors), responses
+
+
+def compare(baseline, current, metrics=("p50_ms", "p95_ms", "p99_ms", "rps")):
+    """Relative change of ``metrics`` for every scenario present in both result sets."""
+    comparison = {}
+    for name, stats in current.items():
+        if name not in baseline:
+            continue
+        comparison[name] = {}
+        for metric in metrics:
+            before, after = baseline[name].get(metric), stats.get(metric)
+            change = round((after - before) / before * 100, 1) if before and after is not None else None
+            comparison[name][metric] = {"baseline": before, "current": after, "change_pct": change}
+    return comparison
+
+
+def delete_benchmark_orders(prefix):
+    """Delete the orders whose ``external_id`` starts with ``prefix``, their events and undelivered fulfillments.
+
+    The rollups are left as they are; run ``rebuild_rollups`` if the
+    database is used for anything after the benchmark.
+    """
+    orders = Order.objects.filter(external_id__startswith=prefix)
+    order_ids = list(orders.values_list("pk", flat=True))
+    fulfillment_ids = FulfillmentRequest.objects.filter(order_id__in=order_ids).values_list("pk", flat=True)
+    OutboxMessage.objects.filter(
+        topic=FULFILLMENT_TOPIC,
+        key__in=[f"fulfillment:{pk}" for pk in fulfillment_ids],
+        status=OutboxMessage.Status.PENDING,
+    ).delete()
+    OrderEvent.objects.filter(order_id__in=order_ids).delete()
+    orders.delete()
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def local_server(host="127.0.0.1", port=0):
+    """Serve the project's WSGI application from a background thread; yields its base URL."""
+    server = ThreadedWSGIServer((host, port), _QuietRequestHandler, allow_reuse_address=False)
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+class HttpClient:
+    """Minimal JSON-over-HTTP client; returns ``(status, decoded body)``."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, path, data=None):
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=body, method=method, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, self._decode(response.read())
+        except urllib.error.HTTPError as exc:
+            return exc.code, self._decode(exc.read())
+
+    @staticmethod
+    def _decode(content):
+        try:
+            return json.loads(content) if content else None
+        except ValueError:
+            # e.g. the HTML error page of a DEBUG server
+            return content.decode(errors="replace")
@@ -0,0 +1,121 @@
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from . import events, rollups, totals
+from .models import ArchivedOrder, Order, OrderItem
+from .serializers import BulkOrderSerializer
+
+
+class BulkResult:
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _existing_external_ids(external_ids, batch_size):
+    existing = set()
+    for chunk in _chunks(external_ids, batch_size):
+        live = Order.objects.filter(external_id__in=chunk).values_list("external_id", flat=True)
+        archived = ArchivedOrder.objects.filter(external_id__in=chunk).values_list("external_id", flat=True)
+        existing.update(live.union(archived, all=True))
+    return existing
+
+
+def _insert(accepted, batch_size):
+    with transaction.atomic():
+        orders = Order.objects.bulk_create(
+            [Order(**{k: v for k, v in data.items() if k != "items"}) for _, data in accepted],
+            batch_size=batch_size,
+        )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(order=order, **item)
+                for order, (_, data) in zip(orders, accepted)
+                for item in data["items"]
+            ],
+            batch_size=batch_size,
+        )
+        rollups.record_orders_created(orders)
+        events.record_created(orders)
+    return orders
+
+
+def bulk_create_orders(payloads, batch_size=None):
+    """Validate and insert many orders using batched INSERTs.
+
+    Returns a summary dict with one result per input payload, in input order.
+    """
+    batch_size = batch_size or settings.OMS_BULK_BATCH_SIZE
+    started = time.perf_counter()
+    results = [None] * len(payloads)
+    validated = []
+
+    child = BulkOrderSerializer(context={"batch_totals": True})
+    for index, payload in enumerate(payloads):
+        try:
+            validated.append((index, child.run_validation(payload)))
+        except serializers.ValidationError as exc:
+            results[index] = {
+                "index": index,
+                "external_id": payload.get("external_id") if isinstance(payload, dict) else None,
+                "status": BulkResult.INVALID,
+                "errors": exc.detail,
+            }
+
+    mismatches = set(totals.apply_totals([data for _, data in validated]))
+    for position in sorted(mismatches):
+        index, data = validated[position]
+        results[index] = {
+            "index": index,
+            "external_id": data["external_id"],
+            "status": BulkResult.INVALID,
+            "errors": serializers.as_serializer_error(serializers.ValidationError(totals.TOTAL_MISMATCH)),
+        }
+    validated = [entry for position, entry in enumerate(validated) if position not in mismatches]
+
+    for attempt in range(2):
+        existing = _existing_external_ids([data["external_id"] for _, data in validated], batch_size)
+        accepted = []
+        for index, data in validated:
+            external_id = data["external_id"]
+            if external_id in existing:
+                results[index] = {"index": index, "external_id": external_id, "status": BulkResult.DUPLICATE}
+                continue
+            existing.add(external_id)
+            accepted.append((index, data))
+        try:
+            orders = _insert(accepted, batch_size)
+            break
+        except IntegrityError:
+            # A concurrent writer inserted one of our external_ids between the
+            # duplicate check and the insert; re-check once before giving up.
+            if attempt:
+                raise
+
+    for order, (index, data) in zip(orders, accepted):
+        results[index] = {
+            "index": index,
+            "external_id": data["external_id"],
+            "status": BulkResult.CREATED,
+            "id": order.pk,
+        }
+
+    elapsed = time.perf_counter() - started
+    counts = {status: 0 for status in (BulkResult.CREATED, BulkResult.DUPLICATE, BulkResult.INVALID)}
+    for result in results:
+        counts[result["status"]] += 1
+    return {
+        "received": len(payloads),
+        **counts,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "orders_per_second": round(len(payloads) / elapsed, 1) if elapsed else None,
+        "results": results,
+    }
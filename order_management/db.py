@@ -0,0 +1,40 @@
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+LOCKED_MESSAGES = ("database is locked", "database table is locked")
+
+
+def is_database_locked(exc):
+    return isinstance(exc, OperationalError) and any(message in str(exc) for message in LOCKED_MESSAGES)
+
+
+def retry_on_database_locked(func):
+    """Run ``func`` in a transaction, retrying it when SQLite reports a lock.
+
+    SQLite allows a single writer; when ``busy_timeout`` runs out the write
+    fails with ``database is locked``. The whole transaction is retried with
+    jittered exponential backoff instead of surfacing a 500. Calls made inside
+    an outer transaction run once, since only the outermost block can be
+    restarted.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if transaction.get_connection().in_atomic_block:
+            return func(*args, **kwargs)
+        attempts = settings.OMS_DB_LOCK_RETRIES + 1
+        for attempt in range(attempts):
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if attempt == attempts - 1 or not is_database_locked(exc):
+                    raise
+            delay = settings.OMS_DB_LOCK_RETRY_BACKOFF * 2 ** attempt
+            time.sleep(delay + random.uniform(0, delay))
+
+    return wrapper
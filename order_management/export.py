@@ -0,0 +1,65 @@
+from django.conf import settings
+
+from .models import OrderItem
+
+ORDER_COLUMNS = [
+    "id",
+    "external_id",
+    "customer_id",
+    "status",
+    "total_amount",
+    "currency",
+    "created_at",
+    "updated_at",
+]
+ITEM_COLUMNS = ["product_id", "product_name", "quantity", "unit_price"]
+CSV_HEADER = ["order_id", *ORDER_COLUMNS[1:], *ITEM_COLUMNS]
+
+
+def _format(value):
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return str(value)
+
+
+def _attach_items(chunk):
+    items = {}
+    for item in (
+        OrderItem.objects.filter(order_id__in=[order["id"] for order in chunk])
+        .order_by("order_id", "id")
+        .values("order_id", *ITEM_COLUMNS)
+    ):
+        order_id = item.pop("order_id")
+        items.setdefault(order_id, []).append({key: _format(value) for key, value in item.items()})
+    for order in chunk:
+        record = {key: _format(order[key]) for key in ORDER_COLUMNS}
+        record["items"] = items.get(order["id"], [])
+        yield record
+
+
+def iter_orders(queryset, chunk_size=None):
+    """Yield export records (orders with embedded items) in primary key order.
+
+    Orders are read through a chunked iterator (a server-side cursor on
+    PostgreSQL) and items are fetched with one query per chunk, so memory use
+    is bounded by ``chunk_size`` regardless of the table size.
+    """
+    chunk_size = chunk_size or settings.OMS_EXPORT_CHUNK_SIZE
+    chunk = []
+    for order in queryset.order_by("id").values(*ORDER_COLUMNS).iterator(chunk_size=chunk_size):
+        chunk.append(order)
+        if len(chunk) >= chunk_size:
+            yield from _attach_items(chunk)
+            chunk = []
+    if chunk:
+        yield from _attach_items(chunk)
+
+
+def iter_csv_rows(records):
+    for record in records:
+        order = [record[key] for key in ORDER_COLUMNS]
+        for item in record["items"]:
+            yield [*order, *(item[key] for key in ITEM_COLUMNS)]
@@ -0,0 +1,192 @@
+"""Read-only rendering of orders, invoices and fulfillments from ``.values()`` rows.
+
+``ModelSerializer`` builds its fields, resolves attributes and wraps every row
+in an ``OrderedDict`` per instance; for list endpoints that overhead dominates
+the request. The functions here take plain dicts and produce exactly the
+representation of the corresponding serializer (same keys, same order, same
+formatting), formatting values with the serializer's own field classes.
+"""
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from . import metrics
+from .models import OrderItem
+from .serializers import ORDER_FIELDS, OrderSerializer
+
+ORDER_VALUES = (
+    "id",
+    "external_id",
+    "customer_id",
+    "status",
+    "total_amount",
+    "currency",
+    "created_at",
+    "updated_at",
+    "item_count",
+)
+DEFAULT_ORDER_FIELDS = tuple(OrderSerializer.Meta.fields)
+INVOICE_VALUES = ("id", "order_id", "amount", "status", "issued_at", "paid_at", "payment_method", "updated_at")
+FULFILLMENT_VALUES = ("id", "order_id", "warehouse_code", "status", "created_at", "updated_at")
+
+_money = serializers.DecimalField(max_digits=10, decimal_places=2)
+_datetime = serializers.DateTimeField()
+
+
+def _decimal(value):
+    return _money.to_representation(value)
+
+
+def _timestamp(value):
+    return _datetime.to_representation(value)
+
+
+def items_by_order(order_ids):
+    """Rendered items of ``order_ids``, by order id."""
+    items = {}
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .order_by("order_id", "id")
+        .values_list("order_id", "product_id", "product_name", "quantity", "unit_price")
+    )
+    for order_id, product_id, product_name, quantity, unit_price in rows:
+        items.setdefault(order_id, []).append(
+            {
+                "product_id": product_id,
+                "product_name": product_name,
+                "quantity": quantity,
+                "unit_price": _decimal(unit_price),
+            }
+        )
+    return items
+
+
+_ORDER_FORMATS = {"total_amount": _decimal, "created_at": _timestamp, "updated_at": _timestamp}
+
+
+def order_fields(query_params):
+    """Fields requested by ``?fields=`` / ``?include=items`` (``None`` for the full representation).
+
+    ``?items=false`` alone selects the full representation with ``item_count``
+    in place of the items.
+    """
+    include = [name for name in query_params.get("include", "").split(",") if name]
+    if set(include) - {"items"}:
+        raise serializers.ValidationError({"include": "Only 'items' can be included."})
+    requested = [name for name in query_params.get("fields", "").split(",") if name]
+    if not requested:
+        if query_params.get("items", "").lower() in ("false", "0"):
+            return tuple("item_count" if name == "items" else name for name in DEFAULT_ORDER_FIELDS)
+        return None
+    unknown = sorted(set(requested) - set(ORDER_FIELDS))
+    if unknown:
+        raise serializers.ValidationError({"fields": f"Unknown field(s): {', '.join(unknown)}."})
+    requested += include
+    return tuple(name for name in ORDER_FIELDS if name in requested)
+
+
+def order_columns(fields):
+    """``Order`` columns to load for ``fields``; ``id`` and ``created_at`` are always kept for paging and items."""
+    if fields is None:
+        return ORDER_VALUES
+    return tuple(name for name in ORDER_VALUES if name in fields or name in ("id", "created_at"))
+
+
+def render_orders(rows, fields=None, items=None):
+    """Render ``Order`` rows as ``OrderSerializer(fields=fields)`` would, with one query for the items.
+
+    Rows need the ``order_columns(fields)`` values; the items are only
+    queried when ``fields`` contains them and ``items`` (rendered items by
+    order id) is not given.
+    """
+    fields = DEFAULT_ORDER_FIELDS if fields is None else fields
+    rows = list(rows)
+    if items is not None:
+        lines = items
+    else:
+        lines = items_by_order([row["id"] for row in rows]) if rows and "items" in fields else {}
+    plan = [(name, _ORDER_FORMATS.get(name)) for name in fields]
+    data = []
+    for row in rows:
+        order = {}
+        for name, format_value in plan:
+            if name == "items":
+                order[name] = lines.get(row["id"], [])
+            elif format_value is None:
+                order[name] = row[name]
+            else:
+                order[name] = format_value(row[name])
+        data.append(order)
+    return data
+
+
+def render_invoices(rows):
+    """Render ``Invoice`` rows (``INVOICE_VALUES``) as ``InvoiceSerializer`` would."""
+    return [
+        {
+            "id": row["id"],
+            "order": row["order_id"],
+            "amount": _decimal(row["amount"]),
+            "status": row["status"],
+            "issued_at": _timestamp(row["issued_at"]),
+            "paid_at": _timestamp(row["paid_at"]),
+            "payment_method": row["payment_method"],
+            "updated_at": _timestamp(row["updated_at"]),
+        }
+        for row in rows
+    ]
+
+
+def render_fulfillments(rows):
+    """Render ``FulfillmentRequest`` rows (``FULFILLMENT_VALUES``) as ``FulfillmentRequestSerializer`` would."""
+    return [
+        {
+            "id": row["id"],
+            "order": row["order_id"],
+            "warehouse_code": row["warehouse_code"],
+            "status": row["status"],
+            "created_at": _timestamp(row["created_at"]),
+            "updated_at": _timestamp(row["updated_at"]),
+        }
+        for row in rows
+    ]
+
+
+class FastListMixin:
+    """Serve ``list`` from ``fast_values`` rows rendered by ``fast_render``.
+
+    Filtering and keyset pagination run unchanged on the ``.values()``
+    queryset; writes and other actions keep using ``serializer_class``.
+    """
+
+    fast_values = ()
+
+    def get_fast_values(self):
+        return self.fast_values
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.select_related(None).prefetch_related(None).values(*self.get_fast_values())
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        with metrics.timer("serialize"):
+            data = self.fast_render(rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class OrderFastListMixin(FastListMixin):
+    """``FastListMixin`` for orders, honouring ``?fields=``, ``?include=items`` and ``?items=false``.
+
+    Only the requested columns are selected, and the items are only queried
+    when they are part of the response.
+    """
+
+    fast_values = ORDER_VALUES
+
+    def get_fast_values(self):
+        self.order_fields = order_fields(self.request.query_params)
+        return order_columns(self.order_fields)
+
+    def fast_render(self, rows):
+        return render_orders(rows, self.order_fields)
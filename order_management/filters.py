@@ -0,0 +1,65 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+
+RANGE_LOOKUPS = ("__gt", "__gte", "__lt", "__lte")
+
+
+def parse_timestamp(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+ORDER_FILTER_PARAMS = {
+    "status": "status__in",
+    "customer_id": "customer_id",
+    "currency": "currency",
+    "created_after": "created_at__gte",
+    "created_before": "created_at__lt",
+    "updated_after": "updated_at__gte",
+    "updated_before": "updated_at__lt",
+}
+
+
+def filter_by_params(queryset, filter_params, params):
+    """Filter ``queryset`` by ``params`` (a query dict or plain dict) through ``filter_params``.
+
+    ``__in`` lookups accept comma-separated values, range lookups accept an
+    ISO date or datetime.
+    """
+    filters = {}
+    errors = {}
+    for param, lookup in filter_params.items():
+        value = params.get(param)
+        if value in (None, ""):
+            continue
+        if lookup.endswith("__in"):
+            value = value.split(",")
+        elif lookup.endswith(RANGE_LOOKUPS):
+            try:
+                value = parse_timestamp(value)
+            except ValueError:
+                errors[param] = ["Expected an ISO 8601 date or datetime."]
+                continue
+        filters[lookup] = value
+    if errors:
+        raise serializers.ValidationError(errors)
+    return queryset.filter(**filters)
+
+
+class QueryParamFilterBackend(BaseFilterBackend):
+    """Apply ``view.filter_params`` (query parameter -> ORM lookup) to the queryset."""
+
+    def filter_queryset(self, request, queryset, view):
+        return filter_by_params(queryset, getattr(view, "filter_params", {}), request.query_params)
@@ -0,0 +1,108 @@
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from .db import retry_on_database_locked
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(request):
+    payload = json.dumps(request.data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{payload}".encode()).hexdigest()
+
+
+def lookup(key):
+    stored = IdempotencyKey.objects.filter(key=key).first()
+    if stored is not None and stored.expires_at <= timezone.now():
+        stored.delete()
+        return None
+    return stored
+
+
+def reserve(key, request, fingerprint):
+    """Insert ``key`` without a response; a concurrent request with the same key waits here until this one ends."""
+    return IdempotencyKey.objects.create(
+        key=key,
+        method=request.method,
+        path=request.path,
+        request_hash=fingerprint,
+        response_status=0,
+        response_body={},
+        expires_at=timezone.now() + datetime.timedelta(seconds=settings.OMS_IDEMPOTENCY_TTL),
+    )
+
+
+def remember(reserved, response):
+    IdempotencyKey.objects.filter(pk=reserved.pk).update(
+        response_status=response.status_code, response_body=response.data
+    )
+
+
+def purge_expired(batch_size=1000):
+    deleted = 0
+    while True:
+        pks = list(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=pks).delete()[0]
+
+
+class IdempotentCreateMixin:
+    """Replay the stored response of a POST carrying an already seen Idempotency-Key.
+
+    The key is stored in the same transaction as the write it describes, so a
+    key is only ever recorded for a committed create. It is inserted before
+    the create, so a concurrent request with the same key blocks on the
+    unique index before writing anything (in particular, before the order
+    event: see ``events``), and the response is filled in afterwards. Retries
+    are answered from the store with a single indexed lookup and never reach
+    the serializer.
+    """
+
+    @retry_on_database_locked
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().post(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            return Response({"detail": f"{IDEMPOTENCY_HEADER} is too long."}, status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = request_fingerprint(request)
+        stored = lookup(key)
+        if stored is not None:
+            return self.replay(stored, fingerprint)
+
+        try:
+            with transaction.atomic():
+                reserved = reserve(key, request, fingerprint)
+                response = super().post(request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    remember(reserved, response)
+                else:
+                    reserved.delete()
+                return response
+        except (IntegrityError, serializers.ValidationError):
+            # A concurrent request with the same key may have committed first.
+            stored = lookup(key)
+            if stored is None:
+                raise
+            return self.replay(stored, fingerprint)
+
+    def replay(self, stored, fingerprint):
+        if stored.request_hash != fingerprint:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(stored.response_body, status=stored.response_status, headers={REPLAYED_HEADER: "true"})
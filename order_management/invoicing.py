@@ -0,0 +1,125 @@
+"""End-of-day bulk invoicing.
+
+Orders without an invoice are found with an anti-join (``NOT EXISTS`` on the
+invoice's unique ``order_id`` index) and walked in primary key order. Each
+chunk is selected, locked and invoiced with one multi-row ``INSERT`` in its
+own transaction, so a large run neither holds one long transaction nor
+re-reads orders it has already invoiced.
+"""
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef
+
+from . import rollups
+from .db import retry_on_database_locked
+from .models import Invoice, Order
+
+INVOICEABLE_STATUSES = (Order.Status.CONFIRMED, Order.Status.FULFILLMENT_REQUESTED, Order.Status.COMPLETED)
+
+# PostgreSQL's limit on bind parameters per statement.
+MAX_QUERY_PARAMS = 65535
+
+
+def uninvoiced_orders(statuses=INVOICEABLE_STATUSES, created_before=None):
+    orders = Order.objects.filter(status__in=statuses).filter(~Exists(Invoice.objects.filter(order=OuterRef("pk"))))
+    if created_before is not None:
+        orders = orders.filter(created_at__lt=created_before)
+    return orders
+
+
+def _insert_invoices(invoices):
+    """INSERT ``invoices``, skipping orders that already have one; returns the inserted ones.
+
+    Rows are sent in as few statements as the database's bind parameter
+    limit allows.
+    """
+    fields = [field for field in Invoice._meta.concrete_fields if not field.primary_key]
+    batch_size = min(connection.ops.bulk_batch_size(fields, invoices), MAX_QUERY_PARAMS // len(fields))
+    quote = connection.ops.quote_name
+    order_column = quote(Invoice._meta.get_field("order").column)
+    row = f"({', '.join(['%s'] * len(fields))})"
+    inserted = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(invoices), batch_size):
+            batch = invoices[start : start + batch_size]
+            params = [
+                field.get_db_prep_save(field.pre_save(invoice, add=True), connection)
+                for invoice in batch
+                for field in fields
+            ]
+            cursor.execute(
+                f"INSERT INTO {quote(Invoice._meta.db_table)} ({', '.join(quote(field.column) for field in fields)}) "
+                f"VALUES {', '.join([row] * len(batch))} "
+                f"ON CONFLICT ({order_column}) DO NOTHING RETURNING {order_column}",
+                params,
+            )
+            inserted.update(order_id for (order_id,) in cursor.fetchall())
+    return [invoice for invoice in invoices if invoice.order_id in inserted]
+
+
+@retry_on_database_locked
+def _invoice_chunk(orders, after, size, payment_method):
+    """Invoice the next ``size`` uninvoiced orders after ``after``; returns the locked rows and the new invoices."""
+    rows = list(
+        orders.filter(pk__gt=after)
+        .order_by("pk")
+        .select_for_update()
+        .values_list("pk", "total_amount", "currency")[:size]
+    )
+    if not rows:
+        return rows, []
+    # The API invoices an order under its row lock too, but under READ
+    # COMMITTED the anti-join is evaluated on the snapshot taken when the
+    # SELECT started: if it waited for the lock of an order being invoiced
+    # through the API, it still locks and returns that order once the API
+    # transaction commits. The insert skips such orders, and they are left
+    # out of the rollups.
+    invoices = _insert_invoices(
+        [
+            Invoice(order_id=pk, amount=total_amount, status=Invoice.Status.ISSUED, payment_method=payment_method)
+            for pk, total_amount, _ in rows
+        ]
+    )
+    currencies = {pk: currency for pk, _, currency in rows}
+    rollups.record_invoices_created([(invoice, currencies[invoice.order_id]) for invoice in invoices])
+    return rows, invoices
+
+
+def bulk_invoice(
+    statuses=INVOICEABLE_STATUSES, created_before=None, limit=None, payment_method="COD", chunk_size=None, progress=None
+):
+    """Issue an invoice for the total of every uninvoiced order in ``statuses``.
+
+    Returns counts and timing; at most ``limit`` orders are invoiced when given.
+    ``progress`` is called with the number of invoices issued so far after
+    each committed chunk; an exception it raises stops the run there.
+    """
+    if Order.Status.CANCELLED in statuses:
+        raise ValueError("Cancelled orders cannot be invoiced.")
+    chunk_size = chunk_size or settings.OMS_BULK_INVOICE_CHUNK_SIZE
+    orders = uninvoiced_orders(statuses, created_before)
+    started = time.perf_counter()
+    invoiced = chunks = 0
+    after = 0
+    while limit is None or invoiced < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - invoiced)
+        rows, invoices = _invoice_chunk(orders, after, size, payment_method)
+        if not rows:
+            break
+        invoiced += len(invoices)
+        chunks += 1
+        after = rows[-1][0]
+        if progress is not None:
+            progress(invoiced)
+        if len(rows) < size:
+            break
+
+    elapsed = time.perf_counter() - started
+    return {
+        "invoiced": invoiced,
+        "chunks": chunks,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "invoices_per_second": round(invoiced / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,312 @@
+"""Database-backed queue for long-running operations.
+
+Clients submit a job and poll it instead of holding a request open. ``Worker``
+(``python manage.py run_jobs``) claims runnable jobs with a lease, the way the
+outbox dispatcher claims messages, and runs them on a pool of worker
+processes, so the queue needs nothing but the database.
+
+A handler takes the job and a ``Progress`` and returns the job's result.
+``Progress`` records how far the job got, renews the lease and raises
+``JobCancelled`` once a cancellation was requested, so handlers stop between
+committed chunks. A job whose worker died is run again, which every handler
+tolerates: imports report already created orders as duplicates, invoicing
+and archival only pick up the work that is left and exports rewrite their
+file.
+"""
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import archiving, invoicing
+from .bulk import BulkResult, bulk_create_orders
+from .export import CSV_HEADER, iter_csv_rows, iter_orders
+from .filters import ORDER_FILTER_PARAMS, filter_by_params
+from .models import Job, Order
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import BulkInvoiceSerializer
+
+logger = logging.getLogger(__name__)
+
+EXPORT_RENDERERS = {renderer.format: renderer for renderer in (NDJSONRenderer, CSVRenderer)}
+
+
+class JobCancelled(Exception):
+    """Raised by ``Progress`` when the job was cancelled or its lease taken over."""
+
+
+def submit(kind, params):
+    return Job.objects.create(kind=kind, params=params)
+
+
+def cancel(job_id):
+    """Cancel a queued job, or ask a running one to stop at its next progress report.
+
+    Returns the job (without its ``params``), or ``None`` if it does not exist.
+    """
+    now = timezone.now()
+    Job.objects.filter(pk=job_id, status=Job.Status.QUEUED).update(
+        status=Job.Status.CANCELLED, cancel_requested=True, finished_at=now, updated_at=now
+    )
+    Job.objects.filter(pk=job_id, status=Job.Status.RUNNING).update(cancel_requested=True, updated_at=now)
+    return Job.objects.defer("params").filter(pk=job_id).first()
+
+
+def _expire(now, max_attempts):
+    """Settle running jobs whose worker is gone and that must not run again."""
+    expired = Job.objects.filter(status=Job.Status.RUNNING, lease_expires_at__lt=now)
+    finished = {"lock_token": None, "lease_expires_at": None, "finished_at": now, "updated_at": now}
+    expired.filter(cancel_requested=True).update(status=Job.Status.CANCELLED, **finished)
+    expired.filter(attempts__gte=max_attempts).update(
+        status=Job.Status.FAILED, error=f"Worker lost {max_attempts} times.", **finished
+    )
+
+
+def claim(limit, lease, max_attempts=None):
+    """Lease up to ``limit`` runnable jobs (queued, or running with an expired lease) and return them, oldest first.
+
+    The jobs are returned without their ``params``, which can be large; ``run`` loads them.
+    """
+    max_attempts = max_attempts or settings.OMS_JOB_MAX_ATTEMPTS
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    runnable = Q(status=Job.Status.QUEUED) | Q(status=Job.Status.RUNNING, lease_expires_at__lt=now)
+    with transaction.atomic():
+        _expire(now, max_attempts)
+        jobs = Job.objects.filter(runnable).order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            jobs = jobs.select_for_update(skip_locked=True)
+        ids = list(jobs.values_list("id", flat=True)[:limit])
+        if not ids:
+            return []
+        # The filter is repeated so a concurrent worker cannot claim the same jobs.
+        Job.objects.filter(runnable, id__in=ids).update(
+            status=Job.Status.RUNNING,
+            lock_token=token,
+            lease_expires_at=now + timedelta(seconds=lease),
+            attempts=F("attempts") + 1,
+            started_at=now,
+            updated_at=now,
+        )
+    return list(Job.objects.defer("params").filter(lock_token=token).order_by("id"))
+
+
+class Progress:
+    """Progress reporter passed to handlers: ``progress(done, total=None)``.
+
+    Reports are written at most every ``OMS_JOB_PROGRESS_INTERVAL`` seconds
+    (or always with ``force=True``); each write renews the lease and raises
+    ``JobCancelled`` if the job should stop.
+    """
+
+    def __init__(self, job, lease=None, interval=None):
+        self.job_id = job.pk
+        self.token = job.lock_token
+        self.lease = lease or settings.OMS_JOB_LEASE
+        self.interval = settings.OMS_JOB_PROGRESS_INTERVAL if interval is None else interval
+        self.reported_at = None
+
+    def __call__(self, done, total=None, force=False):
+        if not force and self.reported_at is not None and time.monotonic() - self.reported_at < self.interval:
+            return
+        self.reported_at = time.monotonic()
+        now = timezone.now()
+        fields = {"progress": done, "lease_expires_at": now + timedelta(seconds=self.lease), "updated_at": now}
+        if total is not None:
+            fields["total"] = total
+        if not Job.objects.filter(pk=self.job_id, lock_token=self.token, cancel_requested=False).update(**fields):
+            raise JobCancelled()
+
+
+def output_path(job_id, export_format):
+    """File export job ``job_id`` writes its orders to, in ``export_format``."""
+    return Path(settings.OMS_JOB_OUTPUT_DIR) / f"job-{job_id}.{export_format}"
+
+
+def run_bulk_import(job, progress):
+    payloads = job.params["orders"]
+    chunk_size = settings.OMS_JOB_IMPORT_CHUNK_SIZE
+    summary = {"received": len(payloads), BulkResult.CREATED: 0, BulkResult.DUPLICATE: 0, BulkResult.INVALID: 0}
+    rejected = []
+    progress(0, total=len(payloads), force=True)
+    for start in range(0, len(payloads), chunk_size):
+        result = bulk_create_orders(payloads[start : start + chunk_size])
+        for name in (BulkResult.CREATED, BulkResult.DUPLICATE, BulkResult.INVALID):
+            summary[name] += result[name]
+        rejected += [
+            {**entry, "index": entry["index"] + start}
+            for entry in result["results"]
+            if entry["status"] != BulkResult.CREATED
+        ]
+        progress(start + len(result["results"]))
+    return {**summary, "rejected": rejected}
+
+
+def run_bulk_invoice(job, progress):
+    serializer = BulkInvoiceSerializer(data=job.params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+    statuses = params.get("status") or invoicing.INVOICEABLE_STATUSES
+    total = invoicing.uninvoiced_orders(statuses, params.get("created_before")).count()
+    if params.get("limit") is not None:
+        total = min(total, params["limit"])
+    progress(0, total=total, force=True)
+    return invoicing.bulk_invoice(
+        statuses=statuses,
+        created_before=params.get("created_before"),
+        limit=params.get("limit"),
+        payment_method=params["payment_method"],
+        progress=progress,
+    )
+
+
+def run_export(job, progress):
+    queryset = filter_by_params(Order.objects.all(), ORDER_FILTER_PARAMS, job.params.get("filters", {}))
+    progress(0, total=queryset.count(), force=True)
+    exported = 0
+
+    def counted(records):
+        nonlocal exported
+        for record in records:
+            yield record
+            exported += 1
+            if exported % settings.OMS_EXPORT_CHUNK_SIZE == 0:
+                progress(exported)
+
+    renderer = EXPORT_RENDERERS[job.params["format"]]()
+    records = counted(iter_orders(queryset))
+    if renderer.format == CSVRenderer.format:
+        content = renderer.stream(iter_csv_rows(records), header=CSV_HEADER)
+    else:
+        content = renderer.stream(records)
+    path = output_path(job.pk, renderer.format)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.part")
+    with open(partial, "wb") as output:
+        for chunk in content:
+            output.write(chunk)
+    partial.replace(path)
+    progress(exported, force=True)
+    return {"orders": exported, "format": renderer.format, "size": path.stat().st_size}
+
+
+def run_archive(job, progress):
+    older_than = None
+    if job.params.get("older_than_days") is not None:
+        older_than = timezone.now() - timedelta(days=job.params["older_than_days"])
+    total = archiving.archivable_orders(older_than).count()
+    if job.params.get("limit") is not None:
+        total = min(total, job.params["limit"])
+    progress(0, total=total, force=True)
+    return archiving.archive_orders(older_than=older_than, limit=job.params.get("limit"), progress=progress)
+
+
+HANDLERS = {
+    Job.Kind.BULK_IMPORT: run_bulk_import,
+    Job.Kind.BULK_INVOICE: run_bulk_invoice,
+    Job.Kind.EXPORT: run_export,
+    Job.Kind.ARCHIVE: run_archive,
+}
+
+
+def _finish(job, status, result=None, error=""):
+    now = timezone.now()
+    Job.objects.filter(pk=job.pk, lock_token=job.lock_token).update(
+        status=status,
+        result=result,
+        error=error[:2000],
+        lock_token=None,
+        lease_expires_at=None,
+        finished_at=now,
+        updated_at=now,
+    )
+
+
+def run(job_id, token):
+    """Run a claimed job and record its outcome; returns the final status (``None`` if the lease was lost)."""
+    job = Job.objects.filter(pk=job_id, lock_token=token).first()
+    if job is None:
+        return None
+    try:
+        result = HANDLERS[job.kind](job, Progress(job))
+    except JobCancelled:
+        status = Job.Status.CANCELLED
+        _finish(job, status)
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        status = Job.Status.FAILED
+        _finish(job, status, error=str(exc) or exc.__class__.__name__)
+    else:
+        status = Job.Status.SUCCEEDED
+        _finish(job, status, result=result)
+    return status
+
+
+def _run_in_process(job_id, token):
+    # Pool processes outlive their jobs, so connections are recycled around
+    # each job as they are around a request.
+    close_old_connections()
+    try:
+        return run(job_id, token)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    """Claim jobs and run them on ``processes`` worker processes, or inline in this process when 0."""
+
+    def __init__(self, processes=None, lease=None):
+        self.processes = settings.OMS_JOB_PROCESSES if processes is None else processes
+        self.lease = lease or settings.OMS_JOB_LEASE
+        self.pool = self._new_pool() if self.processes else None
+        self.running = {}
+
+    def _new_pool(self):
+        # Spawned rather than forked, so no process inherits the parent's
+        # database connection.
+        return ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"), initializer=django.setup
+        )
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def run_once(self):
+        """Collect finished jobs and start runnable ones on the free processes; returns the number started."""
+        for future in [future for future in self.running if future.done()]:
+            job_id = self.running.pop(future)
+            exc = future.exception()
+            if exc is not None:
+                # The job stays RUNNING and is claimed again once its lease expires.
+                logger.error("Job %s lost its worker process: %s", job_id, exc)
+                if isinstance(exc, BrokenProcessPool):
+                    self.pool.shutdown(wait=False)
+                    self.pool = self._new_pool()
+
+        free = max(self.processes, 1) - len(self.running)
+        if free <= 0:
+            return 0
+        jobs = claim(free, self.lease)
+        for job in jobs:
+            if self.pool is None:
+                run(job.pk, job.lock_token)
+            else:
+                self.running[self.pool.submit(_run_in_process, job.pk, job.lock_token)] = job.pk
+        return len(jobs)
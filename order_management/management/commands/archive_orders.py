@@ -0,0 +1,38 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from order_management import archiving
+
+
+class Command(BaseCommand):
+    help = "Move completed and cancelled orders older than the retention window to the archive tables, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=None,
+            help="Archive orders last updated more than N days ago (default: OMS_ARCHIVE_RETENTION_DAYS).",
+        )
+        parser.add_argument("--limit", type=int, default=None, help="Archive at most N orders.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Defaults to OMS_ARCHIVE_BATCH_SIZE.")
+        parser.add_argument(
+            "--pause", type=float, default=None, help="Seconds between batches (default: OMS_ARCHIVE_BATCH_PAUSE)."
+        )
+
+    def handle(self, *args, **options):
+        older_than = None
+        if options["older_than_days"] is not None:
+            if options["older_than_days"] < 0:
+                raise CommandError("--older-than-days must not be negative.")
+            older_than = timezone.now() - timedelta(days=options["older_than_days"])
+        summary = archiving.archive_orders(
+            older_than=older_than,
+            limit=options["limit"],
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+        )
+        self.stdout.write(json.dumps(summary))
@@ -0,0 +1,178 @@
+import datetime
+import json
+import platform
+import random
+import subprocess
+import uuid
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from order_management.benchmarking import (
+    HttpClient,
+    compare,
+    delete_benchmark_orders,
+    local_server,
+    run_concurrently,
+)
+from order_management.models import FulfillmentRequest, Invoice, Order, OrderItem
+
+READ_SCENARIOS = {
+    "order_list": "/api/orders/create?limit=50",
+    "order_list_by_status": "/api/orders/create?limit=50&status=PENDING",
+    "order_list_by_customer": "/api/orders/create?limit=50&customer_id={customer_id}",
+    "invoice_list": "/api/oms/invoice?limit=50",
+    "fulfillment_list": "/api/oms/fulfillment?limit=50",
+    "sales_summary": "/api/analytics/sales",
+}
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the order, invoice and fulfillment endpoints and write p50/p95/p99 latency and "
+        "requests/second per scenario as JSON. Starts a threaded local server in-process unless --url "
+        "is given. Seed data first with seed_orders. The write scenarios create orders, invoices and "
+        "fulfillments, so they only run against a disposable database (--allow-cleanup) or with --keep."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--url", help="Benchmark an already running server sharing this database.")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument("--baseline", help="A previous report to compare against.")
+        parser.add_argument("--read-only", action="store_true", help="Skip the write scenarios.")
+        parser.add_argument("--keep", action="store_true", help="Keep the orders created by the benchmark.")
+        parser.add_argument(
+            "--allow-cleanup",
+            action="store_true",
+            help="The database is a disposable benchmark database: delete the benchmark's orders afterwards.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as fh:
+                    baseline = json.load(fh)["scenarios"]
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Cannot read baseline report: {exc}")
+        if not (options["read_only"] or options["keep"] or options["allow_cleanup"]):
+            raise CommandError(
+                "The write scenarios create and then delete orders in this database "
+                f"({connection.settings_dict['NAME']}). Pass --allow-cleanup if it is a disposable "
+                "benchmark database, --keep to leave the orders in place, or --read-only."
+            )
+
+        self.rng = random.Random(options["seed"])
+        self.requests = options["requests"]
+        self.concurrency = options["concurrency"]
+        self.prefix = f"BENCH-API-{uuid.uuid4().hex[:8]}"
+        report = {"meta": self.meta(options)}
+        try:
+            if options["url"]:
+                scenarios = self.run(HttpClient(options["url"]), options["read_only"])
+            else:
+                with local_server() as url:
+                    scenarios = self.run(HttpClient(url), options["read_only"])
+        finally:
+            if not options["keep"]:
+                delete_benchmark_orders(self.prefix)
+        report["scenarios"] = scenarios
+        if baseline is not None:
+            report["comparison"] = compare(baseline, scenarios)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def meta(self, options):
+        return {
+            "commit": _git_commit(),
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "rows": {
+                "orders": Order.objects.count(),
+                "items": OrderItem.objects.count(),
+                "invoices": Invoice.objects.count(),
+                "fulfillments": FulfillmentRequest.objects.count(),
+            },
+        }
+
+    def measure(self, calls):
+        return run_concurrently(calls, self.concurrency)
+
+    def run(self, client, read_only):
+        results = {}
+        customers = list(Order.objects.values_list("customer_id", flat=True)[:100]) or ["CUST-0"]
+        for name, path in READ_SCENARIOS.items():
+            paths = [path.format(customer_id=self.rng.choice(customers)) for _ in range(self.requests)]
+            results[name], _ = self.measure([lambda p=p: client.request("GET", p) for p in paths])
+
+        status, body = client.request("GET", f"/api/orders/create?limit={min(self.requests, 500)}")
+        ids = [order["id"] for order in body["results"]] if status == 200 else []
+        if ids:
+            results["order_detail"], _ = self.measure(
+                [lambda pk=self.rng.choice(ids): client.request("GET", f"/api/orders/update/{pk}") for _ in ids]
+            )
+        if read_only:
+            return results
+
+        payloads = [self.order_payload(i) for i in range(self.requests)]
+        results["order_create"], responses = self.measure(
+            [lambda data=data: client.request("POST", "/api/orders/create", data) for data in payloads]
+        )
+        created = [body for status, body in responses if status == 201]
+        results["order_status_update"], _ = self.measure(
+            [
+                lambda pk=order["id"]: client.request("PATCH", f"/api/orders/update/{pk}", {"status": "CONFIRMED"})
+                for order in created
+            ]
+        )
+        results["invoice_create"], _ = self.measure(
+            [
+                lambda order=order: client.request(
+                    "POST", "/api/oms/invoice", {"order": order["id"], "amount": order["total_amount"]}
+                )
+                for order in created
+            ]
+        )
+        results["fulfillment_create"], _ = self.measure(
+            [
+                lambda pk=order["id"]: client.request(
+                    "POST", "/api/oms/fulfillment", {"order": pk, "warehouse_code": "WH-BENCH"}
+                )
+                for order in created
+            ]
+        )
+        return results
+
+    def order_payload(self, index):
+        quantity = self.rng.randint(1, 3)
+        return {
+            "external_id": f"{self.prefix}-{index}",
+            "customer_id": f"CUST-{self.rng.randrange(10_000)}",
+            "total_amount": f"{quantity * 10 + 5}.00",
+            "currency": "TND",
+            "items": [
+                {"product_id": "SKU-1", "product_name": "A", "quantity": quantity, "unit_price": "10.00"},
+                {"product_id": "SKU-2", "product_name": "B", "quantity": 1, "unit_price": "5.00"},
+            ],
+        }
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, override_settings
+
+from order_management.benchmarking import delete_benchmark_orders, summarize
+
+PATHS = {
+    "sync": {"create": "/api/orders/create", "detail": "/api/orders/update/{pk}"},
+    "async": {"create": "/api/async/orders", "detail": "/api/async/orders/{pk}"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the DRF (sync) and ASGI-native order endpoints under concurrent load, "
+        "driving both through Django's ASGI handler in-process. Orders are created in the configured "
+        "database, so the command only runs against a disposable database (--allow-cleanup) or with --keep."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--keep", action="store_true", help="Keep the orders created by the benchmark.")
+        parser.add_argument(
+            "--allow-cleanup",
+            action="store_true",
+            help="The database is a disposable benchmark database: delete the benchmark's orders afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        if not (options["keep"] or options["allow_cleanup"]):
+            raise CommandError(
+                "The benchmark creates and then deletes orders in this database "
+                f"({connection.settings_dict['NAME']}). Pass --allow-cleanup if it is a disposable "
+                "benchmark database, or --keep to leave the orders in place."
+            )
+        prefix = f"BENCH-ASYNC-{uuid.uuid4().hex[:8]}"
+        try:
+            # The in-process client always sends "Host: testserver".
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                results = asyncio.run(self.run(prefix, options["requests"], options["concurrency"]))
+        finally:
+            if not options["keep"]:
+                delete_benchmark_orders(prefix)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    async def run(self, prefix, requests, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        results = {}
+        for mode, paths in PATHS.items():
+            payloads = [self.payload(f"{prefix}-{mode}-{i}") for i in range(requests)]
+            created, results[f"{mode}_create"] = await self.measure(
+                semaphore,
+                [client.post(paths["create"], payload, content_type="application/json") for payload in payloads],
+            )
+            ids = [response.json()["id"] for response in created if response.status_code == 201]
+            _, results[f"{mode}_detail"] = await self.measure(
+                semaphore, [client.get(paths["detail"].format(pk=pk)) for pk in ids]
+            )
+            _, results[f"{mode}_status_update"] = await self.measure(
+                semaphore,
+                [
+                    client.patch(paths["detail"].format(pk=pk), {"status": "CONFIRMED"}, content_type="application/json")
+                    for pk in ids
+                ],
+            )
+        return results
+
+    async def measure(self, semaphore, requests):
+        latencies = []
+
+        async def timed(request):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await request
+                latencies.append(time.perf_counter() - started)
+                return response
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(timed(request) for request in requests))
+        elapsed = time.perf_counter() - started
+        errors = sum(1 for response in responses if response.status_code >= 400)
+        return responses, summarize(latencies, elapsed, errors=errors)
+
+    @staticmethod
+    def payload(external_id):
+        return {
+            "external_id": external_id,
+            "customer_id": "BENCH",
+            "total_amount": "30.00",
+            "currency": "TND",
+            "items": [
+                {"product_id": "SKU-1", "product_name": "A", "quantity": 1, "unit_price": "10.00"},
+                {"product_id": "SKU-2", "product_name": "B", "quantity": 2, "unit_price": "10.00"},
+            ],
+        }
@@ -0,0 +1,100 @@
+import json
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from order_management import fastpath
+from order_management.benchmarking import summarize
+from order_management.models import FulfillmentRequest, Invoice, Order, OrderItem
+from order_management.renderers import ORJSONRenderer
+from order_management.serializers import FulfillmentRequestSerializer, InvoiceSerializer, OrderSerializer
+
+SCENARIOS = {
+    "orders": (
+        lambda: Order.objects.order_by("id").prefetch_related(
+            Prefetch("items", queryset=OrderItem.objects.order_by("id"))
+        ),
+        OrderSerializer,
+        lambda: Order.objects.order_by("id").values(*fastpath.ORDER_VALUES),
+        fastpath.render_orders,
+    ),
+    "invoices": (
+        lambda: Invoice.objects.order_by("id").select_related("order"),
+        InvoiceSerializer,
+        lambda: Invoice.objects.order_by("id").values(*fastpath.INVOICE_VALUES),
+        fastpath.render_invoices,
+    ),
+    "fulfillments": (
+        lambda: FulfillmentRequest.objects.order_by("id").select_related("order"),
+        FulfillmentRequestSerializer,
+        lambda: FulfillmentRequest.objects.order_by("id").values(*fastpath.FULFILLMENT_VALUES),
+        fastpath.render_fulfillments,
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rendering lists with the DRF serializers and JSONRenderer against the "
+        ".values() fast path and ORJSONRenderer. Runs on generated rows in a transaction "
+        "that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Orders (and invoices, fulfillments) to generate.")
+        parser.add_argument("--items", type=int, default=3, help="Items per order.")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        results = {}
+        with transaction.atomic():
+            self.seed(options["rows"], options["items"])
+            for name, (instances, serializer_class, rows, render) in SCENARIOS.items():
+                baseline, baseline_stats = self.measure(
+                    options["repeat"],
+                    lambda: JSONRenderer().render(serializer_class(instances(), many=True).data),
+                )
+                fast, fast_stats = self.measure(
+                    options["repeat"], lambda: ORJSONRenderer().render(render(rows()))
+                )
+                if fast != baseline:
+                    raise CommandError(f"Fast path output for {name} differs from the serializer output.")
+                results[name] = {
+                    "bytes": len(baseline),
+                    "serializer": baseline_stats,
+                    "fast_path": fast_stats,
+                    "speedup": round(baseline_stats["mean_ms"] / fast_stats["mean_ms"], 2),
+                }
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    @staticmethod
+    def measure(repeat, render):
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(repeat):
+            call_started = time.perf_counter()
+            output = render()
+            latencies.append(time.perf_counter() - call_started)
+        return output, summarize(latencies, time.perf_counter() - started)
+
+    @staticmethod
+    def seed(rows, items):
+        prefix = f"BENCH-SER-{uuid.uuid4().hex[:8]}"
+        orders = Order.objects.bulk_create(
+            Order(external_id=f"{prefix}-{i}", customer_id=f"C{i % 50}", total_amount=items * 10)
+            for i in range(rows)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product_id=f"SKU-{n}", product_name=f"Produit {n}", quantity=1, unit_price=10)
+            for order in orders
+            for n in range(items)
+        )
+        Invoice.objects.bulk_create(Invoice(order=order, amount=order.total_amount) for order in orders)
+        FulfillmentRequest.objects.bulk_create(
+            FulfillmentRequest(order=order, warehouse_code="WH-1") for order in orders
+        )
@@ -0,0 +1,66 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from order_management import outbox
+from order_management.wms import FulfillmentDispatchHandler, HttpWMSClient, StubWMSClient
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox messages (fulfillment requests to the WMS) until interrupted, or once with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process the due messages, then exit.")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--concurrency", type=int, default=None, help="Concurrent deliveries.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when nothing is due.")
+        parser.add_argument("--wms-url", default=None, help="Defaults to OMS_WMS_URL.")
+        parser.add_argument("--stub", action="store_true", help="Deliver to an in-process stub WMS (development).")
+        parser.add_argument("--requeue-dead", action="store_true", help="Retry dead-lettered messages, then exit.")
+        parser.add_argument(
+            "--purge-delivered-days",
+            type=int,
+            default=None,
+            help="Delete messages delivered more than N days ago, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_dead"]:
+            self.stdout.write(f"Requeued {outbox.requeue_dead()} dead messages.")
+            return
+        if options["purge_delivered_days"] is not None:
+            deleted = outbox.purge_delivered(timedelta(days=options["purge_delivered_days"]))
+            self.stdout.write(f"Deleted {deleted} delivered messages.")
+            return
+
+        if options["stub"]:
+            client = StubWMSClient()
+        else:
+            url = options["wms_url"] or settings.OMS_WMS_URL
+            if not url:
+                raise CommandError("Set OMS_WMS_URL or pass --wms-url (or --stub for local development).")
+            client = HttpWMSClient(url, timeout=settings.OMS_WMS_TIMEOUT)
+
+        totals = {"claimed": 0, "delivered": 0, "retried": 0, "dead": 0}
+        dispatcher = outbox.Dispatcher(
+            [FulfillmentDispatchHandler(client)], batch_size=options["batch_size"], concurrency=options["concurrency"]
+        )
+        with dispatcher:
+            try:
+                while True:
+                    counts = dispatcher.run_once()
+                    for name, value in counts.items():
+                        totals[name] += value
+                    if counts["claimed"] and options["verbosity"] > 1:
+                        self.stdout.write(str(counts))
+                    if not counts["claimed"]:
+                        if options["once"]:
+                            break
+                        time.sleep(options["poll_interval"])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(
+            f"Delivered {totals['delivered']}, retried {totals['retried']}, dead-lettered {totals['dead']} messages."
+        )
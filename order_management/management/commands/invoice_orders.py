@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from order_management import invoicing
+from order_management.models import Order
+
+
+class Command(BaseCommand):
+    help = "Issue invoices for confirmed (and later) orders that have none, in chunked bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=[value for value in Order.Status.values if value != Order.Status.CANCELLED],
+            help="Order status to invoice; repeat for several (default: CONFIRMED, FULFILLMENT_REQUESTED, COMPLETED).",
+        )
+        parser.add_argument("--created-before", default=None, help="Only orders created before this ISO 8601 datetime.")
+        parser.add_argument("--limit", type=int, default=None, help="Invoice at most N orders.")
+        parser.add_argument("--payment-method", default="COD")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Defaults to OMS_BULK_INVOICE_CHUNK_SIZE.")
+
+    def handle(self, *args, **options):
+        created_before = None
+        if options["created_before"]:
+            created_before = parse_datetime(options["created_before"])
+            if created_before is None:
+                raise CommandError("--created-before must be an ISO 8601 datetime.")
+        summary = invoicing.bulk_invoice(
+            statuses=options["status"] or invoicing.INVOICEABLE_STATUSES,
+            created_before=created_before,
+            limit=options["limit"],
+            payment_method=options["payment_method"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(json.dumps(summary))
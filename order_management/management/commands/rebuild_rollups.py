@@ -0,0 +1,16 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from order_management import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily sales and invoice rollups from the orders and invoices."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = rollups.rebuild()
+        counts["elapsed_s"] = round(time.perf_counter() - started, 3)
+        self.stdout.write(json.dumps(counts))
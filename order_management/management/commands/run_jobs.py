@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from order_management import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (imports, invoicing, exports, archival) on a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Worker processes (default: OMS_JOB_PROCESSES); 0 runs jobs in this process.",
+        )
+        parser.add_argument("--once", action="store_true", help="Run the queued jobs, then exit.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when no job can start.")
+
+    def handle(self, *args, **options):
+        started = 0
+        with jobs.Worker(processes=options["processes"]) as worker:
+            try:
+                while True:
+                    count = worker.run_once()
+                    started += count
+                    if count:
+                        continue
+                    if options["once"] and not worker.running:
+                        break
+                    time.sleep(options["poll_interval"])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(f"Started {started} jobs.")
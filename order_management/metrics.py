@@ -0,0 +1,184 @@
+"""In-process request metrics, exported in the Prometheus text format.
+
+``RequestMetricsMiddleware`` opens a ``RequestStats`` for every request. The
+database execute wrapper and ``timer()`` add to the stats of the request
+they run in (tracked with a context variable, so this also works for async
+views whose queries run in a worker thread); at the end of the request the
+totals are observed into per-view histograms. Each process keeps its own
+histograms, as with any in-process Prometheus client.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+_current = ContextVar("oms_request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "timings")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = {}
+
+    def add(self, name, elapsed):
+        self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def timer(name):
+    """Add the time spent in the block to ``name`` for the current request."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def install(connection):
+    # Insert at the front: ``connection.execute_wrapper()`` blocks pop the
+    # last wrapper on exit, which must remain theirs.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, buckets, labels, value):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        with self._lock:
+            histograms = {key: (h.buckets, list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            series = counters if kind == "counter" else histograms
+            keys = sorted(key for key in series if key[0] == name)
+            if not keys:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key in keys:
+                labels = key[1]
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {series[key]}")
+                    continue
+                buckets, counts, total, count = series[key]
+                cumulative = 0
+                for bound, bucket_count in zip((*buckets, "+Inf"), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels((*labels, ('le', _number(bound))))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value):
+    return value if isinstance(value, str) else repr(float(value))
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+METRICS = {
+    "oms_requests_total": ("counter", "HTTP requests by view, method and status code."),
+    "oms_request_duration_seconds": ("histogram", "Total request latency."),
+    "oms_request_db_queries": ("histogram", "Database queries per request."),
+    "oms_request_db_duration_seconds": ("histogram", "Time spent executing SQL per request."),
+    "oms_request_serialize_duration_seconds": ("histogram", "Time spent serializing response data per request."),
+    "oms_request_render_duration_seconds": ("histogram", "Time spent rendering response bodies per request."),
+}
+
+registry = Registry()
+
+
+def observe_request(view, method, status_code, stats, duration):
+    labels = (("view", view), ("method", method))
+    registry.inc("oms_requests_total", (*labels, ("status", str(status_code))))
+    registry.observe("oms_request_duration_seconds", DURATION_BUCKETS, labels, duration)
+    registry.observe("oms_request_db_queries", QUERY_BUCKETS, labels, stats.queries)
+    registry.observe("oms_request_db_duration_seconds", DURATION_BUCKETS, labels, stats.db_time)
+    for name in ("serialize", "render"):
+        elapsed = stats.timings.get(name, 0.0)
+        registry.observe(f"oms_request_{name}_duration_seconds", DURATION_BUCKETS, labels, elapsed)
+
+
+def server_timing(stats, duration):
+    parts = [f'db;desc="{stats.queries} queries";dur={stats.db_time * 1000:.2f}']
+    parts.extend(f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in stats.timings.items())
+    parts.append(f"total;dur={duration * 1000:.2f}")
+    return ", ".join(parts)
@@ -0,0 +1,72 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metrics
+
+
+def _install_on_new_connection(sender, connection, **kwargs):
+    metrics.install(connection)
+
+
+connection_created.connect(_install_on_new_connection)
+
+
+class RequestMetricsMiddleware:
+    """Record query count, SQL time, serialization/render time and latency per view.
+
+    Totals are observed into ``metrics.registry`` (served at ``/metrics``)
+    and, when ``OMS_METRICS_SERVER_TIMING`` is on, returned to the client
+    in a ``Server-Timing`` header. Streaming responses are measured up to
+    the point the response is returned, not until the body is consumed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        for connection in connections.all():
+            metrics.install(connection)
+        stats, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        stats, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, stats, time.perf_counter() - started)
+
+    def process_template_response(self, request, response):
+        # Called right before DRF renders the response body.
+        stats = metrics.current()
+        if stats is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda _: stats.add("render", time.perf_counter() - started))
+        return response
+
+    def finish(self, request, response, stats, duration):
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        metrics.observe_request(view, request.method, response.status_code, stats, duration)
+        if settings.OMS_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing(stats, duration)
+        return response
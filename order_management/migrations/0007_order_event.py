@@ -0,0 +1,27 @@
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0006_outbox_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('order_id', models.BigIntegerField()),
+                ('type', models.CharField(choices=[('order.created', 'Created'), ('order.status_changed', 'Status Changed')], max_length=32)),
+                ('from_status', models.CharField(blank=True, max_length=32, null=True)),
+                ('to_status', models.CharField(max_length=32)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['order_id', 'seq'], name='orderevent_order_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_invoice_updated_at(apps, schema_editor):
+    Invoice = apps.get_model("order_management", "Invoice")
+    Invoice.objects.update(updated_at=Coalesce("paid_at", "issued_at", "updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0007_order_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_invoice_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at', 'id'], name='order_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['updated_at', 'id'], name='invoice_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fulfillmentrequest',
+            index=models.Index(fields=['updated_at', 'id'], name='fulfillment_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Order = apps.get_model("order_management", "Order")
+    Invoice = apps.get_model("order_management", "Invoice")
+    SalesRollup = apps.get_model("order_management", "SalesRollup")
+    InvoiceRollup = apps.get_model("order_management", "InvoiceRollup")
+    SalesRollup.objects.bulk_create(
+        SalesRollup(**row)
+        for row in Order.objects.annotate(day=TruncDate("created_at"))
+        .values("day", "currency", "status")
+        .annotate(order_count=Count("id"), total_amount=Sum("total_amount"))
+        .order_by()
+    )
+    InvoiceRollup.objects.bulk_create(
+        InvoiceRollup(**row)
+        for row in Invoice.objects.filter(issued_at__isnull=False)
+        .annotate(day=TruncDate("issued_at"), currency=F("order__currency"))
+        .values("day", "currency", "status")
+        .annotate(invoice_count=Count("id"), amount=Sum("amount"))
+        .order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0008_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('ISSUED', 'Issued'), ('PAID', 'Paid'), ('CANCELLED', 'Cancelled')], max_length=32)),
+                ('invoice_count', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'currency', 'status'), name='invoicerollup_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('CANCELLED', 'Cancelled'), ('FULFILLMENT_REQUESTED', 'Fulfillment Requested'), ('COMPLETED', 'Completed')], max_length=32)),
+                ('order_count', models.BigIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'currency', 'status'), name='salesrollup_key')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def backfill_customer_summaries(apps, schema_editor):
+    Order = apps.get_model("order_management", "Order")
+    CustomerSummary = apps.get_model("order_management", "CustomerSummary")
+    CustomerSummary.objects.bulk_create(
+        (
+            CustomerSummary(**row)
+            for row in Order.objects.values("customer_id", "currency")
+            .annotate(
+                order_count=Count("id"),
+                lifetime_value=Sum("total_amount", filter=~Q(status="CANCELLED"), default=0),
+                last_order_at=Max("created_at"),
+            )
+            .order_by()
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0009_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_id', models.CharField(max_length=64)),
+                ('currency', models.CharField(max_length=3)),
+                ('order_count', models.BigIntegerField(default=0)),
+                ('lifetime_value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('last_order_at', models.DateTimeField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('customer_id', 'currency'), name='customersummary_key')],
+            },
+        ),
+        migrations.RunPython(backfill_customer_summaries, migrations.RunPython.noop),
+    ]
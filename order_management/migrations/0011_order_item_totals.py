@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_item_totals(apps, schema_editor):
+    Order = apps.get_model("order_management", "Order")
+    OrderItem = apps.get_model("order_management", "OrderItem")
+    lines = OrderItem.objects.filter(order=OuterRef("pk")).order_by().values("order")
+    line_total = ExpressionWrapper(
+        F("quantity") * F("unit_price"), output_field=DecimalField(max_digits=10, decimal_places=2)
+    )
+    Order.objects.update(
+        item_count=Coalesce(Subquery(lines.annotate(count=Count("id")).values("count")), Value(0)),
+        computed_total=Coalesce(
+            Subquery(lines.annotate(total=Sum(line_total)).values("total")),
+            Value(0),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0010_customer_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='computed_total',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of quantity * unit_price over the items.', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of order lines, set on creation.'),
+        ),
+        migrations.RunPython(backfill_item_totals, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 
@@ -16,6 +17,20 @@ class Order(models.Model):
     currency = models.CharField(max_length=3, default="TND")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1, help_text="Incremented on every change to the order.")
+    item_count = models.PositiveIntegerField(default=0, help_text="Number of order lines, set on creation.")
+    computed_total = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, help_text="Sum of quantity * unit_price over the items."
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="order_created_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="order_status_created_idx"),
+            models.Index(fields=["customer_id", "created_at", "id"], name="order_customer_created_idx"),
+            models.Index(fields=["currency", "created_at", "id"], name="order_currency_created_idx"),
+            models.Index(fields=["updated_at", "id"], name="order_updated_idx"),
+        ]
 
     def __str__(self):
         return f"Order {self.external_id} ({self.status})"
@@ -28,6 +43,12 @@ class OrderItem(models.Model):
     quantity = models.PositiveIntegerField()
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
 
+    class Meta:
+        indexes = [
+            # Items are read per order and, for exports, in insertion order.
+            models.Index(fields=["order", "id"], name="orderitem_order_idx"),
+        ]
+
     def __str__(self):
         return f"Item {self.product_name} x{self.quantity}"
 
@@ -45,6 +66,13 @@ class Invoice(models.Model):
     issued_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     paid_at = models.DateTimeField(null=True, blank=True)
     payment_method = models.CharField(max_length=16, default="COD", help_text="Payment method (e.g., COD, ONLINE).")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="invoice_status_idx"),
+            models.Index(fields=["updated_at", "id"], name="invoice_updated_idx"),
+        ]
 
     def __str__(self):
         return f"Invoice for {self.order_id} ({self.status})"
@@ -63,5 +91,239 @@ class FulfillmentRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="fulfillment_created_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="fulfillment_status_created_idx"),
+            models.Index(fields=["updated_at", "id"], name="fulfillment_updated_idx"),
+        ]
+
     def __str__(self):
         return f"Fulfillment for {self.order_id} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    key = models.CharField(max_length=255, unique=True, help_text="Client supplied Idempotency-Key header.")
+    method = models.CharField(max_length=8)
+    path = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64, help_text="SHA-256 of the canonical request payload.")
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Idempotency key {self.key} ({self.method} {self.path})"
+
+
+class OutboxMessage(models.Model):
+    """A message to an external system, written in the transaction that produced it.
+
+    ``outbox.Dispatcher`` delivers pending messages at least once; ``key`` is
+    sent along so the receiver can drop duplicates.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        DELIVERED = "DELIVERED"
+        DEAD = "DEAD"
+
+    topic = models.CharField(max_length=64)
+    key = models.CharField(max_length=255, unique=True, help_text="Deduplication key sent to the receiver.")
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(help_text="Earliest time of the next delivery attempt.")
+    lock_token = models.CharField(max_length=32, null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "available_at", "id"], name="outbox_due_idx"),
+            models.Index(fields=["lock_token"], name="outbox_lock_idx"),
+        ]
+
+    def __str__(self):
+        return f"Outbox {self.topic} {self.key} ({self.status})"
+
+
+class OrderEvent(models.Model):
+    """Append-only log of order lifecycle changes, read in ``seq`` order.
+
+    ``order_id`` is a plain column rather than a foreign key so the log
+    outlives deleted or archived orders.
+    """
+
+    class Type(models.TextChoices):
+        CREATED = "order.created"
+        STATUS_CHANGED = "order.status_changed"
+
+    seq = models.BigAutoField(primary_key=True)
+    order_id = models.BigIntegerField()
+    type = models.CharField(max_length=32, choices=Type.choices)
+    from_status = models.CharField(max_length=32, null=True, blank=True)
+    to_status = models.CharField(max_length=32)
+    data = models.JSONField(encoder=DjangoJSONEncoder, default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["order_id", "seq"], name="orderevent_order_idx"),
+            # Finds the recent events that bound what readers may see.
+            models.Index(fields=["created_at"], name="orderevent_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Event {self.seq} {self.type} for {self.order_id}"
+
+
+class SalesRollup(models.Model):
+    """Number and total of orders created per day, currency and current status.
+
+    Maintained incrementally by ``rollups`` on order creation and status
+    transitions; ``python manage.py rebuild_rollups`` recomputes it.
+    """
+
+    day = models.DateField()
+    currency = models.CharField(max_length=3)
+    status = models.CharField(max_length=32, choices=Order.Status.choices)
+    order_count = models.BigIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "currency", "status"], name="salesrollup_key"),
+        ]
+
+    def __str__(self):
+        return f"Sales {self.day} {self.currency} {self.status}: {self.order_count}"
+
+
+class InvoiceRollup(models.Model):
+    """Number and amount of invoices issued per day, order currency and invoice status."""
+
+    day = models.DateField()
+    currency = models.CharField(max_length=3)
+    status = models.CharField(max_length=32, choices=Invoice.Status.choices)
+    invoice_count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "currency", "status"], name="invoicerollup_key"),
+        ]
+
+    def __str__(self):
+        return f"Invoices {self.day} {self.currency} {self.status}: {self.invoice_count}"
+
+
+class CustomerSummary(models.Model):
+    """Orders of a customer in one currency, maintained by ``rollups``.
+
+    ``lifetime_value`` excludes cancelled orders.
+    """
+
+    customer_id = models.CharField(max_length=64)
+    currency = models.CharField(max_length=3)
+    order_count = models.BigIntegerField(default=0)
+    lifetime_value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    last_order_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["customer_id", "currency"], name="customersummary_key"),
+        ]
+
+    def __str__(self):
+        return f"Customer {self.customer_id} ({self.currency}): {self.order_count} orders"
+
+
+class ArchivedOrder(models.Model):
+    """A completed or cancelled order moved out of the live tables by ``archiving``.
+
+    The order keeps its id and columns. Its items and fulfillment request are
+    only ever read together with the order, so they are stored in their
+    rendered form; the invoice keeps a table (``ArchivedInvoice``) because the
+    invoice rollups are rebuilt from it.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    external_id = models.CharField(max_length=64, unique=True)
+    customer_id = models.CharField(max_length=64)
+    status = models.CharField(max_length=32, choices=Order.Status.choices)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField()
+    item_count = models.PositiveIntegerField()
+    computed_total = models.DecimalField(max_digits=10, decimal_places=2)
+    items = models.JSONField(encoder=DjangoJSONEncoder, default=list)
+    fulfillment_request = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived order {self.external_id} ({self.status})"
+
+
+class ArchivedInvoice(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.OneToOneField(ArchivedOrder, related_name="invoice", on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=32, choices=Invoice.Status.choices)
+    issued_at = models.DateTimeField(null=True, blank=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    payment_method = models.CharField(max_length=16)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Archived invoice for {self.order_id} ({self.status})"
+
+
+class Job(models.Model):
+    """A long-running operation submitted through ``/api/jobs`` and run by ``python manage.py run_jobs``.
+
+    Workers lease jobs like the outbox leases messages: a claimed job is
+    tagged with a ``lock_token`` and ``lease_expires_at``, which progress
+    reports push forward. A job whose worker died is claimed again once its
+    lease expires, up to ``OMS_JOB_MAX_ATTEMPTS`` times.
+    """
+
+    class Kind(models.TextChoices):
+        BULK_IMPORT = "bulk_import"
+        BULK_INVOICE = "bulk_invoice"
+        EXPORT = "export"
+        ARCHIVE = "archive"
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED"
+        RUNNING = "RUNNING"
+        SUCCEEDED = "SUCCEEDED"
+        FAILED = "FAILED"
+        CANCELLED = "CANCELLED"
+
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    params = models.JSONField(encoder=DjangoJSONEncoder, default=dict)
+    result = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    progress = models.PositiveBigIntegerField(default=0, help_text="Units of work done so far.")
+    total = models.PositiveBigIntegerField(null=True, blank=True, help_text="Units of work in the job, if known.")
+    cancel_requested = models.BooleanField(default=False)
+    attempts = models.PositiveIntegerField(default=0)
+    lock_token = models.CharField(max_length=32, null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="job_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} {self.kind} ({self.status})"
@@ -0,0 +1,50 @@
+"""Cache of rendered ``OrderSerializer`` payloads.
+
+Entries are keyed by the order's identity and ``version``. Every write that
+changes an order's representation increments ``Order.version`` (see
+``state_machine``), so a cached payload can never be served for a newer
+version; invalidation only frees the superseded entry. Readers learn the
+current version with a single primary-key lookup, which is also enough to
+answer ``If-None-Match`` with a 304.
+
+Keys include the creation timestamp as well as the id, because SQLite may
+reuse the id of a deleted (e.g. archived) row.
+"""
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = "orders"
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _identity(order_id, created_at):
+    return f"{order_id}.{int(created_at.timestamp() * 1_000_000)}"
+
+
+def cache_key(order_id, created_at, version):
+    return f"order:{_identity(order_id, created_at)}:v{version}"
+
+
+def etag(order_id, created_at, version):
+    return f'"{_identity(order_id, created_at)}-{version}"'
+
+
+def get(order_id, created_at, version):
+    return _cache().get(cache_key(order_id, created_at, version))
+
+
+def store(order_id, created_at, version, payload):
+    """Store ``payload`` once the current transaction commits."""
+    key = cache_key(order_id, created_at, version)
+    transaction.on_commit(lambda: _cache().set(key, payload))
+
+
+def invalidate(orders):
+    """Drop the payloads of ``(order_id, created_at, version)`` triples after commit."""
+    keys = [cache_key(*order) for order in orders]
+    if keys:
+        transaction.on_commit(lambda: _cache().delete_many(keys))
+
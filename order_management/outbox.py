@@ -0,0 +1,169 @@
+"""Transactional outbox.
+
+Writers call ``enqueue`` inside the transaction that changes the data, so a
+message exists if and only if the change committed. ``Dispatcher`` drains
+the table in batches: it claims due messages with a lease (``available_at``
+is pushed past the lease and the rows are tagged with a ``lock_token``),
+hands them to the handler registered for their topic on a bounded thread
+pool, and records the outcome. Failed messages are retried with exponential
+backoff and dead-lettered after ``max_attempts`` or on a permanent failure.
+A dispatcher that dies mid-batch leaves its messages to be picked up again
+once the lease expires, so delivery is at least once.
+"""
+import logging
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentFailure(Exception):
+    """Raised by handlers when retrying cannot succeed; the message is dead-lettered."""
+
+
+def enqueue(topic, key, payload):
+    return OutboxMessage.objects.create(topic=topic, key=key, payload=payload, available_at=timezone.now())
+
+
+def backoff(attempts, base=None, cap=None):
+    """Delay before attempt ``attempts + 1``: exponential with full jitter."""
+    base = settings.OMS_OUTBOX_RETRY_BACKOFF if base is None else base
+    cap = settings.OMS_OUTBOX_RETRY_MAX_BACKOFF if cap is None else cap
+    return random.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+
+def claim(batch_size, lease):
+    """Lease up to ``batch_size`` due messages to the caller and return them, oldest first."""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        due = OutboxMessage.objects.filter(status=OutboxMessage.Status.PENDING, available_at__lte=now).order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return []
+        # The filter is repeated so a concurrent dispatcher cannot claim the same rows.
+        OutboxMessage.objects.filter(
+            id__in=ids, status=OutboxMessage.Status.PENDING, available_at__lte=now
+        ).update(lock_token=token, available_at=now + timedelta(seconds=lease))
+    return list(OutboxMessage.objects.filter(lock_token=token).order_by("id"))
+
+
+def mark_delivered(messages):
+    OutboxMessage.objects.filter(id__in=[message.id for message in messages]).update(
+        status=OutboxMessage.Status.DELIVERED, lock_token=None, delivered_at=timezone.now(), last_error=""
+    )
+
+
+def mark_failed(message, error, max_attempts, permanent=False):
+    attempts = message.attempts + 1
+    dead = permanent or attempts >= max_attempts
+    OutboxMessage.objects.filter(id=message.id).update(
+        status=OutboxMessage.Status.DEAD if dead else OutboxMessage.Status.PENDING,
+        attempts=attempts,
+        available_at=timezone.now() + timedelta(seconds=backoff(attempts)),
+        lock_token=None,
+        last_error=str(error)[:2000],
+    )
+    return dead
+
+
+def requeue_dead(topic=None):
+    """Give dead-lettered messages a fresh set of attempts."""
+    dead = OutboxMessage.objects.filter(status=OutboxMessage.Status.DEAD)
+    if topic:
+        dead = dead.filter(topic=topic)
+    return dead.update(status=OutboxMessage.Status.PENDING, attempts=0, available_at=timezone.now())
+
+
+def purge_delivered(older_than, batch_size=1000):
+    cutoff = timezone.now() - older_than
+    deleted = 0
+    while True:
+        ids = list(
+            OutboxMessage.objects.filter(status=OutboxMessage.Status.DELIVERED, delivered_at__lt=cutoff).values_list(
+                "id", flat=True
+            )[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += OutboxMessage.objects.filter(id__in=ids).delete()[0]
+
+
+class Dispatcher:
+    """Deliver outbox messages through per-topic handlers.
+
+    A handler has a ``send(message, context)`` method, called concurrently
+    from the pool, and may define ``prepare(messages)`` (called once per batch
+    before sending; its return value is passed to ``send`` as ``context``) and
+    ``delivered(messages)`` (called in the transaction that marks them
+    delivered). Only ``send`` runs outside the dispatcher's thread, so
+    handlers should keep database access in ``prepare`` and ``delivered``.
+    """
+
+    def __init__(self, handlers, batch_size=None, concurrency=None, max_attempts=None, lease=None):
+        self.handlers = {handler.topic: handler for handler in handlers}
+        self.batch_size = batch_size or settings.OMS_OUTBOX_BATCH_SIZE
+        self.concurrency = concurrency or settings.OMS_OUTBOX_CONCURRENCY
+        self.max_attempts = max_attempts or settings.OMS_OUTBOX_MAX_ATTEMPTS
+        self.lease = lease or settings.OMS_OUTBOX_LEASE
+        self.pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="outbox")
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def run_once(self):
+        """Claim and process one batch; returns counts of delivered, retried and dead messages."""
+        counts = {"claimed": 0, "delivered": 0, "retried": 0, "dead": 0}
+        messages = claim(self.batch_size, self.lease)
+        counts["claimed"] = len(messages)
+        by_topic = {}
+        for message in messages:
+            by_topic.setdefault(message.topic, []).append(message)
+
+        for topic, batch in by_topic.items():
+            handler = self.handlers.get(topic)
+            if handler is None:
+                failures = [(message, PermanentFailure(f"No handler for topic {topic!r}")) for message in batch]
+                self.record(handler, [], failures, counts)
+                continue
+            context = handler.prepare(batch) if hasattr(handler, "prepare") else None
+            futures = [(message, self.pool.submit(handler.send, message, context)) for message in batch]
+            delivered, failures = [], []
+            for message, future in futures:
+                try:
+                    future.result()
+                except Exception as exc:
+                    failures.append((message, exc))
+                else:
+                    delivered.append(message)
+            self.record(handler, delivered, failures, counts)
+        return counts
+
+    def record(self, handler, delivered, failures, counts):
+        with transaction.atomic():
+            if delivered:
+                mark_delivered(delivered)
+                if hasattr(handler, "delivered"):
+                    handler.delivered(delivered)
+            for message, exc in failures:
+                dead = mark_failed(message, exc, self.max_attempts, permanent=isinstance(exc, PermanentFailure))
+                log = logger.error if dead else logger.warning
+                log("Outbox message %s failed on attempt %s: %s", message.key, message.attempts + 1, exc)
+                counts["dead" if dead else "retried"] += 1
+        counts["delivered"] += len(delivered)
@@ -0,0 +1,102 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first keyset pagination on ``(<keyset_field>, id)``.
+
+    Views choose the timestamp column with a ``keyset_field`` attribute
+    (``created_at`` by default, ``None`` to paginate on ``id`` alone). The
+    cursor encodes the position of the last row of the page, so pages stay
+    stable while new rows are inserted and every page is an index range scan.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.field = getattr(view, "keyset_field", "created_at")
+        self.limit = self.get_limit(request)
+        ordering = ("-id",) if self.field is None else (f"-{self.field}", "-id")
+        queryset = queryset.order_by(*ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+
+        rows = list(queryset[: self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        rows = rows[: self.limit]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(limit, 1), self.max_page_size)
+
+    def get_position(self, row):
+        get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+        if self.field is None:
+            return (None, get("id"))
+        return (get(self.field), get("id"))
+
+    def position_filter(self, position):
+        value, pk = position
+        if self.field is None:
+            return Q(id__lt=pk)
+        return Q(**{f"{self.field}__lt": value}) | Q(**{self.field: value, "id__lt": pk})
+
+    def encode_cursor(self, position):
+        value, pk = position
+        raw = f"{value.isoformat() if value is not None else ''}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            value, pk = raw.rsplit("|", 1)
+            pk = int(pk)
+            if self.field is None:
+                return (None, pk)
+            value = parse_datetime(value)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (value, pk)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,39 @@
+"""Per-endpoint database query budgets.
+
+Budgets count the statements an endpoint issues for a single request
+(transaction control such as SAVEPOINT/RELEASE is not counted). The test
+suite asserts every endpoint stays within its budget, so an N+1 regression
+fails CI instead of showing up in production.
+"""
+
+QUERY_BUDGETS = {
+    ("GET", "order-create"): 2,
+    ("POST", "order-create"): 7,
+    ("GET", "order-update"): 3,
+    ("PATCH", "order-update"): 5,
+    ("PUT", "order-update"): 5,
+    ("GET", "order-by-external"): 3,
+    ("PATCH", "order-by-external"): 5,
+    ("PUT", "order-by-external"): 5,
+    ("GET", "customer-orders"): 3,
+    ("GET", "invoice-create"): 1,
+    ("POST", "invoice-create"): 3,
+    ("GET", "fulfillment-create"): 1,
+    ("POST", "fulfillment-create"): 6,
+    ("GET", "event-list"): 2,
+    ("GET", "sync"): 4,
+    ("GET", "sales-summary"): 2,
+    ("POST", "job-create"): 1,
+    ("GET", "job-detail"): 1,
+    ("POST", "job-cancel"): 3,
+}
+
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT", "BEGIN", "COMMIT", "ROLLBACK")
+
+
+def get_budget(method, url_name):
+    return QUERY_BUDGETS.get((method.upper(), url_name))
+
+
+def counted_queries(queries):
+    return [query for query in queries if not query["sql"].upper().startswith(TRANSACTION_CONTROL)]
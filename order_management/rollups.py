@@ -0,0 +1,265 @@
+"""Pre-aggregated sales, invoice and customer totals.
+
+``SalesRollup`` and ``InvoiceRollup`` hold one row per day, currency and
+status, ``CustomerSummary`` one row per customer and currency. Writers apply
+deltas in the transaction that changes the orders: an order creation adds
+to its rows, a transition moves the order from the old status row to the
+new one. Deltas are applied with a single ``INSERT ... ON CONFLICT DO
+UPDATE`` that adds to the existing counters, so concurrent writers never
+overwrite each other. Days are calendar days in ``TIME_ZONE`` of
+``Order.created_at`` and ``Invoice.issued_at``.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ArchivedInvoice, ArchivedOrder, CustomerSummary, Invoice, InvoiceRollup, Order, SalesRollup
+
+PAID_STATUSES = (Invoice.Status.PAID,)
+UNPAID_STATUSES = (Invoice.Status.DRAFT, Invoice.Status.ISSUED)
+
+
+def _upsert(model, keys, rows, add=(), latest=()):
+    """Insert ``rows`` (values for ``keys + add + latest``), adding ``add`` and keeping the max of ``latest``."""
+    if not rows:
+        return
+    fields = [model._meta.get_field(name) for name in [*keys, *add, *latest]]
+    params = [[field.get_db_prep_save(value, connection) for field, value in zip(fields, row)] for row in rows]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = [quote(field.column) for field in fields]
+    key_columns, add_columns, latest_columns = (
+        columns[: len(keys)],
+        columns[len(keys) : len(keys) + len(add)],
+        columns[len(keys) + len(add) :],
+    )
+    greatest = "GREATEST" if connection.vendor == "postgresql" else "MAX"
+    updates = [f"{name} = {table}.{name} + excluded.{name}" for name in add_columns]
+    updates += [f"{name} = {greatest}({table}.{name}, excluded.{name})" for name in latest_columns]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {', '.join(updates)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def _add(deltas, key, *values):
+    deltas[key] = tuple(current + value for current, value in zip(deltas[key], values))
+
+
+def _apply_sales(model, count_field, amount_field, deltas):
+    rows = [(*key, count, amount) for key, (count, amount) in sorted(deltas.items()) if count or amount]
+    _upsert(model, ["day", "currency", "status"], rows, add=[count_field, amount_field])
+
+
+def _lifetime_value(status, total_amount):
+    return 0 if status == Order.Status.CANCELLED else total_amount
+
+
+def record_orders_created(orders):
+    """Count saved ``orders``; must run inside their transaction."""
+    sales = defaultdict(lambda: (0, Decimal(0)))
+    customers = {}
+    for order in orders:
+        _add(sales, (timezone.localdate(order.created_at), order.currency, order.status), 1, order.total_amount)
+        key = (order.customer_id, order.currency)
+        count, value, last_order_at = customers.get(key, (0, Decimal(0), order.created_at))
+        customers[key] = (
+            count + 1,
+            value + _lifetime_value(order.status, order.total_amount),
+            max(last_order_at, order.created_at),
+        )
+    _apply_sales(SalesRollup, "order_count", "total_amount", sales)
+    _upsert(
+        CustomerSummary,
+        ["customer_id", "currency"],
+        [(*key, *values) for key, values in sorted(customers.items())],
+        add=["order_count", "lifetime_value"],
+        latest=["last_order_at"],
+    )
+
+
+def record_transitions(orders, target):
+    """Move ``(customer_id, created_at, currency, total_amount, previous_status)`` orders to ``target``."""
+    sales = defaultdict(lambda: (0, Decimal(0)))
+    customers = {}
+    for customer_id, created_at, currency, total_amount, previous in orders:
+        day = timezone.localdate(created_at)
+        _add(sales, (day, currency, previous), -1, -total_amount)
+        _add(sales, (day, currency, target), 1, total_amount)
+        change = _lifetime_value(target, total_amount) - _lifetime_value(previous, total_amount)
+        if change:
+            key = (customer_id, currency)
+            value, last_order_at = customers.get(key, (Decimal(0), created_at))
+            customers[key] = (value + change, max(last_order_at, created_at))
+    _apply_sales(SalesRollup, "order_count", "total_amount", sales)
+    _upsert(
+        CustomerSummary,
+        ["customer_id", "currency"],
+        [(*key, 0, value, last_order_at) for key, (value, last_order_at) in sorted(customers.items())],
+        add=["order_count", "lifetime_value"],
+        latest=["last_order_at"],
+    )
+
+
+def record_invoices_created(invoices):
+    """Count saved ``(invoice, order currency)`` pairs; must run inside their transaction."""
+    deltas = defaultdict(lambda: (0, Decimal(0)))
+    for invoice, currency in invoices:
+        _add(deltas, (timezone.localdate(invoice.issued_at), currency, invoice.status), 1, invoice.amount)
+    _apply_sales(InvoiceRollup, "invoice_count", "amount", deltas)
+
+
+def _lock_rollups():
+    # Writers block on the lock until the rebuild commits, then apply their
+    # deltas on top of totals that did not include their (uncommitted) rows.
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for model in (SalesRollup, InvoiceRollup, CustomerSummary):
+                cursor.execute(f"LOCK TABLE {connection.ops.quote_name(model._meta.db_table)} IN EXCLUSIVE MODE")
+
+
+def _merge(querysets, keys, latest=()):
+    """Combine grouped rows of ``querysets`` on ``keys``: other values add up, ``latest`` ones keep the max."""
+    merged = {}
+    for queryset in querysets:
+        for row in queryset:
+            key = tuple(row[name] for name in keys)
+            current = merged.setdefault(key, row)
+            if current is row:
+                continue
+            for name, value in row.items():
+                if name in latest:
+                    current[name] = max(current[name], value)
+                elif name not in keys:
+                    current[name] += value
+    return merged.values()
+
+
+def rebuild():
+    """Recompute the rollup tables from the live and archived orders and invoices; returns the rows written."""
+    with transaction.atomic():
+        _lock_rollups()
+        SalesRollup.objects.all().delete()
+        InvoiceRollup.objects.all().delete()
+        CustomerSummary.objects.all().delete()
+        sales = SalesRollup.objects.bulk_create(
+            SalesRollup(**row)
+            for row in _merge(
+                (
+                    model.objects.annotate(day=TruncDate("created_at"))
+                    .values("day", "currency", "status")
+                    .annotate(order_count=Count("id"), total_amount=Sum("total_amount"))
+                    .order_by()
+                    for model in (Order, ArchivedOrder)
+                ),
+                ["day", "currency", "status"],
+            )
+        )
+        invoices = InvoiceRollup.objects.bulk_create(
+            InvoiceRollup(**row)
+            for row in _merge(
+                (
+                    model.objects.filter(issued_at__isnull=False)
+                    .annotate(day=TruncDate("issued_at"), currency=F("order__currency"))
+                    .values("day", "currency", "status")
+                    .annotate(invoice_count=Count("id"), amount=Sum("amount"))
+                    .order_by()
+                    for model in (Invoice, ArchivedInvoice)
+                ),
+                ["day", "currency", "status"],
+            )
+        )
+        customers = CustomerSummary.objects.bulk_create(
+            (
+                CustomerSummary(**row)
+                for row in _merge(
+                    (
+                        model.objects.values("customer_id", "currency")
+                        .annotate(
+                            order_count=Count("id"),
+                            lifetime_value=Sum("total_amount", filter=~Q(status=Order.Status.CANCELLED), default=0),
+                            last_order_at=Max("created_at"),
+                        )
+                        .order_by()
+                        for model in (Order, ArchivedOrder)
+                    ),
+                    ["customer_id", "currency"],
+                    latest=["last_order_at"],
+                )
+            ),
+            batch_size=5000,
+        )
+    return {"sales": len(sales), "invoices": len(invoices), "customers": len(customers)}
+
+
+def customer_summary(customer_id):
+    """Order count, lifetime value per currency (cancelled orders excluded) and last order date of a customer."""
+    summary = {"customer_id": customer_id, "order_count": 0, "lifetime_value": {}, "last_order_at": None}
+    for currency, count, value, last_order_at in CustomerSummary.objects.filter(customer_id=customer_id).values_list(
+        "currency", "order_count", "lifetime_value", "last_order_at"
+    ):
+        summary["order_count"] += count
+        summary["lifetime_value"][currency] = value
+        if summary["last_order_at"] is None or last_order_at > summary["last_order_at"]:
+            summary["last_order_at"] = last_order_at
+    return summary
+
+
+def daily_summary(start, end, currencies=None):
+    """Per day and currency totals between ``start`` and ``end`` (inclusive), read from the rollups."""
+    sales = SalesRollup.objects.filter(day__gte=start, day__lte=end)
+    invoices = InvoiceRollup.objects.filter(day__gte=start, day__lte=end)
+    if currencies:
+        sales = sales.filter(currency__in=currencies)
+        invoices = invoices.filter(currency__in=currencies)
+
+    days = {}
+
+    def entry(day, currency):
+        key = (day, currency)
+        if key not in days:
+            days[key] = {
+                "day": day,
+                "currency": currency,
+                "order_count": 0,
+                "total_amount": Decimal(0),
+                "statuses": {},
+                "invoices": {
+                    "paid_count": 0,
+                    "paid_amount": Decimal(0),
+                    "unpaid_count": 0,
+                    "unpaid_amount": Decimal(0),
+                },
+            }
+        return days[key]
+
+    for day, currency, status, count, amount in sales.values_list(
+        "day", "currency", "status", "order_count", "total_amount"
+    ):
+        if not count:
+            continue
+        row = entry(day, currency)
+        row["order_count"] += count
+        row["total_amount"] += amount
+        row["statuses"][status] = {"order_count": count, "total_amount": amount}
+
+    for day, currency, status, count, amount in invoices.values_list(
+        "day", "currency", "status", "invoice_count", "amount"
+    ):
+        if status in PAID_STATUSES:
+            prefix = "paid"
+        elif status in UNPAID_STATUSES:
+            prefix = "unpaid"
+        else:
+            continue
+        totals = entry(day, currency)["invoices"]
+        totals[f"{prefix}_count"] += count
+        totals[f"{prefix}_amount"] += amount
+
+    return [days[key] for key in sorted(days)]
@@ -0,0 +1,99 @@
+"""Generate realistic order volumes for benchmarks and load tests.
+
+Rows are written with ``bulk_create`` in batches, one transaction per batch,
+so millions of orders can be seeded without holding everything in memory.
+Statuses follow the lifecycle: invoices exist for confirmed and later
+orders, fulfillment requests for orders that reached the warehouse.
+"""
+import random
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import FulfillmentRequest, Invoice, Order, OrderItem
+
+STATUS_WEIGHTS = {
+    Order.Status.PENDING: 40,
+    Order.Status.CONFIRMED: 20,
+    Order.Status.FULFILLMENT_REQUESTED: 15,
+    Order.Status.COMPLETED: 15,
+    Order.Status.CANCELLED: 10,
+}
+INVOICED_STATUSES = {Order.Status.CONFIRMED, Order.Status.FULFILLMENT_REQUESTED, Order.Status.COMPLETED}
+FULFILLED_STATUSES = {
+    Order.Status.FULFILLMENT_REQUESTED: FulfillmentRequest.Status.SENT_TO_WMS,
+    Order.Status.COMPLETED: FulfillmentRequest.Status.COMPLETED,
+}
+CURRENCIES = ["TND", "TND", "TND", "EUR", "USD"]
+WAREHOUSES = ["WH-TUN", "WH-SFX", "WH-SOU"]
+
+
+def _batch(rng, prefix, start, size, items_per_order, customers):
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=size)
+    orders, items = [], []
+    for offset, order_status in enumerate(statuses):
+        lines = [
+            (f"SKU-{rng.randrange(5000)}", rng.randint(1, 5), Decimal(rng.randrange(100, 20000)) / 100)
+            for _ in range(items_per_order)
+        ]
+        total = sum(quantity * price for _, quantity, price in lines)
+        orders.append(
+            Order(
+                external_id=f"{prefix}-{start + offset}",
+                customer_id=f"CUST-{rng.randrange(customers)}",
+                status=order_status,
+                currency=rng.choice(CURRENCIES),
+                total_amount=total,
+                computed_total=total,
+                item_count=len(lines),
+            )
+        )
+        items.append(lines)
+    return orders, items
+
+
+def seed_orders(orders, items_per_order=5, batch_size=5000, customers=10000, prefix="SEED", seed=None, progress=None):
+    """Insert ``orders`` orders with ``items_per_order`` items each.
+
+    ``progress`` is called with the number of orders inserted so far after
+    every batch. Returns the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    counts = {"orders": 0, "items": 0, "invoices": 0, "fulfillments": 0}
+    for start in range(0, orders, batch_size):
+        size = min(batch_size, orders - start)
+        batch, lines = _batch(rng, prefix, start, size, items_per_order, customers)
+        with transaction.atomic():
+            batch = Order.objects.bulk_create(batch)
+            created_items = OrderItem.objects.bulk_create(
+                (
+                    OrderItem(order=order, product_id=sku, product_name=f"Product {sku}", quantity=quantity, unit_price=price)
+                    for order, order_lines in zip(batch, lines)
+                    for sku, quantity, price in order_lines
+                ),
+                batch_size=batch_size,
+            )
+            invoices = Invoice.objects.bulk_create(
+                Invoice(
+                    order=order,
+                    amount=order.total_amount,
+                    status=Invoice.Status.PAID if order.status == Order.Status.COMPLETED else Invoice.Status.ISSUED,
+                    payment_method=rng.choice(["COD", "ONLINE"]),
+                )
+                for order in batch
+                if order.status in INVOICED_STATUSES
+            )
+            fulfillments = FulfillmentRequest.objects.bulk_create(
+                FulfillmentRequest(
+                    order=order, warehouse_code=rng.choice(WAREHOUSES), status=FULFILLED_STATUSES[order.status]
+                )
+                for order in batch
+                if order.status in FULFILLED_STATUSES
+            )
+        counts["orders"] += len(batch)
+        counts["items"] += len(created_items)
+        counts["invoices"] += len(invoices)
+        counts["fulfillments"] += len(fulfillments)
+        if progress:
+            progress(counts["orders"])
+    return counts
@@ -1,6 +1,22 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import FulfillmentRequest, Invoice, Order, OrderItem
+from . import events, metrics, rollups, state_machine, totals, wms
+from .filters import ORDER_FILTER_PARAMS, filter_by_params
+from .models import ArchivedOrder, FulfillmentRequest, Invoice, Job, Order, OrderEvent, OrderItem
+
+
+class TimedDataMixin:
+    """Count the time spent building ``.data`` as the request's serialization time."""
+
+    @property
+    def data(self):
+        with metrics.timer("serialize"):
+            return super().data
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -9,7 +25,26 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ["product_id", "product_name", "quantity", "unit_price"]
 
 
-class OrderSerializer(serializers.ModelSerializer):
+DUPLICATE_EXTERNAL_ID = "order with this external id already exists."
+
+# Every field an order read can select with ``?fields=``, in output order.
+ORDER_FIELDS = (
+    "id",
+    "external_id",
+    "customer_id",
+    "status",
+    "total_amount",
+    "currency",
+    "items",
+    "item_count",
+    "created_at",
+    "updated_at",
+)
+
+
+class OrderSerializer(TimedDataMixin, serializers.ModelSerializer):
+    """Full order representation, or only ``fields`` (names from ``ORDER_FIELDS``) when given."""
+
     items = OrderItemSerializer(many=True)
 
     class Meta:
@@ -26,6 +61,26 @@ class OrderSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "status", "created_at", "updated_at"]
+        # Checked by validate_external_id, which also covers archived orders.
+        extra_kwargs = {"external_id": {"validators": []}}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        self.requested_fields = fields
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.requested_fields is None:
+            return fields
+        fields["item_count"] = serializers.IntegerField(read_only=True)
+        return {name: fields[name] for name in ORDER_FIELDS if name in self.requested_fields}
+
+    def validate_external_id(self, value):
+        # Archived orders are no longer in the unique index on Order.external_id.
+        live = Order.objects.filter(external_id=value).values("pk")
+        if live.union(ArchivedOrder.objects.filter(external_id=value).values("pk"))[:1]:
+            raise serializers.ValidationError(DUPLICATE_EXTERNAL_ID)
+        return value
 
     def validate_items(self, items):
         if not items:
@@ -33,22 +88,31 @@ class OrderSerializer(serializers.ModelSerializer):
         return items
 
     def validate(self, attrs):
-        items = attrs.get("items", [])
-        total = sum([item["quantity"] * item["unit_price"] for item in items])
-        total_amount = attrs.get("total_amount")
-        if total_amount is not None and total_amount != total:
-            raise serializers.ValidationError("Total amount does not match item totals.")
-        return attrs
+        if self.context.get("batch_totals"):
+            # The caller checks the totals of the whole batch in one pass.
+            return attrs
+        return totals.validate_totals(attrs)
 
     def create(self, validated_data):
         items_data = validated_data.pop("items")
         order = Order.objects.create(**validated_data)
-        for item in items_data:
-            OrderItem.objects.create(order=order, **item)
+        OrderItem.objects.bulk_create(OrderItem(order=order, **item) for item in items_data)
+        rollups.record_orders_created([order])
+        events.record_created([order])
         return order
 
 
-class OrderStatusUpdateSerializer(serializers.ModelSerializer):
+class BulkOrderSerializer(OrderSerializer):
+    class Meta(OrderSerializer.Meta):
+        # Callers check external_id uniqueness themselves: once per batch in the
+        # bulk importer, with a non-blocking query in the async API.
+        extra_kwargs = {"external_id": {"validators": []}}
+
+    def validate_external_id(self, value):
+        return value
+
+
+class OrderStatusUpdateSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ["status"]
@@ -61,37 +125,47 @@ class OrderStatusUpdateSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         instance = self.instance
         new_status = attrs.get("status")
-        if instance:
-            current = instance.status
-            allowed_transitions = {
-                Order.Status.PENDING: {Order.Status.CONFIRMED, Order.Status.CANCELLED},
-                Order.Status.CONFIRMED: {Order.Status.FULFILLMENT_REQUESTED},
-                Order.Status.FULFILLMENT_REQUESTED: {Order.Status.COMPLETED, Order.Status.CANCELLED},
-                Order.Status.COMPLETED: set(),
-                Order.Status.CANCELLED: set(),
-            }
-            if new_status not in allowed_transitions.get(current, set()):
-                raise serializers.ValidationError("Invalid status transition")
+        if instance and not state_machine.can_transition(instance.status, new_status):
+            raise serializers.ValidationError("Invalid status transition")
         return attrs
 
+    def update(self, instance, validated_data):
+        try:
+            return state_machine.transition(instance, validated_data["status"])
+        except state_machine.InvalidTransition as exc:
+            raise serializers.ValidationError(str(exc))
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=Order.Status.choices)
+
+
+class LockedOrderField(serializers.PrimaryKeyRelatedField):
+    """Resolve an order together with its invoice and fulfillment in one query.
+
+    Inside a transaction the order row is locked (``SELECT ... FOR UPDATE``) so
+    the checks made during validation still hold when the write happens.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", Order.objects.select_related("invoice", "fulfillment_request"))
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if transaction.get_connection().in_atomic_block:
+            queryset = queryset.select_for_update(of=("self",))
+        return queryset
+
+
+class InvoiceSerializer(TimedDataMixin, serializers.ModelSerializer):
+    order = LockedOrderField()
 
-class InvoiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Invoice
-        fields = ["id", "order", "amount", "status", "issued_at", "paid_at", "payment_method"]
-        read_only_fields = ["id", "status", "issued_at", "paid_at"]
-
-    def validate_amount(self, value):
-        order = self.initial_data.get("order")
-        if order is None:
-            return value
-        try:
-            order_obj = Order.objects.get(pk=order)
-        except Order.DoesNotExist:
-            raise serializers.ValidationError("Order does not exist")
-        if value != order_obj.total_amount:
-            raise serializers.ValidationError("Invoice amount must match order total")
-        return value
+        fields = ["id", "order", "amount", "status", "issued_at", "paid_at", "payment_method", "updated_at"]
+        read_only_fields = ["id", "status", "issued_at", "paid_at", "updated_at"]
 
     def validate(self, attrs):
         order = attrs.get("order")
@@ -101,14 +175,31 @@ class InvoiceSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invoice already exists for this order")
         if order.status == Order.Status.CANCELLED:
             raise serializers.ValidationError("Cannot invoice a cancelled order")
+        if attrs.get("amount") != order.total_amount:
+            raise serializers.ValidationError({"amount": "Invoice amount must match order total"})
         return attrs
 
     def create(self, validated_data):
         validated_data["status"] = Invoice.Status.ISSUED
-        return super().create(validated_data)
+        invoice = super().create(validated_data)
+        rollups.record_invoices_created([(invoice, invoice.order.currency)])
+        return invoice
+
+
+class BulkInvoiceSerializer(serializers.Serializer):
+    status = serializers.ListField(
+        child=serializers.ChoiceField(choices=[s for s in Order.Status.values if s != Order.Status.CANCELLED]),
+        allow_empty=False,
+        required=False,
+    )
+    created_before = serializers.DateTimeField(required=False)
+    limit = serializers.IntegerField(min_value=1, required=False)
+    payment_method = serializers.CharField(max_length=16, default="COD")
 
 
-class FulfillmentRequestSerializer(serializers.ModelSerializer):
+class FulfillmentRequestSerializer(TimedDataMixin, serializers.ModelSerializer):
+    order = LockedOrderField()
+
     class Meta:
         model = FulfillmentRequest
         fields = ["id", "order", "warehouse_code", "status", "created_at", "updated_at"]
@@ -125,8 +216,131 @@ class FulfillmentRequestSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        fulfillment = super().create(validated_data)
-        order = fulfillment.order
-        order.status = Order.Status.FULFILLMENT_REQUESTED
-        order.save(update_fields=["status"])
-        return fulfillment
+        with transaction.atomic():
+            # The transition records the order event, so it comes last (see ``events``).
+            fulfillment = super().create(validated_data)
+            wms.enqueue_fulfillment(fulfillment)
+            try:
+                state_machine.transition(validated_data["order"], Order.Status.FULFILLMENT_REQUESTED)
+            except state_machine.InvalidTransition:
+                raise serializers.ValidationError("Order status does not allow fulfillment")
+            return fulfillment
+
+
+class OrderEventSerializer(TimedDataMixin, serializers.ModelSerializer):
+    class Meta:
+        model = OrderEvent
+        fields = ["seq", "order_id", "type", "from_status", "to_status", "data", "created_at"]
+        read_only_fields = fields
+
+
+class SalesSummaryQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    currency = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        end = attrs.get("end") or timezone.localdate()
+        start = attrs.get("start") or end - datetime.timedelta(days=29)
+        if start > end:
+            raise serializers.ValidationError({"start": "Must not be after end."})
+        if (end - start).days >= settings.OMS_ANALYTICS_MAX_DAYS:
+            raise serializers.ValidationError(f"At most {settings.OMS_ANALYTICS_MAX_DAYS} days per request.")
+        currencies = [value for value in attrs.get("currency", "").split(",") if value]
+        return {"start": start, "end": end, "currencies": currencies}
+
+
+class StatusTotalsSerializer(serializers.Serializer):
+    order_count = serializers.IntegerField()
+    total_amount = serializers.DecimalField(max_digits=18, decimal_places=2)
+
+
+class InvoiceTotalsSerializer(serializers.Serializer):
+    paid_count = serializers.IntegerField()
+    paid_amount = serializers.DecimalField(max_digits=18, decimal_places=2)
+    unpaid_count = serializers.IntegerField()
+    unpaid_amount = serializers.DecimalField(max_digits=18, decimal_places=2)
+
+
+class DailySalesSerializer(TimedDataMixin, serializers.Serializer):
+    day = serializers.DateField()
+    currency = serializers.CharField()
+    order_count = serializers.IntegerField()
+    total_amount = serializers.DecimalField(max_digits=18, decimal_places=2)
+    statuses = serializers.DictField(child=StatusTotalsSerializer())
+    invoices = InvoiceTotalsSerializer()
+
+
+class CustomerSummarySerializer(serializers.Serializer):
+    customer_id = serializers.CharField()
+    order_count = serializers.IntegerField()
+    lifetime_value = serializers.DictField(child=serializers.DecimalField(max_digits=18, decimal_places=2))
+    last_order_at = serializers.DateTimeField(allow_null=True)
+
+
+class JobSerializer(TimedDataMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "progress",
+            "total",
+            "cancel_requested",
+            "attempts",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "updated_at",
+        ]
+
+
+class BulkImportJobSerializer(serializers.Serializer):
+    # Orders are validated when the job runs, with per-order results like POST /api/orders/bulk.
+    orders = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_orders(self, orders):
+        if len(orders) > settings.OMS_JOB_MAX_IMPORT_ORDERS:
+            raise serializers.ValidationError(f"At most {settings.OMS_JOB_MAX_IMPORT_ORDERS} orders per job.")
+        return orders
+
+
+class ExportJobSerializer(serializers.Serializer):
+    format = serializers.ChoiceField(choices=["ndjson", "csv"], default="ndjson")
+    filters = serializers.DictField(child=serializers.CharField(), default=dict)
+
+    def validate_filters(self, filters):
+        unknown = sorted(set(filters) - set(ORDER_FILTER_PARAMS))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown filter(s): {', '.join(unknown)}.")
+        filter_by_params(Order.objects.none(), ORDER_FILTER_PARAMS, filters)
+        return filters
+
+
+class ArchiveJobSerializer(serializers.Serializer):
+    older_than_days = serializers.IntegerField(min_value=0, required=False)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+
+JOB_PARAMS_SERIALIZERS = {
+    Job.Kind.BULK_IMPORT: BulkImportJobSerializer,
+    Job.Kind.BULK_INVOICE: BulkInvoiceSerializer,
+    Job.Kind.EXPORT: ExportJobSerializer,
+    Job.Kind.ARCHIVE: ArchiveJobSerializer,
+}
+
+
+class JobSubmitSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=Job.Kind.choices)
+    params = serializers.DictField(default=dict)
+
+    def validate(self, attrs):
+        params = JOB_PARAMS_SERIALIZERS[attrs["kind"]](data=attrs["params"])
+        if not params.is_valid():
+            raise serializers.ValidationError({"params": params.errors})
+        # Stored as JSON and validated again, with the same serializer, when the job runs.
+        attrs["params"] = params.data
+        return attrs
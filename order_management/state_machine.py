@@ -0,0 +1,146 @@
+"""Order status transitions.
+
+Every status change goes through this module. Transitions are applied with a
+conditional ``UPDATE ... WHERE status = <expected>`` so a concurrent writer
+that changed the status first makes the update match no rows instead of
+being silently overwritten. Each transition also increments
+``Order.version``, which invalidates cached order payloads, and appends an
+``order.status_changed`` event in the same transaction.
+"""
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import events, order_cache, rollups
+from .models import Order
+
+ALLOWED_TRANSITIONS = {
+    Order.Status.PENDING: {Order.Status.CONFIRMED, Order.Status.CANCELLED},
+    Order.Status.CONFIRMED: {Order.Status.FULFILLMENT_REQUESTED},
+    Order.Status.FULFILLMENT_REQUESTED: {Order.Status.COMPLETED, Order.Status.CANCELLED},
+    Order.Status.COMPLETED: set(),
+    Order.Status.CANCELLED: set(),
+}
+
+
+class InvalidTransition(Exception):
+    def __init__(self, order_id, current, target, message="Invalid status transition"):
+        super().__init__(message)
+        self.order_id = order_id
+        self.current = current
+        self.target = target
+
+
+class TransitionConflict(InvalidTransition):
+    def __init__(self, order_id, current, target):
+        super().__init__(order_id, current, target, "Order status was changed concurrently")
+
+
+def can_transition(current, target):
+    return target in ALLOWED_TRANSITIONS.get(current, set())
+
+
+def sources_for(target):
+    return [current for current, targets in ALLOWED_TRANSITIONS.items() if target in targets]
+
+
+def transition(order, target):
+    """Move ``order`` from its loaded status to ``target`` (compare-and-swap).
+
+    Raises ``InvalidTransition`` if the move is not allowed from the loaded
+    status and ``TransitionConflict`` if the stored row no longer matches the
+    loaded status and version.
+    """
+    current = order.status
+    if not can_transition(current, target):
+        raise InvalidTransition(order.pk, current, target)
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Order.objects.filter(pk=order.pk, status=current, version=order.version).update(
+            status=target, updated_at=now, version=F("version") + 1
+        )
+        if not updated:
+            raise TransitionConflict(order.pk, current, target)
+        rollups.record_transitions(
+            [(order.customer_id, order.created_at, order.currency, order.total_amount, current)], target
+        )
+        events.record_transitions([(order.pk, current)], target)
+        order_cache.invalidate([(order.pk, order.created_at, order.version)])
+    order.status = target
+    order.updated_at = now
+    order.version += 1
+    return order
+
+
+async def atransition(order, target):
+    """Async variant of ``transition``.
+
+    The update and its event are written in one transaction, which the async
+    ORM cannot open, so the write is a single hop to a worker thread.
+    """
+    if not can_transition(order.status, target):
+        raise InvalidTransition(order.pk, order.status, target)
+    return await sync_to_async(transition)(order, target)
+
+
+def transition_many(order_ids, target):
+    """Move every order in ``order_ids`` that may reach ``target`` with one UPDATE.
+
+    Returns ``{order_id: previous_status}`` for the orders that moved; orders
+    that are missing or in a status that cannot reach ``target`` are left
+    untouched.
+    """
+    sources = sources_for(target)
+    with transaction.atomic():
+        rows = list(
+            Order.objects.select_for_update()
+            .filter(pk__in=order_ids, status__in=sources)
+            .values_list("pk", "status", "created_at", "version", "customer_id", "currency", "total_amount")
+        )
+        if rows:
+            Order.objects.filter(pk__in=[row[0] for row in rows], status__in=sources).update(
+                status=target, updated_at=timezone.now(), version=F("version") + 1
+            )
+            rollups.record_transitions(
+                [
+                    (customer_id, created_at, currency, total, status)
+                    for _, status, created_at, _, customer_id, currency, total in rows
+                ],
+                target,
+            )
+            events.record_transitions([(pk, status) for pk, status, *_ in rows], target)
+            order_cache.invalidate([(pk, created_at, version) for pk, _, created_at, version, *_ in rows])
+    return {pk: status for pk, status, *_ in rows}
+
+
+class TransitionResult:
+    APPLIED = "applied"
+    INVALID_TRANSITION = "invalid_transition"
+    NOT_FOUND = "not_found"
+
+
+def apply_transitions(pairs):
+    """Apply many ``(order_id, target_status)`` pairs with one UPDATE per target.
+
+    Returns ``{order_id: (result, previous_or_current_status)}``.
+    """
+    by_target = defaultdict(list)
+    for order_id, target in pairs:
+        by_target[target].append(order_id)
+
+    outcomes = {}
+    with transaction.atomic():
+        for target, order_ids in by_target.items():
+            for order_id, previous in transition_many(order_ids, target).items():
+                outcomes[order_id] = (TransitionResult.APPLIED, previous)
+        rejected = [order_id for order_id, _ in pairs if order_id not in outcomes]
+        current = dict(Order.objects.filter(pk__in=rejected).values_list("pk", "status")) if rejected else {}
+    for order_id in rejected:
+        if order_id in current:
+            outcomes[order_id] = (TransitionResult.INVALID_TRANSITION, current[order_id])
+        else:
+            outcomes[order_id] = (TransitionResult.NOT_FOUND, None)
+    return outcomes
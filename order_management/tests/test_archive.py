@@ -0,0 +1,130 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import archiving, rollups
+from order_management.models import (
+    ArchivedInvoice,
+    ArchivedOrder,
+    CustomerSummary,
+    FulfillmentRequest,
+    Invoice,
+    InvoiceRollup,
+    Order,
+    OrderItem,
+    SalesRollup,
+)
+
+
+def order_payload(external_id):
+    return {
+        "external_id": external_id,
+        "customer_id": "CUST",
+        "total_amount": "15.00",
+        "currency": "TND",
+        "items": [
+            {"product_id": "SKU-1", "product_name": "P1", "quantity": 1, "unit_price": "5.00"},
+            {"product_id": "SKU-2", "product_name": "P2", "quantity": 2, "unit_price": "5.00"},
+        ],
+    }
+
+
+class OrderArchiveTests(APITestCase):
+    def setUp(self):
+        statuses = {
+            "AR-DONE": Order.Status.COMPLETED,
+            "AR-CANCELLED": Order.Status.CANCELLED,
+            "AR-RECENT": Order.Status.COMPLETED,
+            "AR-OPEN": Order.Status.CONFIRMED,
+        }
+        self.orders = {}
+        for external_id, status_ in statuses.items():
+            response = self.client.post("/api/orders/create", order_payload(external_id), format="json")
+            Order.objects.filter(pk=response.data["id"]).update(status=status_)
+            self.orders[external_id] = Order.objects.get(pk=response.data["id"])
+        done = self.orders["AR-DONE"]
+        Invoice.objects.create(order=done, amount=done.total_amount, status=Invoice.Status.PAID)
+        FulfillmentRequest.objects.create(order=done, warehouse_code="WH-1", status=FulfillmentRequest.Status.COMPLETED)
+        old = timezone.now() - timedelta(days=400)
+        Order.objects.exclude(external_id="AR-RECENT").update(updated_at=old)
+        self.old_ids = {self.orders[name].pk for name in ("AR-DONE", "AR-CANCELLED")}
+
+    def test_archives_old_terminal_orders_in_batches(self):
+        summary = archiving.archive_orders(batch_size=1, pause=0)
+        self.assertEqual((summary["archived"], summary["batches"]), (2, 2))
+        self.assertEqual(set(Order.objects.values_list("external_id", flat=True)), {"AR-RECENT", "AR-OPEN"})
+        self.assertEqual(set(ArchivedOrder.objects.values_list("id", flat=True)), self.old_ids)
+        self.assertFalse(OrderItem.objects.filter(order_id__in=self.old_ids).exists())
+        self.assertFalse(Invoice.objects.exists())
+        self.assertFalse(FulfillmentRequest.objects.exists())
+
+        archived = ArchivedOrder.objects.get(external_id="AR-DONE")
+        self.assertEqual((archived.item_count, archived.computed_total, archived.version), (2, 15, 1))
+        self.assertEqual(archived.fulfillment_request["warehouse_code"], "WH-1")
+        self.assertEqual(ArchivedInvoice.objects.get().order_id, archived.pk)
+
+        self.assertEqual(archiving.archive_orders(pause=0)["archived"], 0)
+
+    def test_limit(self):
+        self.assertEqual(archiving.archive_orders(limit=1, pause=0)["archived"], 1)
+        self.assertEqual(ArchivedOrder.objects.count(), 1)
+
+    def test_reads_fall_back_to_archive(self):
+        order_id = self.orders["AR-DONE"].pk
+        url = f"/api/orders/update/{order_id}"
+        live = self.client.get(url)
+        archiving.archive_orders(pause=0)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), live.json())
+        self.assertEqual(response["ETag"], live["ETag"])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=live["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(url, {"fields": "external_id,item_count"})
+        self.assertEqual(response.json(), {"external_id": "AR-DONE", "item_count": 2})
+        self.assertEqual(self.client.get(f"/api/async/orders/{order_id}").json(), live.json())
+
+        response = self.client.patch(url, {"status": "PENDING"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get("/api/orders/update/999999").status_code, status.HTTP_404_NOT_FOUND)
+
+        payload, _ = archiving.archived_order(external_id="AR-DONE")
+        self.assertEqual(payload, live.json())
+
+    def test_archived_external_ids_stay_taken(self):
+        archiving.archive_orders(pause=0)
+        response = self.client.post("/api/orders/create", order_payload("AR-DONE"), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("external_id", response.data)
+
+        response = self.client.post("/api/orders/bulk", [order_payload("AR-CANCELLED")], format="json")
+        self.assertEqual(response.data["results"][0]["status"], "duplicate")
+
+        response = self.client.post("/api/async/orders", order_payload("AR-DONE"), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_counts_archived_orders(self):
+        def snapshot():
+            rollups.rebuild()
+            return (
+                sorted(SalesRollup.objects.values_list("day", "currency", "status", "order_count", "total_amount")),
+                sorted(InvoiceRollup.objects.values_list("day", "currency", "status", "invoice_count", "amount")),
+                sorted(CustomerSummary.objects.values_list("customer_id", "currency", "order_count", "lifetime_value")),
+            )
+
+        before = snapshot()
+        archiving.archive_orders(pause=0)
+        self.assertEqual(snapshot(), before)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("archive_orders", "--older-than-days", "0", "--pause", "0", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["archived"], 3)
+        self.assertEqual(list(Order.objects.values_list("external_id", flat=True)), ["AR-OPEN"])
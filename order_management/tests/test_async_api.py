@@ -0,0 +1,66 @@
+from django.test import TestCase
+from rest_framework import status
+
+from order_management.models import Order, OrderItem
+
+
+class AsyncOrderAPITests(TestCase):
+    def setUp(self):
+        self.payload = {
+            "external_id": "ASYNC-1",
+            "customer_id": "CUST",
+            "total_amount": "30.00",
+            "currency": "TND",
+            "items": [
+                {"product_id": "SKU-1", "product_name": "A", "quantity": 1, "unit_price": "10.00"},
+                {"product_id": "SKU-2", "product_name": "B", "quantity": 2, "unit_price": "10.00"},
+            ],
+        }
+
+    async def test_create_and_read(self):
+        response = await self.async_client.post("/api/async/orders", self.payload, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        created = response.json()
+        self.assertEqual(created["status"], Order.Status.PENDING)
+        self.assertEqual(len(created["items"]), 2)
+        self.assertEqual(await OrderItem.objects.acount(), 2)
+
+        response = await self.async_client.get(f"/api/async/orders/{created['id']}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), created)
+
+    async def test_matches_sync_representation(self):
+        response = await self.async_client.post("/api/async/orders", self.payload, content_type="application/json")
+        order_id = response.json()["id"]
+        sync_response = await self.async_client.get(f"/api/orders/update/{order_id}")
+        async_response = await self.async_client.get(f"/api/async/orders/{order_id}")
+        self.assertEqual(async_response.content, sync_response.content)
+
+    async def test_create_validation_errors(self):
+        await self.async_client.post("/api/async/orders", self.payload, content_type="application/json")
+        response = await self.async_client.post("/api/async/orders", self.payload, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("external_id", response.json())
+
+        payload = {**self.payload, "external_id": "ASYNC-2", "total_amount": "1.00"}
+        response = await self.async_client.post("/api/async/orders", payload, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = await self.async_client.post("/api/async/orders", "{", content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_status_update(self):
+        order = await Order.objects.acreate(external_id="ASYNC-S", customer_id="C", total_amount=1)
+        url = f"/api/async/orders/{order.pk}"
+        response = await self.async_client.patch(url, {"status": "CONFIRMED"}, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["status"], Order.Status.CONFIRMED)
+        await order.arefresh_from_db()
+        self.assertEqual(order.status, Order.Status.CONFIRMED)
+
+        response = await self.async_client.patch(url, {"status": "PENDING"}, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_not_found(self):
+        response = await self.async_client.get("/api/async/orders/999")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,92 @@
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F, Sum
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+
+from order_management.benchmarking import compare, delete_benchmark_orders, run_concurrently, summarize
+from order_management.models import FulfillmentRequest, Invoice, Order, OrderEvent, OrderItem, OutboxMessage
+from order_management.seeding import FULFILLED_STATUSES, INVOICED_STATUSES, seed_orders
+
+
+class SeedOrdersTests(TestCase):
+    def test_seeds_consistent_rows(self):
+        counts = seed_orders(120, items_per_order=3, batch_size=50, prefix="T", seed=1)
+        self.assertEqual(counts["orders"], 120)
+        self.assertEqual(counts["items"], 360)
+        self.assertEqual(OrderItem.objects.count(), 360)
+
+        totals = Order.objects.annotate(
+            items_total=Sum(F("items__quantity") * F("items__unit_price")), line_count=Count("items")
+        )
+        for order in totals:
+            self.assertEqual((order.line_count, order.item_count), (3, 3))
+            self.assertEqual(order.total_amount, order.items_total)
+            self.assertEqual(order.computed_total, order.items_total)
+
+        self.assertEqual(Invoice.objects.count(), Order.objects.filter(status__in=INVOICED_STATUSES).count())
+        self.assertEqual(FulfillmentRequest.objects.count(), Order.objects.filter(status__in=FULFILLED_STATUSES).count())
+        self.assertFalse(Invoice.objects.exclude(amount=F("order__total_amount")).exists())
+
+    def test_command_refuses_existing_prefix(self):
+        out = StringIO()
+        call_command("seed_orders", orders=10, items=1, prefix="CMD", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["orders"], 10)
+        with self.assertRaises(CommandError):
+            call_command("seed_orders", orders=10, items=1, prefix="CMD", stdout=StringIO())
+
+
+class BenchmarkingTests(SimpleTestCase):
+    def test_summarize(self):
+        stats = summarize([0.001 * n for n in range(1, 101)], elapsed=2.0, errors=1)
+        self.assertEqual(stats["requests"], 100)
+        self.assertEqual(stats["rps"], 50.0)
+        self.assertEqual((stats["p50_ms"], stats["p95_ms"], stats["p99_ms"]), (50.0, 95.0, 99.0))
+
+    def test_run_concurrently_keeps_order_and_counts_errors(self):
+        stats, responses = run_concurrently([lambda n=n: (200 if n % 4 else 500, n) for n in range(20)], 4)
+        self.assertEqual([body for _, body in responses], list(range(20)))
+        self.assertEqual(stats["errors"], 5)
+
+    def test_compare(self):
+        comparison = compare(
+            {"list": {"p50_ms": 10.0, "rps": 100.0}, "gone": {}},
+            {"list": {"p50_ms": 12.0, "rps": 80.0}, "new": {}},
+            metrics=("p50_ms", "rps"),
+        )
+        self.assertEqual(list(comparison), ["list"])
+        self.assertEqual(comparison["list"]["p50_ms"]["change_pct"], 20.0)
+        self.assertEqual(comparison["list"]["rps"]["change_pct"], -20.0)
+
+
+class BenchmarkCleanupTests(APITestCase):
+    def create_order(self, external_id):
+        payload = {
+            "external_id": external_id,
+            "customer_id": "CUST",
+            "total_amount": "10.00",
+            "items": [{"product_id": "SKU", "product_name": "P", "quantity": 1, "unit_price": "10.00"}],
+        }
+        order_id = self.client.post("/api/orders/create", payload, format="json").data["id"]
+        self.client.patch(f"/api/orders/update/{order_id}", {"status": "CONFIRMED"}, format="json")
+        self.client.post("/api/oms/fulfillment", {"order": order_id, "warehouse_code": "WH-1"}, format="json")
+        return order_id
+
+    def test_write_scenarios_need_an_explicit_cleanup_choice(self):
+        with self.assertRaisesMessage(CommandError, "--allow-cleanup"):
+            call_command("bench_api", "--url", "http://127.0.0.1:9", stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, "--allow-cleanup"):
+            call_command("bench_async", stdout=StringIO())
+
+    def test_cleanup_removes_events_and_pending_messages(self):
+        kept = self.create_order("REAL-1")
+        benchmark = self.create_order("BENCH-API-test-1")
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+        delete_benchmark_orders("BENCH-API-test")
+        self.assertEqual(list(Order.objects.values_list("pk", flat=True)), [kept])
+        self.assertFalse(OrderEvent.objects.filter(order_id=benchmark).exists())
+        self.assertTrue(OrderEvent.objects.filter(order_id=kept).exists())
+        self.assertEqual([message.payload["order_id"] for message in OutboxMessage.objects.all()], [kept])
@@ -0,0 +1,67 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management.models import Order, OrderItem
+
+
+def make_payload(external_id, unit_price=50):
+    return {
+        "external_id": external_id,
+        "customer_id": "CUST-1",
+        "total_amount": unit_price * 2,
+        "currency": "TND",
+        "items": [
+            {"product_id": "SKU-1", "product_name": "Product", "quantity": 2, "unit_price": unit_price},
+        ],
+    }
+
+
+class BulkOrderAPITests(APITestCase):
+    def setUp(self):
+        self.url = "/api/orders/bulk"
+
+    def test_bulk_create_success(self):
+        payloads = [make_payload(f"BULK-{i}") for i in range(20)]
+        response = self.client.post(self.url, payloads, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 20)
+        self.assertEqual(Order.objects.count(), 20)
+        self.assertEqual(OrderItem.objects.count(), 20)
+        self.assertTrue(all(result["status"] == "created" for result in response.data["results"]))
+        self.assertIn("orders_per_second", response.data)
+
+    def test_bulk_create_uses_batched_inserts(self):
+        payloads = [make_payload(f"BULK-{i}") for i in range(50)]
+        # duplicate lookup + savepoint + order insert + item insert + event insert + 2 rollup upserts + release
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url, payloads, format="json")
+        self.assertEqual(response.data["created"], 50)
+
+    def test_bulk_reports_duplicates_and_validation_errors(self):
+        Order.objects.create(external_id="BULK-EXISTING", customer_id="C", total_amount=10, currency="TND")
+        payloads = [
+            make_payload("BULK-NEW"),
+            make_payload("BULK-EXISTING"),
+            make_payload("BULK-NEW"),
+            {**make_payload("BULK-BAD"), "total_amount": 1},
+        ]
+        response = self.client.post(self.url, payloads, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["created", "duplicate", "duplicate", "invalid"])
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["duplicate"], 2)
+        self.assertEqual(response.data["invalid"], 1)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_bulk_requires_list(self):
+        response = self.client.post(self.url, make_payload("BULK-1"), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(OMS_BULK_MAX_ORDERS=2)
+    def test_bulk_rejects_oversized_batches(self):
+        payloads = [make_payload(f"BULK-{i}") for i in range(3)]
+        response = self.client.post(self.url, payloads, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), 0)
@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management.models import CustomerSummary, Order
+
+
+def order_payload(external_id, customer_id, amount="10.00", currency="TND"):
+    return {
+        "external_id": external_id,
+        "customer_id": customer_id,
+        "total_amount": amount,
+        "currency": currency,
+        "items": [{"product_id": "SKU", "product_name": "P", "quantity": 1, "unit_price": amount}],
+    }
+
+
+class CustomerOrdersTests(APITestCase):
+    url = "/api/customers/CUST-1/orders"
+
+    def setUp(self):
+        for i, amount in enumerate(["10.00", "20.00", "30.00"]):
+            self.client.post("/api/orders/create", order_payload(f"CU-{i}", "CUST-1", amount), format="json")
+        self.client.post(
+            "/api/orders/bulk",
+            [order_payload("CU-E", "CUST-1", "5.00", "EUR"), order_payload("CU-X", "CUST-2", "99.00")],
+            format="json",
+        )
+        self.ids = dict(Order.objects.values_list("external_id", "id"))
+
+    def test_lists_customer_orders_with_summary(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([order["external_id"] for order in response.data["results"]], ["CU-E", "CU-2"])
+        customer = response.data["customer"]
+        self.assertEqual(customer["order_count"], 4)
+        self.assertEqual(customer["lifetime_value"], {"EUR": "5.00", "TND": "60.00"})
+        self.assertEqual(customer["last_order_at"], response.data["results"][0]["created_at"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([order["external_id"] for order in response.data["results"]], ["CU-1", "CU-0"])
+        self.assertIsNone(response.data["next"])
+
+    def test_cancellation_reduces_lifetime_value(self):
+        self.client.patch(f"/api/orders/update/{self.ids['CU-1']}", {"status": "CANCELLED"}, format="json")
+        self.client.post("/api/orders/transitions", [{"id": self.ids["CU-E"], "status": "CANCELLED"}], format="json")
+        customer = self.client.get(self.url).data["customer"]
+        self.assertEqual((customer["order_count"], customer["lifetime_value"]), (4, {"EUR": "0.00", "TND": "40.00"}))
+
+        incremental = list(CustomerSummary.objects.order_by("customer_id", "currency").values())
+        call_command("rebuild_rollups", stdout=StringIO())
+        rebuilt = list(CustomerSummary.objects.order_by("customer_id", "currency").values())
+        self.assertEqual(
+            [{k: v for k, v in row.items() if k != "id"} for row in rebuilt],
+            [{k: v for k, v in row.items() if k != "id"} for row in incremental],
+        )
+
+    def test_filters_and_unknown_customer(self):
+        response = self.client.get(self.url, {"currency": "EUR"})
+        self.assertEqual([order["external_id"] for order in response.data["results"]], ["CU-E"])
+        response = self.client.get("/api/customers/NOBODY/orders")
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["customer"]["order_count"], 0)
+        self.assertIsNone(response.data["customer"]["last_order_at"])
@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TransactionTestCase, override_settings
+
+from order_management.db import retry_on_database_locked
+from order_management.models import Order
+
+
+@override_settings(OMS_DB_LOCK_RETRIES=2, OMS_DB_LOCK_RETRY_BACKOFF=0)
+class RetryOnDatabaseLockedTests(TransactionTestCase):
+    def test_retries_locked_writes(self):
+        calls = []
+
+        @retry_on_database_locked
+        def write():
+            calls.append(1)
+            Order.objects.create(external_id=f"LOCK-{len(calls)}", customer_id="C", total_amount=1)
+            if len(calls) < 3:
+                raise OperationalError("database is locked")
+            return "ok"
+
+        self.assertEqual(write(), "ok")
+        self.assertEqual(len(calls), 3)
+        # Failed attempts were rolled back.
+        self.assertEqual(list(Order.objects.values_list("external_id", flat=True)), ["LOCK-3"])
+
+    def test_gives_up_after_configured_retries(self):
+        write = mock.Mock(side_effect=OperationalError("database is locked"))
+        with self.assertRaises(OperationalError):
+            retry_on_database_locked(write)()
+        self.assertEqual(write.call_count, 3)
+
+    def test_other_errors_are_not_retried(self):
+        write = mock.Mock(side_effect=OperationalError("no such table: foo"))
+        with self.assertRaises(OperationalError):
+            retry_on_database_locked(write)()
+        self.assertEqual(write.call_count, 1)
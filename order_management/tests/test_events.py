@@ -0,0 +1,197 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import idempotency, state_machine, wms
+from order_management.models import Order, OrderEvent
+
+
+def order_payload(external_id):
+    return {
+        "external_id": external_id,
+        "customer_id": "CUST",
+        "total_amount": "10.00",
+        "currency": "TND",
+        "items": [{"product_id": "SKU", "product_name": "P", "quantity": 1, "unit_price": "10.00"}],
+    }
+
+
+class OrderEventRecordingTests(APITestCase):
+    def test_create_and_status_update(self):
+        response = self.client.post("/api/orders/create", order_payload("EV-1"), format="json")
+        order_id = response.data["id"]
+        self.client.patch(f"/api/orders/update/{order_id}", {"status": Order.Status.CONFIRMED}, format="json")
+
+        created, confirmed = OrderEvent.objects.order_by("seq")
+        self.assertEqual((created.order_id, created.type, created.to_status), (order_id, "order.created", "PENDING"))
+        self.assertEqual(created.data["external_id"], "EV-1")
+        self.assertEqual(created.data["total_amount"], "10.00")
+        self.assertEqual(
+            (confirmed.type, confirmed.from_status, confirmed.to_status), ("order.status_changed", "PENDING", "CONFIRMED")
+        )
+
+    def test_bulk_create_and_transitions(self):
+        response = self.client.post("/api/orders/bulk", [order_payload(f"EV-B{i}") for i in range(3)], format="json")
+        ids = [result["id"] for result in response.data["results"]]
+        self.client.post("/api/orders/transitions", [{"id": pk, "status": "CANCELLED"} for pk in ids], format="json")
+
+        events = list(OrderEvent.objects.order_by("seq").values_list("order_id", "type"))
+        self.assertEqual(events[:3], [(pk, "order.created") for pk in ids])
+        self.assertEqual(sorted(events[3:]), [(pk, "order.status_changed") for pk in ids])
+
+    def test_rejected_transition_records_nothing(self):
+        order = Order.objects.create(external_id="EV-C", customer_id="C", total_amount=1)
+        stale = Order.objects.get(pk=order.pk)
+        state_machine.transition(order, Order.Status.CONFIRMED)
+        with self.assertRaises(state_machine.TransitionConflict):
+            state_machine.transition(stale, Order.Status.CANCELLED)
+        self.assertEqual(OrderEvent.objects.count(), 1)
+
+
+class EventWriteOrderTests(APITestCase):
+    """Writes that can wait on another transaction happen before the event, never between it and the commit."""
+
+    def stall(self, module, name):
+        original = getattr(module, name)
+
+        def stalled(*args, **kwargs):
+            result = original(*args, **kwargs)
+            # Stands in for waiting on a lock held by a concurrent transaction.
+            time.sleep(0.01)
+            self.stalled_until = timezone.now()
+            return result
+
+        return mock.patch.object(module, name, stalled)
+
+    def test_idempotency_key_is_stored_before_the_event(self):
+        with self.stall(idempotency, "reserve"):
+            response = self.client.post(
+                "/api/orders/create", order_payload("EV-IK"), format="json", HTTP_IDEMPOTENCY_KEY="ev-ik"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = OrderEvent.objects.get(order_id=response.data["id"])
+        self.assertGreaterEqual(event.created_at, self.stalled_until)
+
+    def test_fulfillment_and_outbox_are_written_before_the_event(self):
+        order = Order.objects.create(
+            external_id="EV-F", customer_id="C", total_amount=1, status=Order.Status.CONFIRMED
+        )
+        with self.stall(wms, "enqueue_fulfillment"):
+            response = self.client.post("/api/oms/fulfillment", {"order": order.id, "warehouse_code": "WH-1"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = OrderEvent.objects.get(order_id=order.id)
+        self.assertEqual(event.to_status, Order.Status.FULFILLMENT_REQUESTED)
+        self.assertGreaterEqual(event.created_at, self.stalled_until)
+
+
+class AsyncOrderEventTests(TestCase):
+    async def test_async_status_update(self):
+        order = await Order.objects.acreate(external_id="EV-A", customer_id="C", total_amount=1)
+        await self.async_client.patch(
+            f"/api/async/orders/{order.pk}", {"status": "CONFIRMED"}, content_type="application/json"
+        )
+        event = await OrderEvent.objects.aget(order_id=order.pk)
+        self.assertEqual(event.to_status, Order.Status.CONFIRMED)
+
+
+@override_settings(OMS_EVENTS_SAFETY_LAG=0)
+class OrderEventAPITests(APITestCase):
+    url = "/api/events"
+
+    def setUp(self):
+        self.orders = [Order.objects.create(external_id=f"EV-{i}", customer_id="C", total_amount=1) for i in range(3)]
+        for order in self.orders:
+            state_machine.transition(order, Order.Status.CONFIRMED)
+        state_machine.transition(self.orders[0], Order.Status.FULFILLMENT_REQUESTED)
+        self.seqs = list(OrderEvent.objects.order_by("seq").values_list("seq", flat=True))
+
+    def test_tail_with_cursor(self):
+        response = self.client.get(self.url, {"limit": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([event["seq"] for event in response.data["results"]], self.seqs[:3])
+        self.assertIn(f"after={self.seqs[2]}", response.data["next"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([event["seq"] for event in response.data["results"]], self.seqs[3:])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"], [])
+        self.assertIn(f"after={self.seqs[-1]}", response.data["next"])
+
+    def test_filters(self):
+        response = self.client.get(self.url, {"order": self.orders[0].id})
+        statuses = [event["to_status"] for event in response.data["results"]]
+        self.assertEqual(statuses, ["CONFIRMED", "FULFILLMENT_REQUESTED"])
+        response = self.client.get(self.url, {"type": "order.status_changed", "after": self.seqs[0]})
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_is_a_watermark_and_a_range_read(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {"after": self.seqs[1]})
+
+    @override_settings(OMS_EVENTS_SAFETY_LAG=60)
+    def test_recent_events_and_their_successors_are_held_back(self):
+        OrderEvent.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        OrderEvent.objects.filter(seq=self.seqs[2]).update(created_at=timezone.now())
+        response = self.client.get(self.url)
+        self.assertEqual([event["seq"] for event in response.data["results"]], self.seqs[:2])
+        self.assertIn(f"after={self.seqs[1]}", response.data["next"])
+
+        OrderEvent.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        response = self.client.get(response.data["next"])
+        self.assertEqual([event["seq"] for event in response.data["results"]], self.seqs[2:])
+
+    def test_invalid_parameters(self):
+        for params in ({"after": "x"}, {"after": -1}, {"limit": 0}, {"wait": "soon"}, {"wait": "nan"}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(OMS_EVENTS_POLL_INTERVAL=0.02)
+    def test_long_poll_returns_empty_after_wait(self):
+        started = time.monotonic()
+        response = self.client.get(self.url, {"after": self.seqs[-1], "wait": 0.1})
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+        self.assertEqual(response.data["results"], [])
+
+    @override_settings(OMS_EVENTS_POLL_INTERVAL=0.02, OMS_EVENTS_MAX_WAIT=0.1)
+    def test_long_poll_wait_is_capped(self):
+        started = time.monotonic()
+        response = self.client.get(self.url, {"after": self.seqs[-1], "wait": 30})
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(response.data["results"], [])
+
+    def test_long_poll_returns_immediately_when_events_exist(self):
+        started = time.monotonic()
+        response = self.client.get(self.url, {"wait": 10})
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(len(response.data["results"]), len(self.seqs))
+
+
+@override_settings(OMS_EVENTS_SAFETY_LAG=0, OMS_EVENTS_POLL_INTERVAL=0.02)
+class AsyncOrderEventAPITests(TestCase):
+    url = "/api/async/events"
+
+    async def test_tail_and_long_poll(self):
+        order = await Order.objects.acreate(external_id="EV-AS", customer_id="C", total_amount=1)
+        await self.async_client.patch(
+            f"/api/async/orders/{order.pk}", {"status": "CONFIRMED"}, content_type="application/json"
+        )
+        response = await self.async_client.get(self.url, {"order": order.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        (event,) = response.json()["results"]
+        self.assertEqual((event["order_id"], event["to_status"]), (order.pk, "CONFIRMED"))
+
+        started = time.monotonic()
+        response = await self.async_client.get(self.url, {"after": event["seq"], "wait": 0.1})
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+        self.assertEqual(response.json()["results"], [])
+        self.assertIn(f"after={event['seq']}", response.json()["next"])
+
+    async def test_invalid_parameters(self):
+        for params in ({"after": -1}, {"wait": "nan"}, {"limit": "many"}):
+            response = await self.async_client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management.models import Order, OrderItem
+
+
+@override_settings(OMS_EXPORT_CHUNK_SIZE=2)
+class OrderExportAPITests(APITestCase):
+    def setUp(self):
+        self.url = "/api/orders/export"
+        for i in range(5):
+            order = Order.objects.create(
+                external_id=f"EXP-{i}",
+                customer_id="CUST",
+                total_amount="30.50",
+                currency="TND",
+                status=Order.Status.CANCELLED if i == 4 else Order.Status.PENDING,
+            )
+            OrderItem.objects.create(order=order, product_id="SKU-1", product_name="A", quantity=1, unit_price="10.50")
+            OrderItem.objects.create(order=order, product_id="SKU-2", product_name="B", quantity=2, unit_price="10.00")
+
+    def read(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([r["external_id"] for r in records], [f"EXP-{i}" for i in range(5)])
+        self.assertEqual(records[0]["total_amount"], "30.50")
+        self.assertEqual(
+            records[0]["items"][1],
+            {"product_id": "SKU-2", "product_name": "B", "quantity": 2, "unit_price": "10.00"},
+        )
+
+    def test_csv_export(self):
+        response = self.client.get(f"{self.url}?format=csv")
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        self.assertEqual(rows[0][:2], ["order_id", "external_id"])
+        self.assertEqual(len(rows), 1 + 10)
+        self.assertEqual(rows[1][1], "EXP-0")
+        self.assertEqual(rows[1][-1], "10.50")
+
+    def test_export_respects_filters(self):
+        response = self.client.get(f"{self.url}?status=CANCELLED")
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([r["external_id"] for r in records], ["EXP-4"])
+
+    def test_export_reads_items_per_chunk(self):
+        response = self.client.get(self.url)
+        # 3 chunks of orders: one order query plus one item query per chunk.
+        with self.assertNumQueries(4):
+            self.read(response)
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import archiving
+from order_management.models import Order
+
+
+def order_payload(external_id):
+    return {
+        "external_id": external_id,
+        "customer_id": "CUST",
+        "total_amount": "10.00",
+        "currency": "TND",
+        "items": [{"product_id": "SKU", "product_name": "P", "quantity": 1, "unit_price": "10.00"}],
+    }
+
+
+class OrderByExternalIdTests(APITestCase):
+    def setUp(self):
+        response = self.client.post("/api/orders/create", order_payload("EXT-1"), format="json")
+        self.order_id = response.data["id"]
+        self.url = "/api/orders/by-external/EXT-1"
+
+    def test_get_matches_pk_read(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_pk = self.client.get(f"/api/orders/update/{self.order_id}")
+        self.assertEqual(response.json(), by_pk.json())
+        self.assertEqual(response["ETag"], by_pk["ETag"])
+
+        # One lookup on the unique external_id index; the payload comes from the cache.
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(self.url)
+        self.assertIn('"external_id" =', context.captured_queries[0]["sql"])
+        self.assertEqual(response.data["external_id"], "EXT-1")
+
+        response = self.client.get(self.url, {"fields": "id,status"})
+        self.assertEqual(response.json(), {"id": self.order_id, "status": "PENDING"})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=by_pk["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_patch(self):
+        response = self.client.patch(self.url, {"status": "CONFIRMED"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "CONFIRMED")
+        self.assertEqual(Order.objects.get(pk=self.order_id).status, Order.Status.CONFIRMED)
+
+        response = self.client.patch(self.url, {"status": "PENDING"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_external_id(self):
+        self.assertEqual(self.client.get("/api/orders/by-external/NOPE").status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch("/api/orders/by-external/NOPE", {"status": "CONFIRMED"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deleted_and_archived_orders(self):
+        self.client.get(self.url)
+        Order.objects.get(pk=self.order_id).delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        order_id = self.client.post("/api/orders/create", order_payload("EXT-3"), format="json").data["id"]
+        Order.objects.filter(pk=order_id).update(status=Order.Status.CANCELLED)
+        live = self.client.get("/api/orders/by-external/EXT-3")
+        archiving.archive_orders(older_than=timezone.now() + timedelta(seconds=1), pause=0)
+        response = self.client.get("/api/orders/by-external/EXT-3")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.json(), response["ETag"]), (live.json(), live["ETag"]))
@@ -0,0 +1,97 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+from django.db.models import Prefetch
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from order_management import fastpath
+from order_management.models import FulfillmentRequest, Invoice, Order, OrderItem
+from order_management.renderers import ORJSONRenderer
+from order_management.serializers import FulfillmentRequestSerializer, InvoiceSerializer, OrderSerializer
+
+
+def create_orders():
+    first = Order.objects.create(external_id="FAST-1", customer_id="Zoé", total_amount=Decimal("12.5"))
+    OrderItem.objects.create(order=first, product_id="SKU-2", product_name="Thé vert", quantity=1, unit_price=Decimal("2.5"))
+    OrderItem.objects.create(order=first, product_id="SKU-1", product_name="Café", quantity=2, unit_price=5)
+    second = Order.objects.create(external_id="FAST-2", customer_id="C", total_amount=0, status=Order.Status.CANCELLED)
+    Invoice.objects.create(order=first, amount=Decimal("12.50"), paid_at=timezone.now(), status=Invoice.Status.PAID)
+    Invoice.objects.create(order=second, amount=0, payment_method="ONLINE")
+    FulfillmentRequest.objects.create(order=first, warehouse_code="WH-1")
+    return first, second
+
+
+class FastPathRenderingTests(TestCase):
+    def setUp(self):
+        create_orders()
+
+    def assertSameJSON(self, fast, serialized):
+        self.assertEqual(ORJSONRenderer().render(fast), JSONRenderer().render(serialized))
+
+    def test_orders(self):
+        orders = Order.objects.order_by("id").prefetch_related(
+            Prefetch("items", queryset=OrderItem.objects.order_by("id"))
+        )
+        with self.assertNumQueries(2):
+            fast = fastpath.render_orders(Order.objects.order_by("id").values(*fastpath.ORDER_VALUES))
+        self.assertSameJSON(fast, OrderSerializer(orders, many=True).data)
+        self.assertEqual(fast[1]["items"], [])
+
+    def test_invoices(self):
+        fast = fastpath.render_invoices(Invoice.objects.order_by("id").values(*fastpath.INVOICE_VALUES))
+        self.assertSameJSON(fast, InvoiceSerializer(Invoice.objects.order_by("id"), many=True).data)
+        self.assertIsNone(fast[1]["paid_at"])
+
+    def test_fulfillments(self):
+        rows = FulfillmentRequest.objects.order_by("id").values(*fastpath.FULFILLMENT_VALUES)
+        serialized = FulfillmentRequestSerializer(FulfillmentRequest.objects.order_by("id"), many=True).data
+        self.assertSameJSON(fastpath.render_fulfillments(rows), serialized)
+
+    def test_empty(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(fastpath.render_orders([]), [])
+
+
+class ORJSONRendererTests(TestCase):
+    def test_matches_json_renderer(self):
+        data = {
+            "amount": Decimal("1.10"),
+            "at": datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2024, 1, 2),
+            "id": uuid.UUID(int=1),
+            "label": gettext_lazy("Invalid cursor"),
+            "text": "ünïcode \u2028\u2029 \"quoted\"",
+            "nested": [{"n": 1, "f": 0.5, "b": True, "none": None}],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_and_empty(self):
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render(None), b"")
+        self.assertEqual(
+            renderer.render({"a": [1]}, "application/json; indent=2"),
+            JSONRenderer().render({"a": [1]}, "application/json; indent=2"),
+        )
+
+
+class FastListEndpointTests(APITestCase):
+    def setUp(self):
+        self.first, self.second = create_orders()
+
+    def test_order_list(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/orders/create")
+        orders = [self.second, self.first]
+        expected = JSONRenderer().render({"next": None, "results": OrderSerializer(orders, many=True).data})
+        self.assertEqual(response.content, expected)
+
+    def test_invoice_and_fulfillment_lists(self):
+        response = self.client.get("/api/oms/invoice", {"status": "PAID"})
+        self.assertEqual([row["order"] for row in response.data["results"]], [self.first.id])
+        response = self.client.get("/api/oms/fulfillment", {"limit": 1})
+        self.assertEqual(response.data["results"][0]["warehouse_code"], "WH-1")
@@ -47,5 +47,5 @@ class FulfillmentAPITests(APITestCase):
         self.client.post(self.url, {"order": self.order.id, "warehouse_code": "WH-SFAX"}, format="json")
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["order"], self.order.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["order"], self.order.id)
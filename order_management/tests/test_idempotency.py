@@ -0,0 +1,75 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management.models import FulfillmentRequest, IdempotencyKey, Invoice, Order
+
+
+class IdempotencyKeyTests(APITestCase):
+    def setUp(self):
+        self.payload = {
+            "external_id": "IDEM-1",
+            "customer_id": "CUST",
+            "total_amount": 10,
+            "currency": "TND",
+            "items": [{"product_id": "SKU", "product_name": "P", "quantity": 1, "unit_price": 10}],
+        }
+
+    def post(self, url, payload, key):
+        return self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_order_retry_replays_original_response(self):
+        first = self.post("/api/orders/create", self.payload, "key-1")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(1):
+            retry = self.post("/api/orders/create", self.payload, "key-1")
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reuse_with_different_payload_is_rejected(self):
+        self.post("/api/orders/create", self.payload, "key-1")
+        response = self.post("/api/orders/create", {**self.payload, "external_id": "IDEM-2"}, "key-1")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_requests_are_not_stored(self):
+        response = self.post("/api/orders/create", {**self.payload, "items": []}, "key-1")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        response = self.post("/api/orders/create", self.payload, "key-1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_invoice_and_fulfillment_retries(self):
+        order = Order.objects.create(
+            external_id="IDEM-INV", customer_id="C", total_amount=10, status=Order.Status.CONFIRMED
+        )
+        invoice = {"order": order.id, "amount": 10, "payment_method": "COD"}
+        self.post("/api/oms/invoice", invoice, "inv-1")
+        retry = self.post("/api/oms/invoice", invoice, "inv-1")
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Invoice.objects.count(), 1)
+
+        fulfillment = {"order": order.id, "warehouse_code": "WH"}
+        self.post("/api/oms/fulfillment", fulfillment, "ful-1")
+        retry = self.post("/api/oms/fulfillment", fulfillment, "ful-1")
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(FulfillmentRequest.objects.count(), 1)
+
+    def test_expired_keys_are_evicted(self):
+        self.post("/api/orders/create", self.payload, "key-1")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        response = self.post("/api/orders/create", self.payload, "key-1")
+        # The original key expired, so the retry is processed (and rejected) as a new request.
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_command(self):
+        self.post("/api/orders/create", self.payload, "key-1")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        call_command("purge_idempotency_keys", stdout=io.StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
@@ -0,0 +1,88 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import Sum
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import invoicing
+from order_management.models import Invoice, InvoiceRollup, Order
+
+
+class BulkInvoicingTests(APITestCase):
+    url = "/api/oms/invoice/bulk"
+
+    def setUp(self):
+        statuses = [Order.Status.CONFIRMED] * 5 + [
+            Order.Status.PENDING,
+            Order.Status.CANCELLED,
+            Order.Status.COMPLETED,
+        ]
+        self.orders = [
+            Order.objects.create(external_id=f"INV-{i}", customer_id="C", total_amount=10 + i, status=status_)
+            for i, status_ in enumerate(statuses)
+        ]
+        Invoice.objects.create(order=self.orders[0], amount=10)
+
+    def invoiced_ids(self):
+        return set(Invoice.objects.values_list("order_id", flat=True))
+
+    def test_invoices_uninvoiced_orders_in_chunks(self):
+        # Per chunk: one locking SELECT, one INSERT and one rollup upsert.
+        with self.assertNumQueries(6):
+            summary = invoicing.bulk_invoice(chunk_size=3)
+        self.assertEqual((summary["invoiced"], summary["chunks"]), (5, 2))
+        self.assertEqual(self.invoiced_ids(), {order.id for order in self.orders[:5] + self.orders[7:]})
+        invoice = Invoice.objects.get(order=self.orders[7])
+        self.assertEqual((invoice.amount, invoice.status), (17, Invoice.Status.ISSUED))
+        self.assertIsNotNone(invoice.issued_at)
+
+        self.assertEqual(invoicing.bulk_invoice()["invoiced"], 0)
+
+    def test_order_invoiced_concurrently_is_skipped(self):
+        # An API invoice committed after the chunk's SELECT, as under READ
+        # COMMITTED, must not abort the run or be counted twice.
+        insert = invoicing._insert_invoices
+
+        def invoice_one_first(invoices):
+            if not Invoice.objects.filter(order_id=self.orders[2].id).exists():
+                Invoice.objects.create(order=self.orders[2], amount=1, payment_method="ONLINE")
+            return insert(invoices)
+
+        with mock.patch.object(invoicing, "_insert_invoices", invoice_one_first):
+            summary = invoicing.bulk_invoice(chunk_size=3)
+        self.assertEqual((summary["invoiced"], summary["chunks"]), (4, 2))
+        self.assertEqual(self.invoiced_ids(), {order.id for order in self.orders[:5] + self.orders[7:]})
+        self.assertEqual(Invoice.objects.get(order=self.orders[2]).payment_method, "ONLINE")
+        self.assertEqual(InvoiceRollup.objects.aggregate(count=Sum("invoice_count"))["count"], 4)
+
+    def test_chunk_is_inserted_within_the_bind_parameter_limit(self):
+        # Seven columns per invoice: at most two invoices per INSERT, so one
+        # locking SELECT, three INSERTs and one rollup upsert.
+        with mock.patch.object(invoicing, "MAX_QUERY_PARAMS", 14), self.assertNumQueries(5):
+            summary = invoicing.bulk_invoice(chunk_size=10)
+        self.assertEqual((summary["invoiced"], summary["chunks"]), (5, 1))
+        self.assertEqual(self.invoiced_ids(), {order.id for order in self.orders[:5] + self.orders[7:]})
+        self.assertEqual(InvoiceRollup.objects.aggregate(count=Sum("invoice_count"))["count"], 5)
+
+    def test_limit_and_status(self):
+        self.assertEqual(invoicing.bulk_invoice(statuses=[Order.Status.CONFIRMED], limit=2)["invoiced"], 2)
+        self.assertEqual(self.invoiced_ids(), {order.id for order in self.orders[:3]})
+        with self.assertRaises(ValueError):
+            invoicing.bulk_invoice(statuses=[Order.Status.CANCELLED])
+
+    def test_api(self):
+        response = self.client.post(self.url, {"status": ["PENDING"], "payment_method": "ONLINE"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["invoiced"], 1)
+        self.assertEqual(Invoice.objects.get(order=self.orders[5]).payment_method, "ONLINE")
+
+        response = self.client.post(self.url, {"status": ["CANCELLED"]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("invoice_orders", "--chunk-size", "2", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["invoiced"], 5)
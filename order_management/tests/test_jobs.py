@@ -0,0 +1,189 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import jobs
+from order_management.models import ArchivedInvoice, ArchivedOrder, Invoice, Job, Order, OrderItem
+
+
+def order_payload(external_id, amount="10.00"):
+    return {
+        "external_id": external_id,
+        "customer_id": "CUST",
+        "total_amount": amount,
+        "currency": "TND",
+        "items": [{"product_id": "SKU", "product_name": "P", "quantity": 1, "unit_price": amount}],
+    }
+
+
+def run_jobs():
+    worker = jobs.Worker(processes=0)
+    started = 0
+    while worker.run_once():
+        started += 1
+    return started
+
+
+@override_settings(OMS_JOB_PROGRESS_INTERVAL=0, OMS_JOB_IMPORT_CHUNK_SIZE=2)
+class JobAPITests(APITestCase):
+    url = "/api/jobs"
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        settings_override = override_settings(OMS_JOB_OUTPUT_DIR=self.output_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def submit(self, kind, params):
+        return self.client.post(self.url, {"kind": kind, "params": params}, format="json")
+
+    def test_bulk_import(self):
+        orders = [order_payload("JOB-1"), order_payload("JOB-2"), order_payload("JOB-1"), {"external_id": "JOB-X"}]
+        response = self.submit("bulk_import", {"orders": orders})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "QUEUED")
+        self.assertEqual(response["Location"], f"/api/jobs/{response.data['id']}")
+
+        self.assertEqual(run_jobs(), 1)
+        job = self.client.get(response["Location"]).data
+        self.assertEqual((job["status"], job["progress"], job["total"], job["attempts"]), ("SUCCEEDED", 4, 4, 1))
+        self.assertEqual((job["result"]["created"], job["result"]["duplicate"], job["result"]["invalid"]), (2, 1, 1))
+        self.assertEqual([entry["index"] for entry in job["result"]["rejected"]], [2, 3])
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(run_jobs(), 0)
+
+    def test_polling_does_not_load_params(self):
+        job_id = self.submit("bulk_import", {"orders": [order_payload(f"JOB-{i}") for i in range(3)]}).data["id"]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(f"/api/jobs/{job_id}").status_code, status.HTTP_200_OK)
+            (claimed,) = jobs.claim(1, lease=60)
+            self.assertEqual(self.client.post(f"/api/jobs/{job_id}/cancel").status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse([query["sql"] for query in queries if '"params"' in query["sql"]])
+        self.assertEqual(jobs.run(claimed.pk, claimed.lock_token), Job.Status.CANCELLED)
+
+    def test_bulk_invoice_and_archive(self):
+        for i in range(3):
+            Order.objects.create(external_id=f"JOB-{i}", customer_id="C", total_amount=5, status=Order.Status.COMPLETED)
+        invoice_job = self.submit("bulk_invoice", {"payment_method": "ONLINE"}).data["id"]
+        archive_job = self.submit("archive", {"older_than_days": 0, "limit": 2}).data["id"]
+        Order.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(run_jobs(), 2)
+
+        job = Job.objects.get(pk=invoice_job)
+        self.assertEqual((job.status, job.progress, job.total, job.result["invoiced"]), ("SUCCEEDED", 3, 3, 3))
+        job = Job.objects.get(pk=archive_job)
+        self.assertEqual((job.status, job.progress, job.total), ("SUCCEEDED", 2, 2))
+        self.assertEqual(ArchivedOrder.objects.count(), 2)
+        self.assertEqual(Invoice.objects.filter(payment_method="ONLINE").count(), 1)
+        self.assertEqual(ArchivedInvoice.objects.filter(payment_method="ONLINE").count(), 2)
+
+    def test_export(self):
+        for i in range(3):
+            order = Order.objects.create(
+                external_id=f"JOB-{i}", customer_id="C", total_amount=5, currency="EUR" if i else "TND"
+            )
+            OrderItem.objects.create(order=order, product_id="SKU", product_name="P", quantity=1, unit_price=5)
+        job_id = self.submit("export", {"format": "csv", "filters": {"currency": "EUR"}}).data["id"]
+        self.assertEqual(self.client.get(f"/api/jobs/{job_id}/output").status_code, status.HTTP_404_NOT_FOUND)
+        run_jobs()
+
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.result["orders"], job.progress, job.total), ("SUCCEEDED", 2, 2, 2))
+        response = self.client.get(f"/api/jobs/{job_id}/output")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("order_id,external_id"))
+
+    def test_invalid_submissions(self):
+        for kind, params in (
+            ("reindex", {}),
+            ("bulk_import", {"orders": []}),
+            ("bulk_invoice", {"status": ["CANCELLED"]}),
+            ("export", {"format": "xml"}),
+            ("export", {"filters": {"colour": "red"}}),
+            ("export", {"filters": {"created_after": "yesterday"}}),
+            ("archive", {"older_than_days": -1}),
+        ):
+            response = self.submit(kind, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (kind, params))
+        self.assertFalse(Job.objects.exists())
+        with override_settings(OMS_JOB_MAX_IMPORT_ORDERS=1):
+            response = self.submit("bulk_import", {"orders": [order_payload("A"), order_payload("B")]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cancel_queued_job(self):
+        job_id = self.submit("archive", {}).data["id"]
+        response = self.client.post(f"/api/jobs/{job_id}/cancel")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "CANCELLED")
+        self.assertEqual(run_jobs(), 0)
+        self.assertEqual(self.client.post("/api/jobs/999/cancel").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cancel_running_job_stops_at_next_progress_report(self):
+        orders = [order_payload(f"JOB-{i}") for i in range(5)]
+        job = jobs.submit(Job.Kind.BULK_IMPORT, {"orders": orders})
+        (claimed,) = jobs.claim(1, lease=60)
+        progress = jobs.Progress(claimed)
+        original = jobs.bulk_create_orders
+
+        def import_then_cancel(payloads):
+            result = original(payloads)
+            self.client.post(f"/api/jobs/{job.pk}/cancel")
+            return result
+
+        with mock.patch.object(jobs, "bulk_create_orders", import_then_cancel):
+            with self.assertRaises(jobs.JobCancelled):
+                jobs.run_bulk_import(claimed, progress)
+            self.assertEqual(jobs.run(claimed.pk, claimed.lock_token), Job.Status.CANCELLED)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.cancel_requested, job.lock_token), ("CANCELLED", True, None))
+        self.assertEqual(Order.objects.count(), 2)
+        response = self.client.post(f"/api/jobs/{job.pk}/cancel")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_failure_is_recorded(self):
+        job_id = self.submit("archive", {}).data["id"]
+        with mock.patch.dict(jobs.HANDLERS, {Job.Kind.ARCHIVE: mock.Mock(side_effect=RuntimeError("disk full"))}):
+            with self.assertLogs("order_management.jobs", "ERROR"):
+                run_jobs()
+        response = self.client.get(f"/api/jobs/{job_id}")
+        self.assertEqual((response.data["status"], response.data["error"]), ("FAILED", "disk full"))
+        self.assertEqual(self.client.post(f"/api/jobs/{job_id}/cancel").status_code, status.HTTP_409_CONFLICT)
+
+    def test_expired_lease_is_claimed_again_until_max_attempts(self):
+        job = jobs.submit(Job.Kind.ARCHIVE, {})
+        self.assertEqual(len(jobs.claim(1, lease=60)), 1)
+        self.assertEqual(jobs.claim(1, lease=60), [])
+
+        Job.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        (claimed,) = jobs.claim(1, lease=60, max_attempts=2)
+        self.assertEqual(claimed.attempts, 2)
+        # The first worker's lease is gone: its progress reports stop it.
+        with self.assertRaises(jobs.JobCancelled):
+            jobs.Progress(Job(pk=job.pk, lock_token="stale"))(1)
+
+        Job.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.claim(1, lease=60, max_attempts=2), [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ("FAILED", "Worker lost 2 times."))
+
+    def test_command(self):
+        self.submit("bulk_import", {"orders": [order_payload("JOB-CMD")]})
+        out = StringIO()
+        call_command("run_jobs", "--once", "--processes", "0", stdout=out)
+        self.assertIn("Started 1 jobs.", out.getvalue())
+        self.assertTrue(Order.objects.filter(external_id="JOB-CMD").exists())
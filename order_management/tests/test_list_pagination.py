@@ -0,0 +1,96 @@
+import datetime
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management.models import FulfillmentRequest, Invoice, Order
+
+
+class OrderListPaginationTests(APITestCase):
+    def setUp(self):
+        self.url = "/api/orders/create"
+        self.orders = [
+            Order.objects.create(
+                external_id=f"PAGE-{i}",
+                customer_id="CUST-A" if i % 2 else "CUST-B",
+                total_amount=10,
+                currency="TND" if i < 5 else "EUR",
+                status=Order.Status.CONFIRMED if i % 3 == 0 else Order.Status.PENDING,
+            )
+            for i in range(7)
+        ]
+        # Orders sharing a timestamp must still be paginated without gaps or repeats.
+        same_time = timezone.now() - datetime.timedelta(days=1)
+        Order.objects.filter(pk__in=[o.pk for o in self.orders[2:5]]).update(created_at=same_time)
+
+    def collect(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(row["external_id"] for row in response.data["results"])
+            url = response.data["next"]
+        return seen
+
+    def test_pages_cover_every_order_once(self):
+        seen = self.collect(f"{self.url}?limit=2")
+        self.assertEqual(sorted(seen), sorted(o.external_id for o in self.orders))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_orders_are_newest_first(self):
+        response = self.client.get(self.url)
+        ids = [row["id"] for row in response.data["results"]]
+        expected = list(
+            Order.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertIsNone(response.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"{self.url}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filters(self):
+        response = self.client.get(f"{self.url}?customer_id=CUST-A&currency=TND")
+        self.assertEqual(
+            {row["external_id"] for row in response.data["results"]}, {"PAGE-1", "PAGE-3"}
+        )
+        response = self.client.get(f"{self.url}?status=CONFIRMED,CANCELLED")
+        self.assertEqual(
+            {row["external_id"] for row in response.data["results"]}, {"PAGE-0", "PAGE-3", "PAGE-6"}
+        )
+
+    def test_date_range_filters(self):
+        today = timezone.now().date().isoformat()
+        response = self.client.get(f"{self.url}?created_before={today}")
+        self.assertEqual(
+            {row["external_id"] for row in response.data["results"]}, {"PAGE-2", "PAGE-3", "PAGE-4"}
+        )
+        response = self.client.get(f"{self.url}?created_after={today}")
+        self.assertEqual(len(response.data["results"]), 4)
+
+    def test_invalid_date_filter(self):
+        response = self.client.get(f"{self.url}?created_after=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class InvoiceAndFulfillmentListTests(APITestCase):
+    def setUp(self):
+        for i in range(3):
+            order = Order.objects.create(
+                external_id=f"LIST-{i}", customer_id="C", total_amount=5, status=Order.Status.CONFIRMED
+            )
+            Invoice.objects.create(order=order, amount=5)
+            FulfillmentRequest.objects.create(order=order, warehouse_code=f"WH-{i % 2}")
+
+    def test_invoice_pages(self):
+        response = self.client.get("/api/oms/invoice?limit=2")
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+    def test_fulfillment_filter_by_warehouse(self):
+        response = self.client.get("/api/oms/fulfillment?warehouse_code=WH-0")
+        self.assertEqual(len(response.data["results"]), 2)
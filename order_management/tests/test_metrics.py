@@ -0,0 +1,118 @@
+import re
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import metrics
+from order_management.models import Order, OrderItem
+
+
+def query_count(response):
+    return int(re.search(r'db;desc="(\d+) queries"', response["Server-Timing"]).group(1))
+
+
+@override_settings(OMS_METRICS_SERVER_TIMING=True)
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        metrics.registry.clear()
+        order = Order.objects.create(external_id="MET-1", customer_id="C", total_amount=10)
+        OrderItem.objects.create(order=order, product_id="SKU", product_name="P", quantity=1, unit_price=10)
+
+    def test_server_timing_header(self):
+        response = self.client.get("/api/orders/create")
+        timing = response["Server-Timing"]
+        self.assertEqual(query_count(response), 2)
+        for name in ("db", "serialize", "render", "total"):
+            self.assertRegex(timing, rf"(^|, ){name};(desc=\"[^\"]*\";)?dur=\d+\.\d\d")
+
+    def test_counts_every_query_of_the_request(self):
+        payload = {
+            "external_id": "MET-2",
+            "customer_id": "C",
+            "total_amount": "10.00",
+            "items": [{"product_id": "SKU", "product_name": "P", "quantity": 1, "unit_price": "10.00"}],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/orders/create", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(query_count(response), len(queries))
+
+    def test_prometheus_endpoint(self):
+        self.client.get("/api/orders/create")
+        self.client.get("/api/orders/create")
+        self.client.get("/api/nowhere")
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE oms_request_duration_seconds histogram", body)
+        self.assertIn('oms_requests_total{view="order-create",method="GET",status="200"} 2', body)
+        self.assertIn('oms_requests_total{view="unmatched",method="GET",status="404"} 1', body)
+        self.assertIn('oms_request_db_queries_bucket{view="order-create",method="GET",le="2.0"} 2', body)
+        self.assertIn('oms_request_db_queries_bucket{view="order-create",method="GET",le="1.0"} 0', body)
+        self.assertIn('oms_request_db_queries_sum{view="order-create",method="GET"} 4.0', body)
+        self.assertIn('oms_request_duration_seconds_count{view="order-create",method="GET"} 2', body)
+
+    @override_settings(OMS_METRICS_ALLOWED_IPS=["10.0.0.1"], OMS_METRICS_TOKEN="s3cret")
+    def test_prometheus_endpoint_is_restricted(self):
+        self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get("/metrics", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with override_settings(OMS_METRICS_TOKEN=""):
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer ")
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(OMS_METRICS_SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        response = self.client.get("/api/orders/create")
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn('view="order-create"', metrics.registry.render())
+
+    def test_nested_execute_wrappers_are_preserved(self):
+        def passthrough(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        metrics.install(connection)
+        with connection.execute_wrapper(passthrough):
+            self.client.get("/api/orders/create")
+        self.assertNotIn(passthrough, connection.execute_wrappers)
+        self.assertIn(metrics.record_query, connection.execute_wrappers)
+
+
+@override_settings(OMS_METRICS_SERVER_TIMING=True)
+class AsyncRequestMetricsTests(TestCase):
+    async def test_async_view_queries_are_counted(self):
+        # The test connection predates the middleware; in a server, connections
+        # are opened after it is loaded and get the wrapper on creation.
+        await sync_to_async(metrics.install)(connection)
+        order = await Order.objects.acreate(external_id="MET-A", customer_id="C", total_amount=1)
+        response = await self.async_client.get(f"/api/async/orders/{order.pk}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(query_count(response), 2)
+
+
+class RegistryTests(TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        registry = metrics.Registry()
+        for value in (0.0005, 0.02, 0.02, 30):
+            registry.observe("oms_request_duration_seconds", metrics.DURATION_BUCKETS, (("view", 'a"b'),), value)
+        lines = registry.render().splitlines()
+        self.assertIn('oms_request_duration_seconds_bucket{view="a\\"b",le="0.001"} 1', lines)
+        self.assertIn('oms_request_duration_seconds_bucket{view="a\\"b",le="0.025"} 3', lines)
+        self.assertIn('oms_request_duration_seconds_bucket{view="a\\"b",le="10.0"} 3', lines)
+        self.assertIn('oms_request_duration_seconds_bucket{view="a\\"b",le="+Inf"} 4', lines)
+        self.assertIn('oms_request_duration_seconds_count{view="a\\"b"} 4', lines)
+
+    def test_no_request_no_stats(self):
+        with metrics.timer("serialize"):
+            Order.objects.count()
+        self.assertIsNone(metrics.current())
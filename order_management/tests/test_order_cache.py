@@ -0,0 +1,63 @@
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import state_machine
+from order_management.models import Order, OrderItem
+
+
+class OrderCacheTests(APITestCase):
+    def setUp(self):
+        caches["orders"].clear()
+        self.order = Order.objects.create(external_id="CACHE-1", customer_id="C", total_amount=10)
+        OrderItem.objects.create(order=self.order, product_id="SKU", product_name="P", quantity=1, unit_price=10)
+        self.url = f"/api/orders/update/{self.order.id}"
+
+    def get(self, **headers):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(self.url, headers=headers)
+
+    def test_cached_read_uses_single_version_lookup(self):
+        first = self.get()
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            second = self.get()
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_items_are_read_in_id_order(self):
+        # The cached payload and its ETag must not depend on the order the
+        # database happens to return the items in.
+        with self.assertNumQueries(3) as context:
+            self.get()
+        items_sql = context.captured_queries[-1]["sql"]
+        self.assertIn("order_management_orderitem", items_sql)
+        self.assertIn('ORDER BY "order_management_orderitem"."id" ASC', items_sql)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.get()["ETag"]
+        with self.assertNumQueries(1):
+            response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_status_update_changes_etag_and_payload(self):
+        etag = self.get()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            patched = self.client.patch(self.url, {"status": Order.Status.CONFIRMED}, format="json")
+        self.assertNotEqual(patched["ETag"], etag)
+
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], Order.Status.CONFIRMED)
+        self.assertEqual(response["ETag"], patched["ETag"])
+
+    def test_batch_transitions_invalidate(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            state_machine.transition_many([self.order.id], Order.Status.CANCELLED)
+        self.assertEqual(self.get().data["status"], Order.Status.CANCELLED)
+
+    def test_missing_order(self):
+        response = self.client.get("/api/orders/update/999")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -40,8 +40,8 @@ class OrderAPITests(APITestCase):
         self.client.post(self.url, self.payload, format="json")
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["external_id"], self.payload["external_id"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["external_id"], self.payload["external_id"])
 
     def test_create_order_requires_items(self):
         payload = {**self.payload, "items": []}
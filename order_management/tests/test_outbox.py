@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import outbox, wms
+from order_management.models import FulfillmentRequest, Order, OrderItem, OutboxMessage
+
+
+class FulfillmentOutboxTests(APITestCase):
+    def setUp(self):
+        self.order = Order.objects.create(
+            external_id="OUT-1", customer_id="CUST", total_amount=30, status=Order.Status.CONFIRMED
+        )
+        OrderItem.objects.create(order=self.order, product_id="SKU-1", product_name="A", quantity=1, unit_price=10)
+        OrderItem.objects.create(order=self.order, product_id="SKU-2", product_name="B", quantity=2, unit_price=10)
+
+    def create_fulfillment(self):
+        response = self.client.post("/api/oms/fulfillment", {"order": self.order.id, "warehouse_code": "WH-1"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return FulfillmentRequest.objects.get(pk=response.data["id"])
+
+    def dispatch(self, client, **kwargs):
+        with outbox.Dispatcher([wms.FulfillmentDispatchHandler(client)], **kwargs) as dispatcher:
+            return dispatcher.run_once()
+
+    def dispatch_failing(self, client, **kwargs):
+        with self.assertLogs("order_management.outbox", "WARNING"):
+            return self.dispatch(client, **kwargs)
+
+    def make_due(self):
+        OutboxMessage.objects.update(available_at=timezone.now())
+
+    def test_fulfillment_enqueues_message(self):
+        fulfillment = self.create_fulfillment()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.topic, wms.FULFILLMENT_TOPIC)
+        self.assertEqual(message.key, f"fulfillment:{fulfillment.id}")
+        self.assertEqual(message.payload["order_id"], self.order.id)
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+
+    def test_rejected_fulfillment_enqueues_nothing(self):
+        self.order.status = Order.Status.PENDING
+        self.order.save()
+        response = self.client.post("/api/oms/fulfillment", {"order": self.order.id, "warehouse_code": "WH-1"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_dispatch_delivers_and_marks_sent(self):
+        fulfillment = self.create_fulfillment()
+        client = wms.StubWMSClient()
+        counts = self.dispatch(client)
+        self.assertEqual(counts, {"claimed": 1, "delivered": 1, "retried": 0, "dead": 0})
+
+        payload = client.received[f"fulfillment:{fulfillment.id}"]
+        self.assertEqual(payload["warehouse_code"], "WH-1")
+        self.assertEqual(
+            payload["items"], [{"product_id": "SKU-1", "quantity": 1}, {"product_id": "SKU-2", "quantity": 2}]
+        )
+        fulfillment.refresh_from_db()
+        self.assertEqual(fulfillment.status, FulfillmentRequest.Status.SENT_TO_WMS)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.Status.DELIVERED)
+        self.assertIsNone(message.lock_token)
+        self.assertEqual(self.dispatch(client)["claimed"], 0)
+
+    def test_retries_with_backoff_then_delivers(self):
+        fulfillment = self.create_fulfillment()
+        client = wms.StubWMSClient(failures={f"fulfillment:{fulfillment.id}": 1})
+        with self.settings(OMS_OUTBOX_RETRY_BACKOFF=60):
+            self.assertEqual(self.dispatch_failing(client)["retried"], 1)
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), (OutboxMessage.Status.PENDING, 1))
+        self.assertIn("unavailable", message.last_error)
+        self.assertEqual(outbox.claim(10, lease=60), [])
+
+        self.make_due()
+        self.assertEqual(self.dispatch(client)["delivered"], 1)
+        self.assertEqual(client.calls, 2)
+
+    def test_dead_letters_after_max_attempts_and_requeues(self):
+        fulfillment = self.create_fulfillment()
+        client = wms.StubWMSClient(failures={f"fulfillment:{fulfillment.id}": 5})
+        self.assertEqual(self.dispatch_failing(client, max_attempts=2)["retried"], 1)
+        self.make_due()
+        self.assertEqual(self.dispatch_failing(client, max_attempts=2)["dead"], 1)
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.Status.DEAD)
+        self.make_due()
+        self.assertEqual(self.dispatch(client, max_attempts=2)["claimed"], 0)
+
+        self.assertEqual(outbox.requeue_dead(), 1)
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), (OutboxMessage.Status.PENDING, 0))
+
+    def test_permanent_failure_is_dead_lettered_immediately(self):
+        fulfillment = self.create_fulfillment()
+        client = wms.StubWMSClient(rejected={f"fulfillment:{fulfillment.id}"})
+        self.assertEqual(self.dispatch_failing(client)["dead"], 1)
+        fulfillment.refresh_from_db()
+        self.assertEqual(fulfillment.status, FulfillmentRequest.Status.CREATED)
+
+    def test_claimed_messages_are_leased(self):
+        self.create_fulfillment()
+        claimed = outbox.claim(10, lease=60)
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(outbox.claim(10, lease=60), [])
+
+        # An expired lease (e.g. a crashed dispatcher) makes the message due again.
+        OutboxMessage.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(outbox.claim(10, lease=60)), 1)
+
+    def test_unknown_topic_is_dead_lettered(self):
+        outbox.enqueue("unknown.topic", "unknown:1", {})
+        self.assertEqual(self.dispatch_failing(wms.StubWMSClient())["dead"], 1)
+
+    def test_command(self):
+        self.create_fulfillment()
+        out = StringIO()
+        call_command("dispatch_outbox", "--stub", "--once", stdout=out)
+        self.assertIn("Delivered 1", out.getvalue())
+        self.assertEqual(FulfillmentRequest.objects.get().status, FulfillmentRequest.Status.SENT_TO_WMS)
+
+        OutboxMessage.objects.update(delivered_at=timezone.now() - timedelta(days=8))
+        call_command("dispatch_outbox", "--purge-delivered-days", "7", stdout=StringIO())
+        self.assertFalse(OutboxMessage.objects.exists())
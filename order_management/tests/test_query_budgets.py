@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from order_management.models import Order, OrderItem
+from order_management.query_budget import counted_queries, get_budget
+
+
+class QueryBudgetTests(APITestCase):
+    def setUp(self):
+        self.orders = []
+        for i in range(3):
+            order = Order.objects.create(
+                external_id=f"BUDGET-{i}", customer_id="C", total_amount=20, status=Order.Status.CONFIRMED
+            )
+            OrderItem.objects.create(order=order, product_id="SKU", product_name="P", quantity=2, unit_price=10)
+            self.orders.append(order)
+
+    def assertWithinBudget(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method.lower())(url, data, format="json")
+        self.assertLess(response.status_code, 400, response.data)
+        budget = get_budget(method, response.resolver_match.url_name)
+        self.assertIsNotNone(budget, f"No query budget for {method} {response.resolver_match.url_name}")
+        queries = counted_queries(context.captured_queries)
+        self.assertLessEqual(len(queries), budget, "\n".join(q["sql"] for q in queries))
+        return response
+
+    def test_order_endpoints(self):
+        self.assertWithinBudget("GET", "/api/orders/create")
+        self.assertWithinBudget(
+            "POST",
+            "/api/orders/create",
+            {
+                "external_id": "BUDGET-NEW",
+                "customer_id": "C",
+                "total_amount": 30,
+                "items": [
+                    {"product_id": "A", "product_name": "A", "quantity": 1, "unit_price": 10},
+                    {"product_id": "B", "product_name": "B", "quantity": 2, "unit_price": 10},
+                ],
+            },
+        )
+        order = Order.objects.create(external_id="BUDGET-PENDING", customer_id="C", total_amount=1)
+        self.assertWithinBudget("GET", f"/api/orders/update/{order.id}")
+        self.assertWithinBudget("PATCH", f"/api/orders/update/{order.id}", {"status": Order.Status.CONFIRMED})
+        self.assertWithinBudget("GET", "/api/orders/by-external/BUDGET-PENDING")
+        self.assertWithinBudget(
+            "PATCH", "/api/orders/by-external/BUDGET-PENDING", {"status": Order.Status.FULFILLMENT_REQUESTED}
+        )
+
+    def test_invoice_endpoints(self):
+        self.assertWithinBudget(
+            "POST", "/api/oms/invoice", {"order": self.orders[0].id, "amount": 20, "payment_method": "COD"}
+        )
+        self.assertWithinBudget("GET", "/api/oms/invoice")
+
+    def test_fulfillment_endpoints(self):
+        self.assertWithinBudget("POST", "/api/oms/fulfillment", {"order": self.orders[0].id, "warehouse_code": "WH"})
+        self.assertWithinBudget("GET", "/api/oms/fulfillment")
+
+    def test_sync_endpoint(self):
+        self.assertWithinBudget("GET", "/api/sync?since=2000-01-01T00:00:00Z")
+
+    def test_sales_summary_endpoint(self):
+        self.assertWithinBudget("GET", "/api/analytics/sales")
+
+    def test_customer_orders_endpoint(self):
+        self.assertWithinBudget("GET", "/api/customers/C/orders")
+
+    def test_job_endpoints(self):
+        response = self.assertWithinBudget("POST", "/api/jobs", {"kind": "archive", "params": {"limit": 10}})
+        self.assertWithinBudget("GET", f"/api/jobs/{response.data['id']}")
+        self.assertWithinBudget("POST", f"/api/jobs/{response.data['id']}/cancel")
@@ -0,0 +1,87 @@
+import json
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import invoicing, rollups
+from order_management.models import Invoice, InvoiceRollup, Order, SalesRollup
+
+
+def order_payload(external_id, amount="10.00", currency="TND"):
+    return {
+        "external_id": external_id,
+        "customer_id": "CUST",
+        "total_amount": amount,
+        "currency": currency,
+        "items": [{"product_id": "SKU", "product_name": "P", "quantity": 1, "unit_price": amount}],
+    }
+
+
+class RollupTests(APITestCase):
+    url = "/api/analytics/sales"
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.client.post("/api/orders/create", order_payload("RU-1", "10.00"), format="json")
+        self.client.post("/api/orders/bulk", [order_payload("RU-2", "20.00"), order_payload("RU-3", "5.00", "EUR")])
+        ids = dict(Order.objects.values_list("external_id", "id"))
+        self.client.patch(f"/api/orders/update/{ids['RU-1']}", {"status": "CONFIRMED"}, format="json")
+        self.client.post(
+            "/api/orders/transitions",
+            [{"id": ids["RU-2"], "status": "CONFIRMED"}, {"id": ids["RU-3"], "status": "CANCELLED"}],
+            format="json",
+        )
+        self.client.post("/api/oms/invoice", {"order": ids["RU-1"], "amount": "10.00", "payment_method": "COD"})
+        invoicing.bulk_invoice()
+
+    def rollup_rows(self):
+        return (
+            sorted(
+                SalesRollup.objects.filter(order_count__gt=0).values_list(
+                    "currency", "status", "order_count", "total_amount"
+                )
+            ),
+            sorted(InvoiceRollup.objects.values_list("currency", "status", "invoice_count", "amount")),
+        )
+
+    def test_writes_maintain_rollups(self):
+        sales, invoices = self.rollup_rows()
+        self.assertEqual(
+            sales, [("EUR", "CANCELLED", 1, Decimal("5.00")), ("TND", "CONFIRMED", 2, Decimal("30.00"))]
+        )
+        self.assertEqual(invoices, [("TND", "ISSUED", 2, Decimal("30.00"))])
+        self.assertFalse(SalesRollup.objects.filter(order_count__lt=0).exists())
+
+    def test_rebuild_matches_incremental_rollups(self):
+        incremental = self.rollup_rows()
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["sales"], 2)
+        self.assertEqual(self.rollup_rows(), incremental)
+
+    def test_summary_endpoint(self):
+        Invoice.objects.filter(amount=10).update(status=Invoice.Status.PAID)
+        rollups.rebuild()
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        eur, tnd = response.data["results"]
+        self.assertEqual((eur["currency"], eur["order_count"], eur["total_amount"]), ("EUR", 1, "5.00"))
+        self.assertEqual(tnd["day"], self.today.isoformat())
+        self.assertEqual(tnd["statuses"], {"CONFIRMED": {"order_count": 2, "total_amount": "30.00"}})
+        self.assertEqual(
+            tnd["invoices"], {"paid_count": 1, "paid_amount": "10.00", "unpaid_count": 1, "unpaid_amount": "20.00"}
+        )
+
+        response = self.client.get(self.url, {"currency": "EUR", "start": self.today.isoformat()})
+        self.assertEqual([row["currency"] for row in response.data["results"]], ["EUR"])
+        response = self.client.get(self.url, {"end": "2000-01-01"})
+        self.assertEqual(response.data["results"], [])
+
+    def test_invalid_range(self):
+        for params in ({"start": "2024-02-01", "end": "2024-01-01"}, {"start": "2020-01-01", "end": "2024-01-01"}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,59 @@
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management.models import Order, OrderItem
+
+
+class SparseFieldsTests(APITestCase):
+    list_url = "/api/orders/create"
+
+    def setUp(self):
+        caches["orders"].clear()
+        self.order = Order.objects.create(external_id="SF-1", customer_id="C", total_amount=20, item_count=2)
+        OrderItem.objects.create(order=self.order, product_id="A", product_name="A", quantity=1, unit_price=10)
+        OrderItem.objects.create(order=self.order, product_id="B", product_name="B", quantity=1, unit_price=10)
+        self.detail_url = f"/api/orders/update/{self.order.id}"
+
+    def test_list_fields(self):
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(self.list_url, {"fields": "status,id,external_id"})
+        self.assertEqual(response.data["results"], [{"id": self.order.id, "external_id": "SF-1", "status": "PENDING"}])
+        self.assertNotIn("total_amount", context.captured_queries[0]["sql"])
+
+    def test_list_include_items(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, {"fields": "id,item_count", "include": "items"})
+        order = response.data["results"][0]
+        self.assertEqual(list(order), ["id", "items", "item_count"])
+        self.assertEqual([item["product_id"] for item in order["items"]], ["A", "B"])
+
+    def test_pagination_with_fields(self):
+        Order.objects.create(external_id="SF-2", customer_id="C", total_amount=1)
+        response = self.client.get(self.list_url, {"fields": "external_id", "limit": 1})
+        self.assertEqual(response.data["results"], [{"external_id": "SF-2"}])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"], [{"external_id": "SF-1"}])
+
+    def test_detail_fields(self):
+        # Version lookup, cache miss, then only the requested columns.
+        with self.assertNumQueries(2) as context:
+            response = self.client.get(self.detail_url, {"fields": "id,status"})
+        self.assertEqual(response.data, {"id": self.order.id, "status": "PENDING"})
+        self.assertNotIn("customer_id", context.captured_queries[-1]["sql"])
+
+        response = self.client.get(self.detail_url, {"fields": "external_id", "include": "items"})
+        self.assertEqual(list(response.data), ["external_id", "items"])
+        self.assertEqual(len(response.data["items"]), 2)
+
+    def test_detail_fields_from_cached_payload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            full = self.client.get(self.detail_url).data
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, {"fields": "external_id,total_amount"})
+        self.assertEqual(response.data, {"external_id": "SF-1", "total_amount": full["total_amount"]})
+
+    def test_unknown_fields(self):
+        for params in ({"fields": "id,password"}, {"fields": "id", "include": "invoice"}):
+            self.assertEqual(self.client.get(self.list_url, params).status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(self.client.get(self.detail_url, params).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from order_management import state_machine
+from order_management.models import FulfillmentRequest, Order
+from order_management.query_budget import counted_queries
+from order_management.serializers import FulfillmentRequestSerializer
+
+
+class StateMachineTests(TestCase):
+    def make_order(self, external_id, status=Order.Status.PENDING):
+        return Order.objects.create(external_id=external_id, customer_id="C", total_amount=10, status=status)
+
+    def test_transition_updates_status(self):
+        order = self.make_order("SM-1")
+        state_machine.transition(order, Order.Status.CONFIRMED)
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.Status.CONFIRMED)
+
+    def test_invalid_transition(self):
+        order = self.make_order("SM-1", Order.Status.COMPLETED)
+        with self.assertRaises(state_machine.InvalidTransition):
+            state_machine.transition(order, Order.Status.PENDING)
+
+    def test_stale_status_is_a_conflict(self):
+        order = self.make_order("SM-1")
+        stale = Order.objects.get(pk=order.pk)
+        state_machine.transition(order, Order.Status.CANCELLED)
+        with self.assertRaises(state_machine.TransitionConflict):
+            state_machine.transition(stale, Order.Status.CONFIRMED)
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.Status.CANCELLED)
+
+    def test_transition_many(self):
+        pending = [self.make_order(f"SM-P{i}") for i in range(3)]
+        confirmed = self.make_order("SM-C", Order.Status.CONFIRMED)
+        ids = [order.pk for order in pending] + [confirmed.pk, 999]
+        with CaptureQueriesContext(connection) as context:
+            moved = state_machine.transition_many(ids, Order.Status.CONFIRMED)
+        # One locking SELECT to learn the previous statuses, one UPDATE, one
+        # event INSERT and one rollup upsert for the batch.
+        self.assertEqual(len(counted_queries(context.captured_queries)), 4)
+        self.assertEqual(moved, {order.pk: Order.Status.PENDING for order in pending})
+        self.assertEqual(Order.objects.filter(status=Order.Status.CONFIRMED).count(), 4)
+
+    def test_fulfillment_conflict_rolls_back(self):
+        order = self.make_order("SM-F", Order.Status.CONFIRMED)
+        serializer = FulfillmentRequestSerializer(data={"order": order.pk, "warehouse_code": "WH"})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        Order.objects.filter(pk=order.pk).update(status=Order.Status.CANCELLED)
+        with self.assertRaises(serializers.ValidationError):
+            serializer.save()
+        self.assertFalse(FulfillmentRequest.objects.exists())
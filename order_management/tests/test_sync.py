@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import state_machine
+from order_management.models import FulfillmentRequest, Invoice, Order, OrderItem
+
+
+@override_settings(OMS_SYNC_SAFETY_LAG=0)
+class SyncTests(APITestCase):
+    url = "/api/sync"
+
+    def setUp(self):
+        self.start = timezone.now() - timedelta(seconds=1)
+        self.orders = []
+        for i in range(3):
+            order = Order.objects.create(
+                external_id=f"SYNC-{i}", customer_id="C", total_amount=10, status=Order.Status.CONFIRMED
+            )
+            OrderItem.objects.create(order=order, product_id="SKU", product_name="P", quantity=1, unit_price=10)
+            self.orders.append(order)
+        self.invoice = Invoice.objects.create(order=self.orders[0], amount=10, payment_method="COD")
+        self.fulfillment = FulfillmentRequest.objects.create(order=self.orders[1], warehouse_code="WH")
+
+    def sync(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def ids(self, data, name):
+        return [row["id"] for row in data[name]]
+
+    def test_pages_through_changes_then_resumes_from_watermark(self):
+        first = self.sync(since=self.start.isoformat(), limit=2)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(self.ids(first, "orders"), [order.id for order in self.orders[:2]])
+        self.assertEqual(self.ids(first, "invoices"), [self.invoice.id])
+        self.assertEqual(self.ids(first, "fulfillments"), [self.fulfillment.id])
+        self.assertEqual(first["orders"][0]["items"][0]["product_id"], "SKU")
+
+        second = self.sync(watermark=first["watermark"], limit=2)
+        self.assertFalse(second["has_more"])
+        self.assertEqual(self.ids(second, "orders"), [self.orders[2].id])
+        self.assertEqual((second["invoices"], second["fulfillments"]), ([], []))
+
+        idle = self.sync(watermark=second["watermark"])
+        self.assertEqual((idle["orders"], idle["watermark"]), ([], second["watermark"]))
+
+        state_machine.transition(self.orders[0], Order.Status.FULFILLMENT_REQUESTED)
+        changed = self.sync(watermark=second["watermark"])
+        self.assertEqual(self.ids(changed, "orders"), [self.orders[0].id])
+        self.assertEqual(changed["orders"][0]["status"], Order.Status.FULFILLMENT_REQUESTED)
+
+    def test_rows_sharing_a_timestamp_are_not_skipped(self):
+        Order.objects.update(updated_at=self.start)
+        seen = []
+        data = self.sync(since=self.start.isoformat(), limit=1)
+        seen += self.ids(data, "orders")
+        while data["has_more"]:
+            data = self.client.get(data["next"]).data
+            seen += self.ids(data, "orders")
+        self.assertEqual(seen, [order.id for order in self.orders])
+
+    @override_settings(OMS_SYNC_SAFETY_LAG=60)
+    def test_recent_changes_are_held_back(self):
+        data = self.sync(since=self.start.isoformat())
+        self.assertEqual((data["orders"], data["invoices"], data["fulfillments"]), ([], [], []))
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(self.url, {"since": self.start.isoformat(), "limit": 0}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(self.client.get(self.url, {"watermark": "garbage"}).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invoice_updated_at_and_list_filters(self):
+        response = self.client.get("/api/oms/invoice", {"updated_after": self.start.isoformat()})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.invoice.id])
+        self.assertIsNotNone(response.data["results"][0]["updated_at"])
+        response = self.client.get("/api/orders/create", {"updated_before": self.start.isoformat()})
+        self.assertEqual(response.data["results"], [])
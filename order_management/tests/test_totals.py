@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management import totals
+from order_management.models import Order
+
+
+def order_payload(external_id, total="30.30", lines=(("SKU-1", 1, "10.10"), ("SKU-2", 2, "10.10"))):
+    return {
+        "external_id": external_id,
+        "customer_id": "CUST",
+        "total_amount": total,
+        "items": [
+            {"product_id": sku, "product_name": sku, "quantity": quantity, "unit_price": price}
+            for sku, quantity, price in lines
+        ],
+    }
+
+
+class LineTotalsTests(SimpleTestCase):
+    def test_totals_are_exact_minor_units(self):
+        orders = [
+            {
+                "items": [
+                    {"quantity": 3, "unit_price": Decimal("0.10")},
+                    {"quantity": 1, "unit_price": Decimal("19.99")},
+                ]
+            },
+            {"items": [{"quantity": 1000, "unit_price": Decimal("99999.99")}]},
+            {"items": []},
+        ]
+        self.assertEqual(totals.line_totals(orders), [(2, 2029), (1, 9999999000), (0, 0)])
+        self.assertEqual(totals.from_minor(2029), Decimal("20.29"))
+        self.assertEqual(totals.to_minor(Decimal("12")), 1200)
+
+    def test_apply_totals_reports_mismatches(self):
+        orders = [
+            {"total_amount": Decimal("0.30"), "items": [{"quantity": 3, "unit_price": Decimal("0.10")}]},
+            {"total_amount": Decimal("0.31"), "items": [{"quantity": 3, "unit_price": Decimal("0.10")}]},
+        ]
+        self.assertEqual(totals.apply_totals(orders), [1])
+        self.assertEqual((orders[0]["item_count"], orders[0]["computed_total"]), (1, Decimal("0.30")))
+
+
+class OrderTotalsAPITests(APITestCase):
+    def test_create_stores_item_count_and_total(self):
+        response = self.client.post("/api/orders/create", order_payload("TOT-1"), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(external_id="TOT-1")
+        self.assertEqual((order.item_count, order.computed_total), (2, Decimal("30.30")))
+
+        response = self.client.post("/api/orders/create", order_payload("TOT-2", total="30.31"), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["non_field_errors"], [totals.TOTAL_MISMATCH])
+
+    def test_bulk_checks_totals_in_one_pass(self):
+        payloads = [order_payload("TOT-B1"), order_payload("TOT-B2", total="1.00"), order_payload("TOT-B3")]
+        response = self.client.post("/api/orders/bulk", payloads, format="json")
+        self.assertEqual([result["status"] for result in response.data["results"]], ["created", "invalid", "created"])
+        self.assertEqual(response.data["results"][1]["errors"], {"non_field_errors": [totals.TOTAL_MISMATCH]})
+        self.assertEqual(
+            sorted(Order.objects.values_list("external_id", "item_count", "computed_total")),
+            [("TOT-B1", 2, Decimal("30.30")), ("TOT-B3", 2, Decimal("30.30"))],
+        )
+
+    def test_list_without_items(self):
+        self.client.post("/api/orders/create", order_payload("TOT-L"), format="json")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/orders/create", {"items": "false"})
+        order = response.data["results"][0]
+        self.assertNotIn("items", order)
+        self.assertEqual(order["item_count"], 2)
+        self.assertEqual(len(self.client.get("/api/orders/create").data["results"][0]["items"]), 2)
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order_management.models import Order
+from order_management.query_budget import counted_queries
+
+
+class OrderTransitionAPITests(APITestCase):
+    def setUp(self):
+        self.url = "/api/orders/transitions"
+        self.pending = [
+            Order.objects.create(external_id=f"TR-P{i}", customer_id="C", total_amount=10) for i in range(3)
+        ]
+        self.requested = Order.objects.create(
+            external_id="TR-F", customer_id="C", total_amount=10, status=Order.Status.FULFILLMENT_REQUESTED
+        )
+
+    def test_applies_grouped_transitions(self):
+        payload = [{"id": order.id, "status": Order.Status.CONFIRMED} for order in self.pending]
+        payload.append({"id": self.requested.id, "status": Order.Status.COMPLETED})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["applied"], 4)
+        # Per target: one locking SELECT, one UPDATE, one event INSERT and one rollup upsert.
+        self.assertEqual(len(counted_queries(context.captured_queries)), 8)
+        self.assertEqual(Order.objects.filter(status=Order.Status.CONFIRMED).count(), 3)
+        self.requested.refresh_from_db()
+        self.assertEqual(self.requested.status, Order.Status.COMPLETED)
+        self.assertEqual(response.data["results"][0]["previous_status"], Order.Status.PENDING)
+
+    def test_reports_rejections_per_id(self):
+        payload = [
+            {"id": self.pending[0].id, "status": Order.Status.CONFIRMED},
+            {"id": self.requested.id, "status": Order.Status.CONFIRMED},
+            {"id": 999, "status": Order.Status.CONFIRMED},
+            {"id": self.pending[0].id, "status": Order.Status.CANCELLED},
+            {"id": self.pending[1].id, "status": "WRONG"},
+        ]
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["result"] for result in results],
+            ["applied", "invalid_transition", "not_found", "duplicate", "invalid"],
+        )
+        self.assertEqual(results[1]["current_status"], Order.Status.FULFILLMENT_REQUESTED)
+        self.assertEqual(response.data["applied"], 1)
+        self.assertEqual(response.data["rejected"], 4)
+        self.pending[1].refresh_from_db()
+        self.assertEqual(self.pending[1].status, Order.Status.PENDING)
+
+    def test_requires_list(self):
+        response = self.client.post(self.url, {"id": 1, "status": "CONFIRMED"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(OMS_BULK_MAX_TRANSITIONS=1)
+    def test_rejects_oversized_batches(self):
+        payload = [{"id": order.id, "status": Order.Status.CONFIRMED} for order in self.pending]
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
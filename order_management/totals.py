@@ -0,0 +1,55 @@
+"""Order totals in integer minor units.
+
+Every amount in the OMS has two decimal places, so ``quantity * unit_price``
+is exact as an integer number of minor units (cents, millimes...) and a batch
+of orders can be checked with plain integer products over flat columns
+instead of building and summing a ``Decimal`` per line.
+"""
+from decimal import Decimal
+from itertools import accumulate
+from operator import mul
+
+from rest_framework import serializers
+
+DECIMAL_PLACES = 2
+TOTAL_MISMATCH = "Total amount does not match item totals."
+
+
+def to_minor(amount):
+    """``Decimal("12.34")`` -> ``1234``; ``amount`` must have at most two decimal places."""
+    return int(amount.scaleb(DECIMAL_PLACES))
+
+
+def from_minor(value):
+    return Decimal(value).scaleb(-DECIMAL_PLACES)
+
+
+def line_totals(orders):
+    """Return ``(item_count, total in minor units)`` for each order's validated ``items``, in one pass."""
+    counts = [len(order["items"]) for order in orders]
+    quantities = [item["quantity"] for order in orders for item in order["items"]]
+    prices = [to_minor(item["unit_price"]) for order in orders for item in order["items"]]
+    running = [0, *accumulate(map(mul, quantities, prices))]
+    ends = [0, *accumulate(counts)]
+    return [(count, running[end] - running[start]) for count, start, end in zip(counts, ends, ends[1:])]
+
+
+def apply_totals(orders):
+    """Set ``item_count`` and ``computed_total`` on validated ``orders``.
+
+    Returns the indexes of the orders whose ``total_amount`` does not match
+    their items.
+    """
+    mismatches = []
+    for index, (order, (count, total)) in enumerate(zip(orders, line_totals(orders))):
+        order["item_count"] = count
+        order["computed_total"] = from_minor(total)
+        if order.get("total_amount") is not None and to_minor(order["total_amount"]) != total:
+            mismatches.append(index)
+    return mismatches
+
+
+def validate_totals(attrs):
+    if apply_totals([attrs]):
+        raise serializers.ValidationError(TOTAL_MISMATCH)
+    return attrs
@@ -1,15 +1,45 @@
 from django.urls import path
 
+from . import async_views
 from .views import (
+    CustomerOrderListView,
     FulfillmentRequestCreateView,
+    InvoiceBulkCreateView,
     InvoiceCreateView,
+    JobCancelView,
+    JobCreateView,
+    JobDetailView,
+    JobOutputView,
+    OrderByExternalIdView,
+    OrderBulkCreateView,
     OrderCreateView,
+    OrderEventListView,
+    OrderExportView,
+    OrderTransitionView,
     OrderUpdateView,
+    SalesSummaryView,
+    SyncView,
 )
 
 urlpatterns = [
     path("orders/create", OrderCreateView.as_view(), name="order-create"),
+    path("orders/bulk", OrderBulkCreateView.as_view(), name="order-bulk-create"),
+    path("orders/export", OrderExportView.as_view(), name="order-export"),
+    path("orders/transitions", OrderTransitionView.as_view(), name="order-transitions"),
     path("orders/update/<int:pk>", OrderUpdateView.as_view(), name="order-update"),
+    path("orders/by-external/<str:external_id>", OrderByExternalIdView.as_view(), name="order-by-external"),
+    path("customers/<str:customer_id>/orders", CustomerOrderListView.as_view(), name="customer-orders"),
+    path("async/orders", async_views.order_create, name="async-order-create"),
+    path("async/orders/<int:pk>", async_views.order_detail, name="async-order-detail"),
+    path("async/events", async_views.order_events, name="async-event-list"),
     path("oms/invoice", InvoiceCreateView.as_view(), name="invoice-create"),
+    path("oms/invoice/bulk", InvoiceBulkCreateView.as_view(), name="invoice-bulk-create"),
     path("oms/fulfillment", FulfillmentRequestCreateView.as_view(), name="fulfillment-create"),
+    path("events", OrderEventListView.as_view(), name="event-list"),
+    path("sync", SyncView.as_view(), name="sync"),
+    path("analytics/sales", SalesSummaryView.as_view(), name="sales-summary"),
+    path("jobs", JobCreateView.as_view(), name="job-create"),
+    path("jobs/<int:pk>", JobDetailView.as_view(), name="job-detail"),
+    path("jobs/<int:pk>/cancel", JobCancelView.as_view(), name="job-cancel"),
+    path("jobs/<int:pk>/output", JobOutputView.as_view(), name="job-output"),
 ]
@@ -1,41 +1,264 @@
+import hmac
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
 from rest_framework import generics, serializers, status
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
-from .models import FulfillmentRequest, Invoice, Order
+from . import (
+    archiving,
+    events,
+    fastpath,
+    invoicing,
+    jobs,
+    metrics,
+    order_cache,
+    rollups,
+    state_machine,
+    sync,
+)
+from .bulk import bulk_create_orders
+from .db import retry_on_database_locked
+from .export import CSV_HEADER, iter_csv_rows, iter_orders
+from .fastpath import FastListMixin, OrderFastListMixin
+from .filters import ORDER_FILTER_PARAMS
+from .idempotency import IdempotentCreateMixin
+from .models import FulfillmentRequest, Invoice, Job, Order, OrderEvent, OrderItem
+from .renderers import CSVRenderer, NDJSONRenderer
 from .serializers import (
+    BulkInvoiceSerializer,
+    BulkOrderSerializer,
+    CustomerSummarySerializer,
+    DailySalesSerializer,
     FulfillmentRequestSerializer,
     InvoiceSerializer,
+    JobSerializer,
+    JobSubmitSerializer,
+    OrderEventSerializer,
     OrderSerializer,
     OrderStatusUpdateSerializer,
+    OrderTransitionSerializer,
+    SalesSummaryQuerySerializer,
 )
 
 
-class OrderCreateView(generics.ListCreateAPIView):
-    queryset = Order.objects.prefetch_related("items")
+class OrderCreateView(IdempotentCreateMixin, OrderFastListMixin, generics.ListCreateAPIView):
+    queryset = Order.objects.prefetch_related(Prefetch("items", queryset=OrderItem.objects.order_by("id")))
+    serializer_class = OrderSerializer
+    filter_params = ORDER_FILTER_PARAMS
+
+
+class OrderBulkCreateView(generics.GenericAPIView):
+    serializer_class = BulkOrderSerializer
+
+    @retry_on_database_locked
+    def post(self, request, *args, **kwargs):
+        payloads = request.data
+        if not isinstance(payloads, list):
+            return Response({"detail": "Expected a list of orders."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payloads) > settings.OMS_BULK_MAX_ORDERS:
+            return Response(
+                {"detail": f"At most {settings.OMS_BULK_MAX_ORDERS} orders per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(bulk_create_orders(payloads), status=status.HTTP_200_OK)
+
+
+class OrderExportView(generics.GenericAPIView):
+    queryset = Order.objects.all()
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    pagination_class = None
+    filter_params = OrderCreateView.filter_params
+
+    def get(self, request, *args, **kwargs):
+        records = iter_orders(self.filter_queryset(self.get_queryset()))
+        renderer = request.accepted_renderer
+        if renderer.format == CSVRenderer.format:
+            content = renderer.stream(iter_csv_rows(records), header=CSV_HEADER)
+        else:
+            content = renderer.stream(records)
+        response = StreamingHttpResponse(content, content_type=renderer.media_type)
+        response["Content-Disposition"] = f'attachment; filename="orders.{renderer.format}"'
+        return response
+
+
+class OrderTransitionView(generics.GenericAPIView):
+    serializer_class = OrderTransitionSerializer
+
+    @retry_on_database_locked
+    def post(self, request, *args, **kwargs):
+        payloads = request.data
+        if not isinstance(payloads, list):
+            return Response({"detail": "Expected a list of transitions."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payloads) > settings.OMS_BULK_MAX_TRANSITIONS:
+            return Response(
+                {"detail": f"At most {settings.OMS_BULK_MAX_TRANSITIONS} transitions per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(payloads)
+        pairs = {}
+        child = self.get_serializer()
+        for index, payload in enumerate(payloads):
+            try:
+                data = child.run_validation(payload)
+            except serializers.ValidationError as exc:
+                results[index] = {"index": index, "result": "invalid", "errors": exc.detail}
+                continue
+            if data["id"] in pairs:
+                results[index] = {"index": index, "id": data["id"], "result": "duplicate"}
+                continue
+            pairs[data["id"]] = (index, data["status"])
+
+        outcomes = state_machine.apply_transitions([(pk, target) for pk, (_, target) in pairs.items()])
+        for pk, (index, target) in pairs.items():
+            result, from_status = outcomes[pk]
+            results[index] = {"index": index, "id": pk, "status": target, "result": result}
+            if result == state_machine.TransitionResult.APPLIED:
+                results[index]["previous_status"] = from_status
+            elif result == state_machine.TransitionResult.INVALID_TRANSITION:
+                results[index]["current_status"] = from_status
+
+        applied = sum(1 for result in results if result["result"] == state_machine.TransitionResult.APPLIED)
+        return Response(
+            {"applied": applied, "rejected": len(results) - applied, "results": results},
+            status=status.HTTP_200_OK,
+        )
+
+
+class CustomerOrderListView(OrderFastListMixin, generics.ListAPIView):
+    """A customer's orders, newest first, with the customer's summary.
+
+    Pages are ranges of the ``(customer_id, created_at, id)`` index; the
+    summary is read from ``CustomerSummary``, maintained on every order write.
+    """
+
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    filter_params = {
+        "status": "status__in",
+        "currency": "currency",
+        "created_after": "created_at__gte",
+        "created_before": "created_at__lt",
+    }
+
+    def get_queryset(self):
+        return super().get_queryset().filter(customer_id=self.kwargs["customer_id"])
+
+    def get_paginated_response(self, data):
+        summary = CustomerSummarySerializer(rollups.customer_summary(self.kwargs["customer_id"])).data
+        return Response({"customer": summary, "next": self.paginator.get_next_link(), "results": data})
 
 
 class OrderUpdateView(generics.RetrieveUpdateAPIView):
-    queryset = Order.objects.prefetch_related("items")
+    queryset = Order.objects.prefetch_related(Prefetch("items", queryset=OrderItem.objects.order_by("id")))
 
     def get_serializer_class(self):
         if self.request.method.lower() == "get":
             return OrderSerializer
         return OrderStatusUpdateSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        fields = fastpath.order_fields(request.query_params)
+        try:
+            pk, created_at, version = self.get_current_version()
+        except Order.DoesNotExist:
+            return self.retrieve_archived(request, fields)
+        etag = order_cache.etag(pk, created_at, version)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        payload = order_cache.get(pk, created_at, version)
+        if fields is not None:
+            if payload is not None and set(fields) <= payload.keys():
+                payload = {name: payload[name] for name in fields}
+            else:
+                instance = self.get_partial_object(pk, fields)
+                payload = OrderSerializer(instance, fields=fields).data
+                etag = order_cache.etag(instance.pk, instance.created_at, instance.version)
+        elif payload is None:
+            instance = self.get_object()
+            payload = self.get_serializer(instance).data
+            order_cache.store(instance.pk, instance.created_at, instance.version, payload)
+            etag = order_cache.etag(instance.pk, instance.created_at, instance.version)
+        return Response(payload, headers={"ETag": etag})
+
+    def get_current_version(self):
+        """``(pk, created_at, version)`` of the requested order, read with a single primary-key lookup."""
+        pk = self.kwargs["pk"]
+        created_at, version = Order.objects.values_list("created_at", "version").get(pk=pk)
+        return pk, created_at, version
+
+    def get_archive_lookup(self):
+        return {"pk": self.kwargs["pk"]}
+
+    def retrieve_archived(self, request, fields):
+        archived = archiving.archived_order(fields, **self.get_archive_lookup())
+        if archived is None:
+            raise Http404("No Order matches the given query.")
+        payload, identity = archived
+        etag = order_cache.etag(*identity)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(payload, headers={"ETag": etag})
+
+    def get_partial_object(self, pk, fields):
+        """Load the columns ``fields`` need (and the items only if requested)."""
+        queryset = Order.objects.only(*fastpath.order_columns(fields), "version")
+        if "items" in fields:
+            queryset = queryset.prefetch_related(Prefetch("items", queryset=OrderItem.objects.order_by("id")))
+        return get_object_or_404(queryset, pk=pk)
+
+    @retry_on_database_locked
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", False)
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        return Response(OrderSerializer(instance).data, status=status.HTTP_200_OK)
+        payload = OrderSerializer(instance).data
+        order_cache.store(instance.pk, instance.created_at, instance.version, payload)
+        etag = order_cache.etag(instance.pk, instance.created_at, instance.version)
+        return Response(payload, status=status.HTTP_200_OK, headers={"ETag": etag})
+
 
+class OrderByExternalIdView(OrderUpdateView):
+    """``OrderUpdateView`` addressed by the e-commerce ``external_id``, resolved through its unique index."""
 
-class InvoiceCreateView(generics.ListCreateAPIView):
+    lookup_field = "external_id"
+
+    def get_current_version(self):
+        return Order.objects.values_list("pk", "created_at", "version").get(external_id=self.kwargs["external_id"])
+
+    def get_archive_lookup(self):
+        return {"external_id": self.kwargs["external_id"]}
+
+
+class InvoiceCreateView(IdempotentCreateMixin, FastListMixin, generics.ListCreateAPIView):
     queryset = Invoice.objects.select_related("order")
     serializer_class = InvoiceSerializer
+    fast_values = fastpath.INVOICE_VALUES
+    fast_render = staticmethod(fastpath.render_invoices)
+    keyset_field = None
+    filter_params = {
+        "status": "status__in",
+        "order": "order_id",
+        "payment_method": "payment_method",
+        "issued_after": "issued_at__gte",
+        "issued_before": "issued_at__lt",
+        "updated_after": "updated_at__gte",
+        "updated_before": "updated_at__lt",
+    }
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         try:
@@ -52,10 +275,41 @@ class InvoiceCreateView(generics.ListCreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
-class FulfillmentRequestCreateView(generics.ListCreateAPIView):
+class InvoiceBulkCreateView(generics.GenericAPIView):
+    """Invoice every uninvoiced, non-cancelled order matching the request, in chunks."""
+
+    serializer_class = BulkInvoiceSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+        limit = min(options.get("limit", settings.OMS_BULK_INVOICE_MAX_ORDERS), settings.OMS_BULK_INVOICE_MAX_ORDERS)
+        summary = invoicing.bulk_invoice(
+            statuses=options.get("status", invoicing.INVOICEABLE_STATUSES),
+            created_before=options.get("created_before"),
+            limit=limit,
+            payment_method=options["payment_method"],
+        )
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class FulfillmentRequestCreateView(IdempotentCreateMixin, FastListMixin, generics.ListCreateAPIView):
     queryset = FulfillmentRequest.objects.select_related("order")
     serializer_class = FulfillmentRequestSerializer
+    fast_values = fastpath.FULFILLMENT_VALUES
+    fast_render = staticmethod(fastpath.render_fulfillments)
+    filter_params = {
+        "status": "status__in",
+        "order": "order_id",
+        "warehouse_code": "warehouse_code",
+        "created_after": "created_at__gte",
+        "created_before": "created_at__lt",
+        "updated_after": "updated_at__gte",
+        "updated_before": "updated_at__lt",
+    }
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         try:
@@ -70,3 +324,169 @@ class FulfillmentRequestCreateView(generics.ListCreateAPIView):
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+
+class OrderEventListView(generics.ListAPIView):
+    """Tail the order event log: ``GET /api/events?after=<seq>[&limit=N][&wait=<seconds>]``.
+
+    Returns events with ``seq > after`` in ``seq`` order, up to the
+    ``events.visible`` watermark, and a ``next`` link carrying the last
+    ``seq`` returned (or ``after`` itself when there is nothing new). With
+    ``wait``, an empty result is held open until an event arrives or the wait
+    expires (long polling). The waiting request holds a worker thread, so
+    ``wait`` is capped at ``OMS_EVENTS_MAX_WAIT``; long waits belong on
+    ``async_views.order_events``.
+    """
+
+    queryset = OrderEvent.objects.all()
+    serializer_class = OrderEventSerializer
+    pagination_class = None
+    filter_params = events.FILTER_PARAMS
+
+    def list(self, request, *args, **kwargs):
+        after, limit, wait = events.parse_query(request.query_params, max_wait=settings.OMS_EVENTS_MAX_WAIT)
+        queryset = self.filter_queryset(self.get_queryset()).order_by("seq")
+        deadline = time.monotonic() + wait
+        while True:
+            page = events.read(queryset, after, limit)
+            remaining = deadline - time.monotonic()
+            if page or remaining <= 0:
+                break
+            time.sleep(min(settings.OMS_EVENTS_POLL_INTERVAL, remaining))
+
+        last = page[-1].seq if page else after
+        return Response(
+            {
+                "next": replace_query_param(request.build_absolute_uri(), "after", last),
+                "results": self.get_serializer(page, many=True).data,
+            }
+        )
+
+
+class SyncView(generics.GenericAPIView):
+    """Delta sync: ``GET /api/sync?since=<datetime>`` then ``GET /api/sync?watermark=<token>``.
+
+    Returns the orders, invoices and fulfillments changed at or after
+    ``since`` (or after the positions in ``watermark``), up to ``limit`` per
+    model, oldest change first. Callers keep the returned ``watermark`` and
+    repeat the call while ``has_more`` is true.
+    """
+
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        token = request.query_params.get("watermark")
+        if token:
+            positions = sync.decode_watermark(token)
+        else:
+            since = parse_datetime(request.query_params.get("since", ""))
+            if since is None:
+                raise serializers.ValidationError({"since": "Pass an ISO 8601 datetime or a watermark."})
+            positions = sync.start_positions(since)
+
+        try:
+            limit = int(request.query_params.get("limit", settings.OMS_SYNC_PAGE_SIZE))
+        except ValueError:
+            raise serializers.ValidationError({"limit": "Must be a number."})
+        if limit < 1:
+            raise serializers.ValidationError({"limit": "Must be at least 1."})
+        limit = min(limit, settings.OMS_SYNC_MAX_PAGE_SIZE)
+
+        with metrics.timer("serialize"):
+            changes = sync.fetch_changes(positions, limit)
+        watermark = sync.encode_watermark(changes["positions"])
+        url = remove_query_param(request.build_absolute_uri(), "since")
+        return Response(
+            {
+                "watermark": watermark,
+                "has_more": changes["has_more"],
+                "next": replace_query_param(url, "watermark", watermark),
+                **{name: changes[name] for name in sync.SOURCES},
+            }
+        )
+
+
+class SalesSummaryView(generics.GenericAPIView):
+    """Daily order and invoice totals per currency: ``GET /api/analytics/sales?start=&end=&currency=``.
+
+    Answered from the rollup tables, so the cost depends on the number of
+    days requested, not on the number of orders.
+    """
+
+    serializer_class = DailySalesSerializer
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        query = SalesSummaryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        days = rollups.daily_summary(**query.validated_data)
+        return Response(
+            {
+                "start": query.validated_data["start"],
+                "end": query.validated_data["end"],
+                "results": self.get_serializer(days, many=True).data,
+            }
+        )
+
+
+class JobCreateView(generics.GenericAPIView):
+    """Queue a long-running operation for ``run_jobs``; poll the returned ``Location`` for its progress."""
+
+    serializer_class = JobSubmitSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = jobs.submit(**serializer.validated_data)
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": reverse("job-detail", args=[job.pk])},
+        )
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    # Polled often, and the params of an import hold every order.
+    queryset = Job.objects.defer("params")
+    serializer_class = JobSerializer
+
+
+class JobCancelView(generics.GenericAPIView):
+    serializer_class = JobSerializer
+
+    def post(self, request, *args, **kwargs):
+        job = jobs.cancel(kwargs["pk"])
+        if job is None:
+            raise Http404("No Job matches the given query.")
+        if job.status in (Job.Status.SUCCEEDED, Job.Status.FAILED):
+            return Response({"detail": f"Job already {job.status.lower()}."}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class JobOutputView(generics.GenericAPIView):
+    queryset = Job.objects.defer("params").filter(kind=Job.Kind.EXPORT, status=Job.Status.SUCCEEDED)
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        renderer = jobs.EXPORT_RENDERERS[job.result["format"]]
+        path = jobs.output_path(job.pk, renderer.format)
+        if not path.exists():
+            raise Http404("The job's output is no longer available.")
+        response = FileResponse(path.open("rb"), as_attachment=True, filename=f"orders-{job.pk}.{renderer.format}")
+        response["Content-Type"] = renderer.media_type
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint for the metrics collected by ``RequestMetricsMiddleware``.
+
+    Only served to ``OMS_METRICS_ALLOWED_IPS`` and to clients presenting
+    ``OMS_METRICS_TOKEN`` as a bearer token.
+    """
+    token = settings.OMS_METRICS_TOKEN
+    authorized = bool(token) and hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    )
+    if not authorized and request.META.get("REMOTE_ADDR") not in settings.OMS_METRICS_ALLOWED_IPS:
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(metrics.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
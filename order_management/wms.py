@@ -0,0 +1,124 @@
+"""Fulfillment dispatch to the warehouse management system (WMS).
+
+``FulfillmentRequestSerializer`` enqueues a ``fulfillment.requested`` outbox
+message with the fulfillment; ``FulfillmentDispatchHandler`` sends it to the
+WMS (with the order items, loaded once per batch) and moves the fulfillment
+to ``SENT_TO_WMS`` once the WMS has accepted it.
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+
+from django.utils import timezone
+
+from . import outbox
+from .models import FulfillmentRequest, OrderItem
+
+FULFILLMENT_TOPIC = "fulfillment.requested"
+
+# Statuses worth retrying; any other 4xx means the WMS refuses the request.
+RETRYABLE_STATUSES = {408, 425, 429}
+
+
+class WMSError(Exception):
+    pass
+
+
+def enqueue_fulfillment(fulfillment):
+    order = fulfillment.order
+    return outbox.enqueue(
+        FULFILLMENT_TOPIC,
+        f"fulfillment:{fulfillment.id}",
+        {
+            "fulfillment_id": fulfillment.id,
+            "order_id": order.id,
+            "external_id": order.external_id,
+            "customer_id": order.customer_id,
+            "warehouse_code": fulfillment.warehouse_code,
+        },
+    )
+
+
+class HttpWMSClient:
+    """POSTs fulfillment requests as JSON to ``<base_url>/fulfillments``."""
+
+    def __init__(self, base_url, timeout=5):
+        self.url = base_url.rstrip("/") + "/fulfillments"
+        self.timeout = timeout
+
+    def submit(self, key, payload):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode(),
+            method="POST",
+            headers={"Content-Type": "application/json", "Idempotency-Key": key},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                return
+        except urllib.error.HTTPError as exc:
+            if exc.code == 409:
+                # Already received under this key.
+                return
+            message = f"WMS responded {exc.code}: {exc.read()[:500].decode(errors='replace')}"
+            if 400 <= exc.code < 500 and exc.code not in RETRYABLE_STATUSES:
+                raise outbox.PermanentFailure(message)
+            raise WMSError(message)
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as exc:
+            raise WMSError(f"WMS unreachable: {exc}")
+
+
+class StubWMSClient:
+    """In-process WMS for tests and local development.
+
+    Accepted requests are kept in ``received`` by key (resubmissions are
+    ignored, as with the real WMS). ``failures`` maps a key to the number of
+    times its submission should fail before succeeding, and keys in
+    ``rejected`` always fail permanently.
+    """
+
+    def __init__(self, failures=None, rejected=()):
+        self.received = {}
+        self.calls = 0
+        self.failures = dict(failures or {})
+        self.rejected = set(rejected)
+        self._lock = threading.Lock()
+
+    def submit(self, key, payload):
+        with self._lock:
+            self.calls += 1
+            if key in self.rejected:
+                raise outbox.PermanentFailure(f"WMS rejected {key}")
+            if self.failures.get(key):
+                self.failures[key] -= 1
+                raise WMSError(f"WMS unavailable for {key}")
+            self.received.setdefault(key, payload)
+
+
+class FulfillmentDispatchHandler:
+    topic = FULFILLMENT_TOPIC
+
+    def __init__(self, client):
+        self.client = client
+
+    def prepare(self, messages):
+        items = {}
+        order_ids = [message.payload["order_id"] for message in messages]
+        for order_id, product_id, quantity in (
+            OrderItem.objects.filter(order_id__in=order_ids)
+            .order_by("order_id", "id")
+            .values_list("order_id", "product_id", "quantity")
+        ):
+            items.setdefault(order_id, []).append({"product_id": product_id, "quantity": quantity})
+        return items
+
+    def send(self, message, items):
+        payload = {**message.payload, "items": items.get(message.payload["order_id"], [])}
+        self.client.submit(message.key, payload)
+
+    def delivered(self, messages):
+        FulfillmentRequest.objects.filter(
+            id__in=[message.payload["fulfillment_id"] for message in messages],
+            status=FulfillmentRequest.Status.CREATED,
+        ).update(status=FulfillmentRequest.Status.SENT_TO_WMS, updated_at=timezone.now())